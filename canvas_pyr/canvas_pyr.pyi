@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+from array import array
 from types import TracebackType
 from typing import (
     Any,
@@ -20,6 +22,19 @@ ReadableStream = Any
 Blob = Any
 
 def clearAllCache() -> None: ...
+def setFontCacheLimit(bytes: int) -> int: ...
+def setFontCacheCountLimit(count: int) -> int: ...
+def getFontCacheStats() -> FontCacheStats: ...
+def purgeFontCache() -> None: ...
+def purgeResourceCache() -> None: ...
+
+class FontCacheStats:
+    usedBytes: int
+    limitBytes: int
+    count: int
+    countLimit: int
+    # clearAllCache() and purgeFontCache() calls, not Skia's own evictions
+    purgeCount: int
 
 class CanvasState(Protocol):
     def isContextLost(self) -> bool: ...
@@ -45,6 +60,53 @@ class CanvasRect(Protocol):
     def fillRect(self, x: float, y: float, w: float, h: float) -> None: ...
     def strokeRect(self, x: float, y: float, w: float, h: float) -> None: ...
 
+class TextBlob:
+    """Pre-shaped line of text created by ``ctx.createTextBlob``; immutable."""
+
+    @property
+    def text(self) -> str: ...
+    @property
+    def width(self) -> float: ...
+    @property
+    def metrics(self) -> TextMetrics: ...
+
+class Picture:
+    """Drawing commands recorded by ``ctx.beginRecording`` / ``ctx.endRecording``; immutable."""
+
+    @property
+    def x(self) -> float: ...
+    @property
+    def y(self) -> float: ...
+    @property
+    def width(self) -> float: ...
+    @property
+    def height(self) -> float: ...
+    def serialize(self, embedFonts: Optional[bool] = None) -> bytes:
+        """SKP bytes with images embedded; also used by pickle. Fonts are
+        referenced by family and style unless ``embedFonts`` (by default as
+        chosen by ``toPicture``)"""
+    @staticmethod
+    def deserialize(data: bytes, fontCollection: Optional[FontCollection] = None) -> Picture:
+        """Referenced fonts are looked up in ``fontCollection``, or in ``GlobalFonts``"""
+
+class TextBlockOptions(TypedDict, total=False):
+    # Wrap width in pixels; without it only newlines break lines
+    maxWidth: float
+    # Line height in pixels; defaults to the font's line height
+    lineHeight: float
+    maxLines: int
+    # Drawn at the end of the last line when maxLines cuts the text
+    ellipsis: str
+    # Defaults to ctx.textAlign
+    align: CanvasTextAlign | Literal["justify"]
+
+class TextBlockMetrics(Protocol):
+    # Width of the longest line
+    width: float
+    height: float
+    lineCount: int
+    didExceedMaxLines: bool
+
 class TextMetrics(Protocol):
     actualBoundingBoxAscent: float
     actualBoundingBoxDescent: float
@@ -66,6 +128,20 @@ class CanvasText(Protocol):
         self, text: str, x: float, y: float, maxWidth: float | None = None
     ) -> None: ...
     def measureText(self, text: str) -> TextMetrics: ...
+    def createTextBlob(self, text: str) -> TextBlob: ...
+    def textToPath(self, text: str, x: float, y: float) -> "Path2D": ...
+    def drawTextBlob(self, blob: TextBlob, x: float, y: float) -> None: ...
+    def fillTextBlock(
+        self, text: str, x: float, y: float, options: TextBlockOptions | None = None
+    ) -> None: ...
+    def measureTextBlock(
+        self, text: str, options: TextBlockOptions | None = None
+    ) -> TextBlockMetrics: ...
+    def measureTextBatch(
+        self, strings: Sequence[str], fields: Sequence[str] = ("width",)
+    ) -> array[float]:
+        """Measure many strings in one call; returns ``len(fields)`` values per string."""
+        ...
     def strokeText(
         self, text: str, x: float, y: float, maxWidth: float | None = None
     ) -> None: ...
@@ -234,6 +310,7 @@ class CanvasTextDrawingStyles(Protocol):
     wordSpacing: str
     fontVariationSettings: str
     lang: str
+    fontCollection: "FontCollection" | None
 
 class CanvasFilters(Protocol):
     filter: str
@@ -630,6 +707,32 @@ class ImageData:
         /,
     ) -> None: ...
 
+class ImageCache:
+    """
+    Process-wide cache of decoded raster images, shared between ``Image`` instances.
+
+    Entries are keyed by file path + size + mtime, or by content for bytes (a copy
+    of the encoded bytes is kept and compared on every hit), and evicted
+    least-recently-used first once ``maxBytes`` is exceeded. The decoded pixels
+    and the kept copies of encoded bytes both count towards it.
+    """
+
+    maxBytes: int
+    totalBytes: int  # readonly
+    count: int  # readonly
+    hits: int  # readonly
+    misses: int  # readonly
+    evictions: int  # readonly
+
+    def __init__(self, maxBytes: int = 134217728) -> None: ...
+    def clear(self) -> None: ...
+    def resetStats(self) -> None: ...
+
+class ImageLoadOptions(TypedDict, total=False):
+    maxWidth: int
+    maxHeight: int
+    cache: ImageCache
+
 class Image:
     @overload
     def __init__(self) -> None: ...
@@ -647,13 +750,47 @@ class Image:
     alt: str
     src: str | None  # readonly
 
-    def load(self, data: bytes | str) -> None:
+    def load(
+        self,
+        data: bytes | bytearray | memoryview | str,
+        options: Optional[ImageLoadOptions] = None,
+    ) -> None:
         """
         Load image data from bytes or a file path.
 
+        Buffers are read in place without copying (``bytearray`` excepted),
+        files are memory-mapped.
+
         :param self: self
-        :param data: image data as bytes / file path as str / data URL as str / SVG as str
-        :type data: bytes | str
+        :param data: image data as bytes or any C-contiguous buffer / file path as str /
+            data URL as str / SVG as str
+        :type data: bytes | bytearray | memoryview | str
+        :param options: ``maxWidth`` / ``maxHeight`` decode raster images scaled down
+            to fit in the given box (positive sizes, aspect ratio is kept, images are
+            never upscaled),
+            ``cache`` reuses bitmaps decoded earlier through the same ``ImageCache``
+        :type options: ImageLoadOptions | None
+        """
+
+    def loadRegion(
+        self,
+        source: bytes | bytearray | memoryview | str,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        scale: float = 1.0,
+    ) -> None:
+        """
+        Decode only a rectangle of a raster image, with memory proportional to the region.
+
+        :param self: self
+        :param source: image data as bytes or any C-contiguous buffer / file path as str
+        :param x: left of the region, in image pixels (after EXIF orientation)
+        :param y: top of the region, in image pixels (after EXIF orientation)
+        :param width: width of the region, clipped to the image bounds
+        :param height: height of the region, clipped to the image bounds
+        :param scale: output scale in (0, 1], the loaded image is ``width * scale`` wide
         """
 
 class Path2D:
@@ -743,6 +880,7 @@ class CanvasRenderingContext2D(
     CanvasPDFAnnotations,
 ):
     canvas: "Canvas"  # readonly
+    deferred: bool  # readonly
     letterSpacing: str
     wordSpacing: str
 
@@ -813,6 +951,13 @@ class CanvasRenderingContext2D(
         dh: float,
         /,
     ) -> None: ...
+    # Drawing calls until endRecording() are recorded instead of drawn.
+    # bounds is (x, y, width, height); the recording starts from the identity transform.
+    def beginRecording(self, bounds: tuple[float, float, float, float]) -> None: ...
+    def endRecording(self) -> Picture: ...
+    def drawPicture(
+        self, picture: Picture, matrix: DOMMatrix | DOMMatrix2DInit | None = None
+    ) -> None: ...
     def createPattern(
         self,
         image: Image | ImageData | "Canvas" | "SvgCanvas",
@@ -826,6 +971,10 @@ class ContextAttributes(TypedDict, total=False):
     alpha: bool
     colorSpace: ColorSpace
 
+class CanvasOptions(TypedDict, total=False):
+    # False draws straight to the pixels instead of recording, defaults to True
+    deferred: bool
+
 class SvgCanvas(Protocol):
     # Set width or height will create a new canvas inner surface, and the content will be cleared.
     width: int
@@ -936,10 +1085,15 @@ class Canvas:
         self, mime: Literal["image/avif"], cfg: AvifConfig | None = None
     ) -> str: ...
     def savePng(self, path: str) -> None: ...
+    def toPicture(self, embedFonts: bool = False) -> Picture:
+        """everything drawn so far, kept as drawing commands; ``embedFonts``
+        makes it serialize the fonts it uses with their data"""
 
 @overload
 def createCanvas(width: int, height: int) -> Canvas: ...
 @overload
+def createCanvas(width: int, height: int, options: CanvasOptions) -> Canvas: ...
+@overload
 def createCanvas(
     width: int, height: int, svgExportFlag: "SvgExportFlag"
 ) -> SvgCanvas: ...
@@ -961,6 +1115,20 @@ class FontVariationAxis:
     # Whether this axis should be hidden from UI
     hidden: bool
 
+class ParagraphCacheStats:
+    capacity: int
+    count: int
+    hits: int
+    misses: int
+    evictions: int
+
+class VariationCacheStats:
+    capacity: int
+    count: int
+    hits: int
+    misses: int
+    evictions: int
+
 class FontStyles:
     weight: int
     width: str
@@ -978,6 +1146,11 @@ class IGlobalFonts(Protocol):
     ) -> FontKey | None: ...
     def has(self, name: str) -> bool: ...
     def loadFontsFromDir(self, path: str) -> int: ...
+    def setFontIndexDir(self, dir: str | os.PathLike[str] | None) -> None: ...
+    def getFontIndexDir(self) -> str | None: ...
+    def warmUp(self, families: list[str] | None = None) -> int: ...
+    def ready(self) -> bool: ...
+    def wait(self, timeout: float | None = None) -> bool: ...
     def setAlias(self, fontName: str, alias: str) -> bool: ...
     def remove(self, key: FontKey) -> None: ...
     def removeBatch(self, fontKeys: list[FontKey]) -> int: ...
@@ -988,9 +1161,37 @@ class IGlobalFonts(Protocol):
     def hasVariations(
         self, familyName: str, weight: int, width: int, slant: int
     ) -> bool: ...
+    def getParagraphCacheStats(self) -> ParagraphCacheStats: ...
+    def setParagraphCacheCapacity(self, capacity: int) -> None: ...
+    def clearParagraphCache(self) -> None: ...
+    def getVariationCacheStats(self) -> VariationCacheStats: ...
+    def setVariationCacheCapacity(self, capacity: int) -> None: ...
+    def setTextFastPath(self, enabled: bool) -> None: ...
+    def setFallbackFamilies(self, families: list[str]) -> None: ...
+    def getFallbackFamilies(self) -> list[str]: ...
 
 GlobalFonts: IGlobalFonts
 
+class FontCollection:
+    """
+    Fonts attached to a context with ``ctx.fontCollection = collection``
+    instead of being registered in ``GlobalFonts``. With ``fallback=True``
+    families missing here are looked up in ``GlobalFonts``.
+    """
+
+    def __init__(self, fallback: bool = True) -> None: ...
+    @property
+    def fallback(self) -> bool: ...
+    def getFamilies(self) -> list[FontStyleSet]: ...
+    def register(self, font: bytes, nameAlias: str | None = None) -> FontKey | None: ...
+    def registerFromPath(
+        self, path: str, nameAlias: str | None = None
+    ) -> FontKey | None: ...
+    def has(self, name: str) -> bool: ...
+    def setAlias(self, fontName: str, alias: str) -> bool: ...
+    def remove(self, key: FontKey) -> bool: ...
+    def removeAll(self) -> int: ...
+
 class PathOp(IntEnum):
     Difference = 0
     Intersect = 1
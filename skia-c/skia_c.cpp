@@ -1,6 +1,8 @@
 #include <assert.h>
 #include <math.h>
 #include <algorithm>
+#include <cmath>
+#include <limits>
 #include <optional>
 #include <vector>
 
@@ -107,8 +109,38 @@ static skiac_transform conv_to_transform(const SkMatrix& matrix) {
   };
 }
 
+// Outlines of the glyphs returned by textToPath
+static skiac_glyph_path_cache glyph_path_cache;
+
 void skiac_clear_all_cache() {
   SkGraphics::PurgeAllCaches();
+  glyph_path_cache.clear();
+}
+
+// Glyph / font (strike) cache
+
+size_t skiac_set_font_cache_limit(size_t bytes) {
+  return SkGraphics::SetFontCacheLimit(bytes);
+}
+
+int skiac_set_font_cache_count_limit(int count) {
+  return SkGraphics::SetFontCacheCountLimit(count);
+}
+
+void skiac_get_font_cache_stats(skiac_font_cache_stats* c_stats) {
+  c_stats->used_bytes = SkGraphics::GetFontCacheUsed();
+  c_stats->limit_bytes = SkGraphics::GetFontCacheLimit();
+  c_stats->count = SkGraphics::GetFontCacheCountUsed();
+  c_stats->count_limit = SkGraphics::GetFontCacheCountLimit();
+}
+
+void skiac_purge_font_cache() {
+  SkGraphics::PurgeFontCache();
+  glyph_path_cache.clear();
+}
+
+void skiac_purge_resource_cache() {
+  SkGraphics::PurgeResourceCache();
 }
 
 // Surface
@@ -251,6 +283,37 @@ bool skiac_surface_read_pixels_rect(skiac_surface* c_surface,
   return result;
 }
 
+bool skiac_surface_read_pixels_rect_with_pictures(skiac_surface* c_surface,
+                                                  skiac_picture** c_pictures,
+                                                  size_t count,
+                                                  uint8_t* data,
+                                                  int x,
+                                                  int y,
+                                                  int w,
+                                                  int h,
+                                                  uint8_t cs) {
+  auto region = SURFACE_CAST->makeSurface(w, h);
+  if (!region) {
+    return false;
+  }
+  auto canvas = region->getCanvas();
+  canvas->clear(SK_ColorTRANSPARENT);
+  // Start from what the surface already shows
+  SURFACE_CAST->draw(canvas, static_cast<SkScalar>(-x),
+                     static_cast<SkScalar>(-y), SkSamplingOptions(), nullptr);
+  canvas->translate(static_cast<SkScalar>(-x), static_cast<SkScalar>(-y));
+  // The pictures' bounding box hierarchy skips the commands outside the clip
+  canvas->clipRect(SkRect::MakeXYWH(x, y, w, h));
+  for (size_t i = 0; i < count; i++) {
+    reinterpret_cast<SkPicture*>(c_pictures[i])->playback(canvas);
+  }
+  auto color_space = COLOR_SPACE_CAST;
+  auto image_info =
+      SkImageInfo::Make(w, h, SkColorType::kRGBA_8888_SkColorType,
+                        SkAlphaType::kUnpremul_SkAlphaType, color_space);
+  return region->readPixels(image_info, data, w * 4, 0, 0);
+}
+
 void skiac_surface_png_data(skiac_surface* c_surface, skiac_sk_data* data) {
   auto image = SURFACE_CAST->makeImageSnapshot().release();
   auto png_data = SkPngEncoder::Encode(nullptr, image, SkPngEncoder::Options());
@@ -464,6 +527,499 @@ void skiac_canvas_draw_surface_rect(skiac_canvas* c_canvas,
                              SkCanvas::kFast_SrcRectConstraint);
 }
 
+// ICU break iterators are created per paragraph, the instance is shared
+static sk_sp<SkUnicode> shared_unicode() {
+  static sk_sp<SkUnicode> unicode = SkUnicodes::ICU::Make();
+  return unicode;
+}
+
+static void append_key_bytes(std::string* key,
+                             const void* bytes,
+                             size_t length) {
+  key->append(reinterpret_cast<const char*>(&length), sizeof(length));
+  key->append(reinterpret_cast<const char*>(bytes), length);
+}
+
+// Everything that changes how a run of text is shaped. Paragraphs built from
+// the same text and style are interchangeable, the paint is applied only when
+// drawing (see PaintOverrideParagraphPainter).
+struct TextShapeStyle {
+  float font_size;
+  int weight;
+  int stretch;
+  float stretch_width;
+  int slant;
+  const char* font_family;
+  int direction;
+  float letter_spacing;
+  float world_spacing;
+  const skiac_font_variation* variations;
+  int variations_count;
+  int kerning;
+  int variant_caps;
+  const char* lang;
+  int text_rendering;
+
+  std::string cacheKey(const char* text,
+                       size_t text_len,
+                       const skiac_text_block* block) const {
+    std::string key;
+    key.reserve(text_len + 96);
+    append_key_bytes(&key, text, text_len);
+    append_key_bytes(&key, font_family, strlen(font_family));
+    append_key_bytes(&key, lang, lang ? strlen(lang) : 0);
+    const float floats[] = {font_size, stretch_width, letter_spacing,
+                            world_spacing};
+    append_key_bytes(&key, floats, sizeof(floats));
+    const int ints[] = {weight,  stretch,      slant,         direction,
+                        kerning, variant_caps, text_rendering};
+    append_key_bytes(&key, ints, sizeof(ints));
+    append_key_bytes(&key, variations,
+                     variations ? variations_count * sizeof(*variations) : 0);
+    if (block) {
+      const float block_floats[] = {block->max_width, block->line_height};
+      append_key_bytes(&key, block_floats, sizeof(block_floats));
+      const int block_ints[] = {(int)block->max_lines, block->align};
+      append_key_bytes(&key, block_ints, sizeof(block_ints));
+      append_key_bytes(&key, block->ellipsis,
+                       block->ellipsis ? strlen(block->ellipsis) : 0);
+    }
+    return key;
+  }
+
+  // True when the typefaces are variable font instances, see
+  // skiac_variation_instance_cache
+  bool hasVariations() const {
+    return (variations && variations_count > 0) || stretch_width != 100.0f;
+  }
+
+  // The variation coordinates, one instance collection is kept per distinct
+  // set whatever the families and style
+  std::string variationKey() const {
+    std::string key;
+    append_key_bytes(&key, &stretch_width, sizeof(stretch_width));
+    append_key_bytes(&key, variations,
+                     variations ? variations_count * sizeof(*variations) : 0);
+    return key;
+  }
+
+  // True for a line that shapes as a single LTR run without the paragraph
+  // pipeline: printable ASCII only, and nothing that needs ICU, spacing
+  // adjustments or variable font instances
+  bool isSimple(const char* text, size_t text_len) const {
+    if (text_len == 0 || (TextDirection)direction != TextDirection::kLtr ||
+        letter_spacing != 0 || world_spacing != 0 || hasVariations() ||
+        variant_caps != 0 ||
+        (lang && *lang && strcmp(lang, "inherit") != 0)) {
+      return false;
+    }
+    return std::all_of(text, text + text_len, [](char c) {
+      return c >= 0x20 && c <= 0x7e;
+    });
+  }
+
+  SkFontStyle fontStyle() const {
+    return SkFontStyle(weight, stretch, (SkFontStyle::Slant)slant);
+  }
+
+  std::vector<SkString> fontFamilies() const {
+    skia_private::TArray<SkString> families;
+    SkStrSplit(font_family, ",", &families);
+    std::vector<SkString> families_vec;
+    for (auto family : families) {
+      families_vec.emplace_back(family);
+    }
+    return families_vec;
+  }
+
+  // OpenType features selected by fontKerning, fontVariantCaps and
+  // textRendering
+  std::vector<std::pair<const char*, int>> fontFeatures() const {
+    std::vector<std::pair<const char*, int>> features;
+    // Apply font kerning feature
+    // kerning: 0=auto (don't set feature), 1=none (disable), 2=normal (enable)
+    if (kerning == 1) {
+      features.emplace_back("kern", 0);
+    } else if (kerning == 2) {
+      features.emplace_back("kern", 1);
+    }
+
+    // TODO: Support fontFeatureSettings
+    // Apply font variant caps features
+    // variant_caps: 0=normal, 1=small-caps, 2=all-small-caps, 3=petite-caps,
+    // 4=all-petite-caps, 5=unicase, 6=titling-caps
+    if (variant_caps == 1) {
+      // small-caps
+      features.emplace_back("smcp", 1);
+    } else if (variant_caps == 2) {
+      // all-small-caps
+      features.emplace_back("smcp", 1);
+      features.emplace_back("c2sc", 1);
+    } else if (variant_caps == 3) {
+      // petite-caps
+      features.emplace_back("pcap", 1);
+    } else if (variant_caps == 4) {
+      // all-petite-caps
+      features.emplace_back("pcap", 1);
+      features.emplace_back("c2pc", 1);
+    } else if (variant_caps == 5) {
+      // unicase
+      features.emplace_back("unic", 1);
+    } else if (variant_caps == 6) {
+      // titling-caps
+      features.emplace_back("titl", 1);
+    }
+
+    // Apply textRendering: only optimizeSpeed changes behavior.
+    // Per Chromium's implementation in font_features.cc, textRendering does
+    // NOT affect kerning - that's controlled solely by fontKerning.
+    // textRendering only affects ligatures (liga, clig) and contextual
+    // alternates (calt) when set to optimizeSpeed.
+    // text_rendering: 0=auto, 1=optimizeSpeed, 2=optimizeLegibility,
+    // 3=geometricPrecision
+    if (text_rendering == 1) {
+      // optimizeSpeed: disable ligatures and contextual alternates for speed
+      // Note: kern is NOT touched here - it's fontKerning's responsibility
+      features.emplace_back("liga", 0);
+      features.emplace_back("clig", 0);
+      features.emplace_back("calt", 0);
+    }
+    // auto, optimizeLegibility, geometricPrecision: use HarfBuzz/Skia defaults
+    // (liga, clig, calt are ON by default)
+    return features;
+  }
+
+  // Lays out a single line when `block` is null, otherwise wraps and aligns
+  // the text as described by `block`.
+  std::shared_ptr<ParagraphImpl> build(sk_sp<FontCollection> font_collection,
+                                       const char* text,
+                                       size_t text_len,
+                                       const skiac_text_block* block) const {
+    TextStyle text_style;
+    text_style.setFontFamilies(fontFamilies());
+    text_style.setFontSize(font_size);
+    text_style.setWordSpacing(world_spacing);
+    text_style.setLetterSpacing(letter_spacing);
+    text_style.setHeight(1);
+    text_style.setFontStyle(fontStyle());
+
+    std::vector<SkFontArguments::VariationPosition::Coordinate> coords;
+
+    // Apply variable font variations if provided
+    if (variations && variations_count > 0) {
+      coords.reserve(variations_count + 1);
+      for (int i = 0; i < variations_count; i++) {
+        coords.push_back({variations[i].tag, variations[i].value});
+      }
+    }
+
+    // Apply font stretch as 'wdth' variation for variable fonts
+    // 'wdth' tag = 0x77647468
+    if (stretch_width != 100.0f) {
+      coords.push_back({SkSetFourByteTag('w', 'd', 't', 'h'), stretch_width});
+    }
+
+    if (!coords.empty()) {
+      SkFontArguments font_args;
+      font_args.setVariationDesignPosition(
+          {coords.data(), static_cast<int>(coords.size())});
+      text_style.setFontArguments(std::make_optional(font_args));
+    }
+
+    for (const auto& [tag, value] : fontFeatures()) {
+      text_style.addFontFeature(SkString(tag), value);
+    }
+
+    // Apply language/locale for language-specific glyph variants
+    // lang: BCP-47 language tag (e.g., "en", "tr", "zh-Hans") or
+    // nullptr/"inherit"
+    if (lang != nullptr && strcmp(lang, "") != 0 &&
+        strcmp(lang, "inherit") != 0) {
+      text_style.setLocale(SkString(lang));
+
+      // Turkish/Azerbaijani locale: disable standard and contextual ligatures
+      // These languages have a dotless i (ı) as a separate letter from dotted i.
+      // The "fi" ligature would incorrectly merge "f" with "i", obscuring the dot
+      // which is semantically significant. Browsers disable common ligatures
+      // (liga + clig) for these locales per MDN CanvasRenderingContext2D.lang
+      // spec. Use case-insensitive comparison per BCP-47 (RFC 5646).
+      if ((strncasecmp(lang, "tr", 2) == 0 || strncasecmp(lang, "az", 2) == 0) &&
+          (lang[2] == '\0' || lang[2] == '-' || lang[2] == '_')) {
+        text_style.addFontFeature(SkString("liga"), 0);
+        text_style.addFontFeature(SkString("clig"), 0);
+      }
+    }
+
+    text_style.setTextBaseline(TextBaseline::kAlphabetic);
+    if (block && block->line_height > 0) {
+      text_style.setHeight(block->line_height / font_size);
+      text_style.setHeightOverride(true);
+    }
+    StrutStyle struct_style;
+    struct_style.setLeading(0);
+
+    ParagraphStyle paragraph_style;
+    paragraph_style.setTextStyle(text_style);
+    paragraph_style.setTextDirection((TextDirection)direction);
+    paragraph_style.setStrutStyle(struct_style);
+    if (block) {
+      paragraph_style.setTextAlign((TextAlign)block->align);
+      if (block->max_lines > 0) {
+        paragraph_style.setMaxLines(block->max_lines);
+      }
+      if (block->ellipsis && *block->ellipsis) {
+        paragraph_style.setEllipsis(SkString(block->ellipsis));
+      }
+    }
+    ParagraphBuilderImpl builder(paragraph_style, font_collection,
+                                 shared_unicode());
+    builder.addText(text, text_len);
+    std::shared_ptr<ParagraphImpl> paragraph(
+        static_cast<ParagraphImpl*>(builder.Build().release()));
+    // Without wrapping lines are aligned within MAX_LAYOUT_WIDTH. Drawing
+    // anchors the layout width on `x`, which puts every line where it would be
+    // in a layout shrunk to the longest line, so one layout is enough.
+    paragraph->layout(block && block->max_width > 0 ? block->max_width
+                                                    : MAX_LAYOUT_WIDTH);
+    return paragraph;
+  }
+};
+
+static std::shared_ptr<ParagraphImpl> skiac_build_paragraph(
+    skiac_font_collection* c_collection,
+    const TextShapeStyle& shape_style,
+    const char* text,
+    size_t text_len,
+    const skiac_text_block* block) {
+  auto collection = c_collection->collection;
+  if (shape_style.hasVariations()) {
+    collection = c_collection->variation_instances.find(
+        shape_style.variationKey(),
+        [c_collection] { return c_collection->makeInstanceCollection(); });
+  }
+  return shape_style.build(std::move(collection), text, text_len, block);
+}
+
+// What fillText / measureText use of a laid out line of text, taken from a
+// paragraph or from a simple line shaped without one
+struct TextLineLayout {
+  std::shared_ptr<ParagraphImpl> paragraph;
+  // Glyphs of a simple line, drawn in place of the paragraph
+  sk_sp<SkTextBlob> blob;
+  SkFont font;
+  std::vector<SkGlyphID> glyphs;
+  SkScalar last_glyph_x = 0;
+  SkScalar left = 0;
+  SkScalar width = 0;
+  SkScalar height = 0;
+  SkScalar alphabetic_baseline = 0;
+  SkScalar ideographic_baseline = 0;
+  bool cursive_script = false;
+};
+
+static std::shared_ptr<ParagraphImpl> skiac_find_or_build_paragraph(
+    skiac_font_collection* c_collection,
+    const TextShapeStyle& shape_style,
+    const char* text,
+    size_t text_len,
+    const skiac_text_block* block) {
+  auto& paragraph_cache = c_collection->paragraph_cache;
+  if (paragraph_cache.capacity == 0) {
+    return skiac_build_paragraph(c_collection, shape_style, text, text_len,
+                                 block);
+  }
+  auto cache_key = shape_style.cacheKey(text, text_len, block);
+  auto layout = paragraph_cache.find(cache_key);
+  if (layout && layout->paragraph) {
+    return layout->paragraph;
+  }
+  auto built = std::make_shared<TextLineLayout>();
+  built->paragraph =
+      skiac_build_paragraph(c_collection, shape_style, text, text_len, block);
+  paragraph_cache.insert(std::move(cache_key), built);
+  return built->paragraph;
+}
+
+// Paints with the caller's paint instead of the one captured when the
+// paragraph was built, so a cached paragraph serves any fill / stroke style.
+class PaintOverrideParagraphPainter : public CanvasParagraphPainter {
+ public:
+  PaintOverrideParagraphPainter(SkCanvas* canvas, const SkPaint& paint)
+      : CanvasParagraphPainter(canvas), fCanvas(canvas), fPaint(paint) {}
+
+  void drawTextBlob(const sk_sp<SkTextBlob>& blob,
+                    SkScalar x,
+                    SkScalar y,
+                    const SkPaintOrID&) override {
+    fCanvas->drawTextBlob(blob, x, y, fPaint);
+  }
+
+ private:
+  SkCanvas* fCanvas;
+  const SkPaint& fPaint;
+};
+
+static TextLineLayout skiac_paragraph_line(
+    std::shared_ptr<ParagraphImpl> paragraph) {
+  TextLineLayout line;
+  std::vector<LineMetrics> metrics_vec;
+  paragraph->getLineMetrics(metrics_vec);
+  auto& run = paragraph->run(0);
+  auto glyphs = run.glyphs();
+  line.font = run.font();
+  line.glyphs.assign(glyphs.begin(), glyphs.end());
+  line.last_glyph_x = run.positionX(glyphs.size() - 1);
+  line.left = metrics_vec[0].fLeft;
+  // line_metrics.fWidth doesn't contain the suffix spaces
+  // run.calculateWidth will return 0 if font is rendering as fallback
+  //
+  // So we use `getMaxIntrinsicWidth()` to get the `line_width`.
+  // - For single-run text without internal spaces: uses run.advance().fX from
+  // HarfBuzz shaping
+  // - For text with internal spaces or multiple runs: uses TextWrapper's
+  // cluster-based calculation Both are direction-independent and include
+  // trailing spaces.
+  //
+  // Note: Using `getRectsForRange()` may cause `measureText.width` to return
+  // different values for LTR and RTL layouts.
+  line.width = paragraph->getMaxIntrinsicWidth();
+  line.height = paragraph->getHeight();
+  line.alphabetic_baseline = paragraph->getAlphabeticBaseline();
+  line.ideographic_baseline = paragraph->getIdeographicBaseline();
+  line.cursive_script = run.isCursiveScript();
+  line.paragraph = std::move(paragraph);
+  return line;
+}
+
+// Collects the glyphs of a line shaped by SkShaper
+class SimpleLineRunHandler : public SkShaper::RunHandler {
+ public:
+  void beginLine() override {}
+  void runInfo(const RunInfo& info) override {
+    runs++;
+    advance += info.fAdvance;
+  }
+  void commitRunInfo() override {}
+  Buffer runBuffer(const RunInfo& info) override {
+    font = info.fFont;
+    glyphs.resize(info.glyphCount);
+    positions.resize(info.glyphCount);
+    return {glyphs.data(), positions.data(), nullptr, nullptr, {0, 0}};
+  }
+  void commitRunBuffer(const RunInfo&) override {}
+  void commitLine() override {}
+
+  int runs = 0;
+  SkVector advance = {0, 0};
+  SkFont font;
+  std::vector<SkGlyphID> glyphs;
+  std::vector<SkPoint> positions;
+};
+
+// Shapes `text` with HarfBuzz the way ParagraphImpl shapes a single run,
+// skipping ICU analysis, line breaking and the paragraph objects. Returns
+// false when the text is not simple or the first matching typeface is
+// missing some of its glyphs, the paragraph path handles those.
+static bool skiac_shape_simple_line(skiac_font_collection* c_collection,
+                                    const TextShapeStyle& shape_style,
+                                    const char* text,
+                                    size_t text_len,
+                                    TextLineLayout* line) {
+  if (!c_collection->simple_text_fast_path ||
+      !shape_style.isSimple(text, text_len)) {
+    return false;
+  }
+  auto typefaces = c_collection->collection->findTypefaces(
+      shape_style.fontFamilies(), shape_style.fontStyle(), std::nullopt);
+  if (typefaces.empty()) {
+    return false;
+  }
+  // Same rasterization settings as the runs of a paragraph
+  SkFont font(typefaces.front(), shape_style.font_size);
+  font.setEdging(SkFont::Edging::kAntiAlias);
+  font.setHinting(SkFontHinting::kSlight);
+  font.setSubpixel(true);
+
+  std::vector<SkShaper::Feature> features;
+  for (const auto& [tag, value] : shape_style.fontFeatures()) {
+    features.push_back({SkSetFourByteTag(tag[0], tag[1], tag[2], tag[3]),
+                        static_cast<uint32_t>(value), 0, text_len});
+  }
+  // Digits, spaces and punctuation alone are the Common script
+  bool has_letters = std::any_of(text, text + text_len, [](char c) {
+    return (c >= 'A' && c <= 'Z') || (c >= 'a' && c <= 'z');
+  });
+  SkShaper::TrivialFontRunIterator font_runs(font, text_len);
+  SkShaper::TrivialBiDiRunIterator bidi_runs(0, text_len);
+  SkShaper::TrivialScriptRunIterator script_runs(
+      has_letters ? SkSetFourByteTag('L', 'a', 't', 'n')
+                  : SkSetFourByteTag('Z', 'y', 'y', 'y'),
+      text_len);
+  SkShaper::TrivialLanguageRunIterator language_runs("", text_len);
+  thread_local std::unique_ptr<SkShaper> shaper =
+      SkShapers::HB::ShapeDontWrapOrReorder(shared_unicode(),
+                                            SkFontMgr::RefEmpty());
+  SimpleLineRunHandler handler;
+  shaper->shape(text, text_len, font_runs, bidi_runs, script_runs,
+                language_runs, features.data(), features.size(),
+                MAX_LAYOUT_WIDTH, &handler);
+  if (handler.runs != 1 || handler.glyphs.empty() ||
+      std::find(handler.glyphs.begin(), handler.glyphs.end(), 0) !=
+          handler.glyphs.end()) {
+    return false;
+  }
+
+  auto glyph_count = handler.glyphs.size();
+  SkTextBlobBuilder builder;
+  const auto& run_buffer = builder.allocRunPos(handler.font, glyph_count);
+  std::copy(handler.glyphs.begin(), handler.glyphs.end(), run_buffer.glyphs);
+  std::copy(handler.positions.begin(), handler.positions.end(),
+            run_buffer.points());
+  line->blob = builder.make();
+  line->font = handler.font;
+  line->last_glyph_x = handler.positions[glyph_count - 1].fX;
+  line->glyphs = std::move(handler.glyphs);
+  line->width = handler.advance.fX;
+
+  // The line metrics of a paragraph made of this one run, see
+  // Run::calculateMetrics and InternalLineMetrics
+  SkFontMetrics font_metrics;
+  line->font.getMetrics(&font_metrics);
+  auto ascent = font_metrics.fAscent - font_metrics.fLeading / 2;
+  auto descent = font_metrics.fDescent + font_metrics.fLeading / 2;
+  line->alphabetic_baseline = -ascent;
+  line->ideographic_baseline = descent - ascent;
+  line->height = ::round((double)descent - ascent);
+  return true;
+}
+
+// The layout of a single line of text, shaped without a paragraph when it is
+// simple. Both kinds are kept in the paragraph cache.
+static std::shared_ptr<const TextLineLayout> skiac_find_or_shape_line(
+    skiac_font_collection* c_collection,
+    const TextShapeStyle& shape_style,
+    const char* text,
+    size_t text_len) {
+  auto& paragraph_cache = c_collection->paragraph_cache;
+  std::string cache_key;
+  if (paragraph_cache.capacity > 0) {
+    cache_key = shape_style.cacheKey(text, text_len, nullptr);
+    if (auto layout = paragraph_cache.find(cache_key)) {
+      return layout;
+    }
+  }
+  auto line = std::make_shared<TextLineLayout>();
+  if (!skiac_shape_simple_line(c_collection, shape_style, text, text_len,
+                               line.get())) {
+    *line = skiac_paragraph_line(skiac_build_paragraph(
+        c_collection, shape_style, text, text_len, nullptr));
+  }
+  if (paragraph_cache.capacity > 0) {
+    paragraph_cache.insert(std::move(cache_key), line);
+  }
+  return line;
+}
+
 void skiac_canvas_get_line_metrics_or_draw_text(
     const char* text,
     size_t text_len,
@@ -492,161 +1048,41 @@ void skiac_canvas_get_line_metrics_or_draw_text(
     int variant_caps,
     const char* lang,
     int text_rendering) {
-  auto font_collection = c_collection->collection;
-  auto font_style = SkFontStyle(weight, stretch, (SkFontStyle::Slant)slant);
   auto text_direction = (TextDirection)direction;
-  skia_private::TArray<SkString> families;
-  SkStrSplit(font_family, ",", &families);
-  TextStyle text_style;
-  std::vector<SkString> families_vec;
-  for (auto family : families) {
-    families_vec.emplace_back(family);
-  }
-  text_style.setFontFamilies(families_vec);
-  text_style.setFontSize(font_size);
-  text_style.setWordSpacing(world_spacing);
-  text_style.setLetterSpacing(letter_spacing);
-  text_style.setHeight(1);
-  text_style.setFontStyle(font_style);
-
-  std::vector<SkFontArguments::VariationPosition::Coordinate> coords;
-
-  // Apply variable font variations if provided
-  if (variations && variations_count > 0) {
-    coords.reserve(variations_count + 1);
-    for (int i = 0; i < variations_count; i++) {
-      coords.push_back({variations[i].tag, variations[i].value});
-    }
-  }
-
-  // Apply font stretch as 'wdth' variation for variable fonts
-  // 'wdth' tag = 0x77647468
-  if (stretch_width != 100.0f) {
-    coords.push_back({SkSetFourByteTag('w', 'd', 't', 'h'), stretch_width});
-  }
-
-  if (!coords.empty()) {
-    SkFontArguments font_args;
-    font_args.setVariationDesignPosition(
-        {coords.data(), static_cast<int>(coords.size())});
-    text_style.setFontArguments(std::make_optional(font_args));
-  }
-
-  // Apply font kerning feature
-  // kerning: 0=auto (don't set feature), 1=none (disable), 2=normal (enable)
-  if (kerning == 1) {
-    text_style.addFontFeature(SkString("kern"), 0);
-  } else if (kerning == 2) {
-    text_style.addFontFeature(SkString("kern"), 1);
-  }
-
-  // TODO: Support fontFeatureSettings
-  // Apply font variant caps features
-  // variant_caps: 0=normal, 1=small-caps, 2=all-small-caps, 3=petite-caps,
-  // 4=all-petite-caps, 5=unicase, 6=titling-caps
-  if (variant_caps == 1) {
-    // small-caps
-    text_style.addFontFeature(SkString("smcp"), 1);
-  } else if (variant_caps == 2) {
-    // all-small-caps
-    text_style.addFontFeature(SkString("smcp"), 1);
-    text_style.addFontFeature(SkString("c2sc"), 1);
-  } else if (variant_caps == 3) {
-    // petite-caps
-    text_style.addFontFeature(SkString("pcap"), 1);
-  } else if (variant_caps == 4) {
-    // all-petite-caps
-    text_style.addFontFeature(SkString("pcap"), 1);
-    text_style.addFontFeature(SkString("c2pc"), 1);
-  } else if (variant_caps == 5) {
-    // unicase
-    text_style.addFontFeature(SkString("unic"), 1);
-  } else if (variant_caps == 6) {
-    // titling-caps
-    text_style.addFontFeature(SkString("titl"), 1);
-  }
-
-  // Apply language/locale for language-specific glyph variants
-  // lang: BCP-47 language tag (e.g., "en", "tr", "zh-Hans") or
-  // nullptr/"inherit"
-  if (lang != nullptr && strcmp(lang, "") != 0 &&
-      strcmp(lang, "inherit") != 0) {
-    text_style.setLocale(SkString(lang));
-
-    // Turkish/Azerbaijani locale: disable standard and contextual ligatures
-    // These languages have a dotless i (ı) as a separate letter from dotted i.
-    // The "fi" ligature would incorrectly merge "f" with "i", obscuring the dot
-    // which is semantically significant. Browsers disable common ligatures
-    // (liga + clig) for these locales per MDN CanvasRenderingContext2D.lang
-    // spec. Use case-insensitive comparison per BCP-47 (RFC 5646).
-    if ((strncasecmp(lang, "tr", 2) == 0 || strncasecmp(lang, "az", 2) == 0) &&
-        (lang[2] == '\0' || lang[2] == '-' || lang[2] == '_')) {
-      text_style.addFontFeature(SkString("liga"), 0);
-      text_style.addFontFeature(SkString("clig"), 0);
-    }
-  }
-
-  // Apply textRendering: only optimizeSpeed changes behavior.
-  // Per Chromium's implementation in font_features.cc, textRendering does NOT
-  // affect kerning - that's controlled solely by fontKerning.
-  // textRendering only affects ligatures (liga, clig) and contextual alternates
-  // (calt) when set to optimizeSpeed.
-  // text_rendering: 0=auto, 1=optimizeSpeed, 2=optimizeLegibility,
-  // 3=geometricPrecision
-  if (text_rendering == 1) {
-    // optimizeSpeed: disable ligatures and contextual alternates for speed
-    // Note: kern is NOT touched here - it's fontKerning's responsibility
-    text_style.addFontFeature(SkString("liga"), 0);
-    text_style.addFontFeature(SkString("clig"), 0);
-    text_style.addFontFeature(SkString("calt"), 0);
-  }
-  // auto, optimizeLegibility, geometricPrecision: use HarfBuzz/Skia defaults
-  // (liga, clig, calt are ON by default)
-
-  text_style.setForegroundColor(*PAINT_CAST);
-  text_style.setTextBaseline(TextBaseline::kAlphabetic);
-  StrutStyle struct_style;
-  struct_style.setLeading(0);
-
-  ParagraphStyle paragraph_style;
-  paragraph_style.setTextStyle(text_style);
-  paragraph_style.setTextDirection(text_direction);
-  paragraph_style.setStrutStyle(struct_style);
-  ParagraphBuilderImpl builder(paragraph_style, font_collection,
-                               SkUnicodes::ICU::Make());
-  builder.addText(text, text_len);
-  auto paragraph = static_cast<ParagraphImpl*>(builder.Build().release());
-  paragraph->layout(MAX_LAYOUT_WIDTH);
-  std::vector<LineMetrics> metrics_vec;
-  paragraph->getLineMetrics(metrics_vec);
-  auto line_metrics = metrics_vec[0];
-  auto run = paragraph->run(0);
-  auto font = run.font();
+  const TextShapeStyle shape_style{
+      font_size,
+      weight,
+      stretch,
+      stretch_width,
+      slant,
+      font_family,
+      direction,
+      letter_spacing,
+      world_spacing,
+      variations,
+      variations_count,
+      kerning,
+      variant_caps,
+      lang,
+      text_rendering,
+  };
+  auto layout =
+      skiac_find_or_shape_line(c_collection, shape_style, text, text_len);
+  const auto& line = *layout;
+  const auto& font = line.font;
   SkFontMetrics font_metrics;
   font.getMetrics(&font_metrics);
-  std::vector<SkRect> bounds(text_len);
-  auto glyphs = run.glyphs();
+  const auto& glyphs = line.glyphs;
   auto glyphs_size = glyphs.size();
+  std::vector<SkRect> bounds(glyphs_size);
   font.getBounds(glyphs, bounds, PAINT_CAST);
 
-  // line_metrics.fWidth doesn't contain the suffix spaces
-  // run.calculateWidth will return 0 if font is rendering as fallback
-  //
-  // So we use `getMaxIntrinsicWidth()` to get the `line_width`.
-  // - For single-run text without internal spaces: uses run.advance().fX from
-  // HarfBuzz shaping
-  // - For text with internal spaces or multiple runs: uses TextWrapper's
-  // cluster-based calculation Both are direction-independent and include
-  // trailing spaces.
-  //
-  // Note: Using `getRectsForRange()` may cause `measureText.width` to return
-  // different values for LTR and RTL layouts.
-  auto line_width = paragraph->getMaxIntrinsicWidth();
+  auto line_width = line.width;
   auto first_char_bounds = bounds[0];
   auto descent = first_char_bounds.fBottom;
   auto ascent = first_char_bounds.fTop;
   auto last_char_bounds = bounds[glyphs_size - 1];
-  auto last_char_pos_x = run.positionX(glyphs_size - 1);
+  auto last_char_pos_x = line.last_glyph_x;
 
   for (size_t i = 1; i <= glyphs_size - 1; ++i) {
     auto char_bounds = bounds[i];
@@ -659,7 +1095,7 @@ void skiac_canvas_get_line_metrics_or_draw_text(
       ascent = char_top;
     }
   }
-  auto alphabetic_baseline = paragraph->getAlphabeticBaseline();
+  auto alphabetic_baseline = line.alphabetic_baseline;
   auto css_baseline = (CssBaseline)baseline;
   SkScalar baseline_offset = 0;
   switch (css_baseline) {
@@ -679,13 +1115,13 @@ void skiac_canvas_get_line_metrics_or_draw_text(
           font_metrics.fAscent * HANGING_AS_PERCENT_OF_ASCENT / 100.0;
       break;
     case CssBaseline::Middle:
-      baseline_offset = -paragraph->getHeight() / 2;
+      baseline_offset = -line.height / 2;
       break;
     case CssBaseline::Alphabetic:
       baseline_offset = -alphabetic_baseline;
       break;
     case CssBaseline::Ideographic:
-      baseline_offset = -paragraph->getIdeographicBaseline();
+      baseline_offset = -line.ideographic_baseline;
       break;
     case CssBaseline::Bottom:
       baseline_offset = -alphabetic_baseline + font_metrics.fStrikeoutPosition +
@@ -715,7 +1151,7 @@ void skiac_canvas_get_line_metrics_or_draw_text(
   // Blink CL: https://chromium-review.googlesource.com/c/chromium/src/+/6399436
   // Skia CL: https://skia-review.googlesource.com/c/skia/+/1099477
   float letter_spacing_offset =
-      (text_direction == TextDirection::kLtr && !run.isCursiveScript())
+      (text_direction == TextDirection::kLtr && !line.cursive_script)
           ? -letter_spacing / 2
           : 0.0f;
 
@@ -752,17 +1188,26 @@ void skiac_canvas_get_line_metrics_or_draw_text(
     float final_x = need_scale ? (paint_x + (1 - ratio) * offset_x) / ratio -
                                      rtl_offset + letter_spacing_offset
                                : paint_x - rtl_offset + letter_spacing_offset;
-    paragraph->paint(CANVAS_CAST, final_x, y + baseline_offset);
+    if (line.paragraph) {
+      PaintOverrideParagraphPainter painter(CANVAS_CAST, *PAINT_CAST);
+      line.paragraph->paint(&painter, final_x, y + baseline_offset);
+    } else {
+      // TextLine snaps the baseline of its runs to whole pixels
+      auto blob_y = y + baseline_offset +
+                    SkScalarFloorToScalar(alphabetic_baseline + 0.5f);
+      CANVAS_CAST->drawTextBlob(line.blob, final_x, blob_y, *PAINT_CAST);
+    }
     if (need_scale) {
       CANVAS_CAST->restore();
     }
-  } else {
+  }
+  if (c_line_metrics) {
     auto offset = -baseline_offset - alphabetic_baseline;
     float metrics_paint_x = paint_x + letter_spacing_offset;
     c_line_metrics->ascent = -ascent + offset;
     c_line_metrics->descent = descent - offset;
     c_line_metrics->left =
-        -metrics_paint_x + line_metrics.fLeft - first_char_bounds.fLeft;
+        -metrics_paint_x + line.left - first_char_bounds.fLeft;
     c_line_metrics->right =
         metrics_paint_x + last_char_pos_x + last_char_bounds.fRight;
     c_line_metrics->width = line_width;
@@ -770,7 +1215,205 @@ void skiac_canvas_get_line_metrics_or_draw_text(
     c_line_metrics->font_descent = font_metrics.fDescent - offset;
     c_line_metrics->alphabetic_baseline = -font_metrics.fAscent + offset;
   }
-  delete paragraph;
+}
+
+// Shaped glyph runs of a line of text, positioned relative to the point the
+// text was laid out for (textAlign / textBaseline already applied)
+struct skiac_text_blob {
+  std::vector<std::pair<sk_sp<SkTextBlob>, SkPoint>> runs;
+};
+
+// Keeps the glyph runs drawn onto it instead of rasterizing them
+class TextBlobRecordingCanvas : public SkNoDrawCanvas {
+ public:
+  explicit TextBlobRecordingCanvas(skiac_text_blob* text_blob)
+      : SkNoDrawCanvas(MAX_LAYOUT_WIDTH, MAX_LAYOUT_WIDTH),
+        fTextBlob(text_blob) {}
+
+ protected:
+  void onDrawTextBlob(const SkTextBlob* blob,
+                      SkScalar x,
+                      SkScalar y,
+                      const SkPaint&) override {
+    fTextBlob->runs.emplace_back(sk_ref_sp(blob),
+                                 this->getTotalMatrix().mapXY(x, y));
+  }
+
+ private:
+  skiac_text_blob* fTextBlob;
+};
+
+skiac_text_blob* skiac_text_blob_make(const char* text,
+                                      size_t text_len,
+                                      skiac_font_collection* c_collection,
+                                      float font_size,
+                                      int weight,
+                                      int stretch,
+                                      float stretch_width,
+                                      int slant,
+                                      const char* font_family,
+                                      int baseline,
+                                      int align,
+                                      int direction,
+                                      float letter_spacing,
+                                      float world_spacing,
+                                      const skiac_font_variation* variations,
+                                      int variations_count,
+                                      int kerning,
+                                      int variant_caps,
+                                      const char* lang,
+                                      int text_rendering,
+                                      skiac_line_metrics* c_line_metrics) {
+  auto text_blob = new skiac_text_blob();
+  if (text_len == 0) {
+    return text_blob;
+  }
+  // Lay out exactly like fillText at (0, 0), recording the glyph runs and
+  // the metrics of the same line
+  TextBlobRecordingCanvas recorder(text_blob);
+  SkPaint paint;
+  skiac_canvas_get_line_metrics_or_draw_text(
+      text, text_len, std::numeric_limits<float>::max(), 0, 0, 0, c_collection,
+      font_size, weight, stretch, stretch_width, slant, font_family, baseline,
+      align, direction, letter_spacing, world_spacing,
+      reinterpret_cast<skiac_paint*>(&paint),
+      reinterpret_cast<skiac_canvas*>(&recorder), c_line_metrics, variations,
+      variations_count, kerning, variant_caps, lang, text_rendering);
+  return text_blob;
+}
+
+void skiac_text_blob_destroy(skiac_text_blob* c_text_blob) {
+  delete c_text_blob;
+}
+
+skiac_path* skiac_text_blob_to_path(skiac_text_blob* c_text_blob,
+                                    float x,
+                                    float y) {
+  auto c_path = new skiac_path();
+  for (const auto& [blob, origin] : c_text_blob->runs) {
+    SkTextBlob::Iter iter(*blob);
+    SkTextBlob::Iter::ExperimentalRun run;
+    while (iter.experimentalNext(&run)) {
+      glyph_path_cache.addGlyphs(run.font, {run.glyphs, (size_t)run.count},
+                                 run.positions,
+                                 {x + origin.fX, y + origin.fY},
+                                 &c_path->builder);
+    }
+  }
+  return c_path;
+}
+
+void skiac_canvas_draw_text_blob(skiac_canvas* c_canvas,
+                                 skiac_text_blob* c_text_blob,
+                                 float x,
+                                 float y,
+                                 skiac_paint* c_paint) {
+  for (const auto& [blob, origin] : c_text_blob->runs) {
+    CANVAS_CAST->drawTextBlob(blob, x + origin.fX, y + origin.fY, *PAINT_CAST);
+  }
+}
+
+void skiac_canvas_get_text_block_metrics_or_draw_text(
+    const char* text,
+    size_t text_len,
+    float x,
+    float y,
+    const skiac_text_block* block,
+    skiac_font_collection* c_collection,
+    float font_size,
+    int weight,
+    int stretch,
+    float stretch_width,
+    int slant,
+    const char* font_family,
+    int baseline,
+    int direction,
+    float letter_spacing,
+    float world_spacing,
+    skiac_paint* c_paint,
+    skiac_canvas* c_canvas,
+    skiac_text_block_metrics* c_metrics,
+    const skiac_font_variation* variations,
+    int variations_count,
+    int kerning,
+    int variant_caps,
+    const char* lang,
+    int text_rendering) {
+  const TextShapeStyle shape_style{
+      font_size,
+      weight,
+      stretch,
+      stretch_width,
+      slant,
+      font_family,
+      direction,
+      letter_spacing,
+      world_spacing,
+      variations,
+      variations_count,
+      kerning,
+      variant_caps,
+      lang,
+      text_rendering,
+  };
+  auto paragraph = skiac_find_or_build_paragraph(c_collection, shape_style,
+                                                 text, text_len, block);
+  if (c_metrics) {
+    c_metrics->width = paragraph->getLongestLine();
+    c_metrics->height = paragraph->getHeight();
+    c_metrics->line_count = paragraph->lineNumber();
+    c_metrics->did_exceed_max_lines = paragraph->didExceedMaxLines();
+  }
+  if (!c_canvas) {
+    return;
+  }
+
+  // `x` is the alignment line of the block, like textAlign for fillText
+  auto layout_width = paragraph->getMaxWidth();
+  auto text_align = (TextAlign)block->align;
+  auto is_rtl = (TextDirection)direction == TextDirection::kRtl;
+  bool is_right_aligned =
+      text_align == TextAlign::kRight ||
+      ((text_align == TextAlign::kStart || text_align == TextAlign::kJustify) &&
+       is_rtl) ||
+      (text_align == TextAlign::kEnd && !is_rtl);
+  float paint_x = x;
+  if (text_align == TextAlign::kCenter) {
+    paint_x = x - layout_width / 2;
+  } else if (is_right_aligned) {
+    paint_x = x - layout_width;
+  }
+
+  // `y` follows textBaseline: the edges or middle of the whole block, or the
+  // baselines of its first line
+  float paint_y = y;
+  std::vector<LineMetrics> metrics_vec;
+  paragraph->getLineMetrics(metrics_vec);
+  switch ((CssBaseline)baseline) {
+    case CssBaseline::Top:
+      break;
+    case CssBaseline::Hanging:
+      if (!metrics_vec.empty()) {
+        paint_y = y - metrics_vec[0].fBaseline +
+                  metrics_vec[0].fAscent * HANGING_AS_PERCENT_OF_ASCENT / 100.0;
+      }
+      break;
+    case CssBaseline::Middle:
+      paint_y = y - paragraph->getHeight() / 2;
+      break;
+    case CssBaseline::Alphabetic:
+      paint_y = y - paragraph->getAlphabeticBaseline();
+      break;
+    case CssBaseline::Ideographic:
+      paint_y = y - paragraph->getIdeographicBaseline();
+      break;
+    case CssBaseline::Bottom:
+      paint_y = y - paragraph->getHeight();
+      break;
+  }
+
+  PaintOverrideParagraphPainter painter(CANVAS_CAST, *PAINT_CAST);
+  paragraph->paint(&painter, paint_x, paint_y);
 }
 
 void skiac_canvas_reset_transform(skiac_canvas* c_canvas) {
@@ -1073,6 +1716,156 @@ void skiac_picture_playback(skiac_picture* c_picture, skiac_canvas* c_canvas) {
       reinterpret_cast<SkCanvas*>(c_canvas));
 }
 
+size_t skiac_picture_approximate_bytes_used(skiac_picture* c_picture) {
+  return reinterpret_cast<SkPicture*>(c_picture)->approximateBytesUsed();
+}
+
+void skiac_picture_get_cull_rect(skiac_picture* c_picture,
+                                 skiac_rect* c_rect) {
+  auto rect = reinterpret_cast<SkPicture*>(c_picture)->cullRect();
+  c_rect->left = rect.left();
+  c_rect->top = rect.top();
+  c_rect->right = rect.right();
+  c_rect->bottom = rect.bottom();
+}
+
+// Images keep their original encoded bytes, or are encoded as PNG, so the
+// picture does not depend on the image files it was drawn from.
+static sk_sp<const SkData> skiac_serialize_image(SkImage* image, void*) {
+  if (auto encoded = image->refEncodedData()) {
+    return encoded;
+  }
+  return SkPngEncoder::Encode(nullptr, image, SkPngEncoder::Options());
+}
+
+// How a typeface is written into a serialized picture
+enum class SerializedTypeface : uint8_t {
+  // Family, style and variation coordinates, resolved again on deserialize
+  kReference = 0,
+  // The whole font, see SkTypeface::serialize
+  kEmbedded = 1,
+};
+
+// `ctx` points to whether fonts are embedded, otherwise they are referenced
+static sk_sp<SkData> skiac_serialize_typeface(SkTypeface* typeface,
+                                              void* ctx) {
+  SkDynamicMemoryWStream stream;
+  if (*static_cast<bool*>(ctx)) {
+    stream.write8(static_cast<uint8_t>(SerializedTypeface::kEmbedded));
+    typeface->serialize(&stream,
+                        SkTypeface::SerializeBehavior::kDoIncludeData);
+    return stream.detachAsData();
+  }
+  stream.write8(static_cast<uint8_t>(SerializedTypeface::kReference));
+  SkString family;
+  typeface->getFamilyName(&family);
+  stream.writePackedUInt(family.size());
+  stream.write(family.c_str(), family.size());
+  auto style = typeface->fontStyle();
+  stream.write32(style.weight());
+  stream.write32(style.width());
+  stream.write32(style.slant());
+  auto count = std::max(typeface->getVariationDesignPosition({}), 0);
+  std::vector<SkFontArguments::VariationPosition::Coordinate> coords(count);
+  typeface->getVariationDesignPosition(coords);
+  stream.write32(coords.size());
+  for (const auto& coord : coords) {
+    stream.write32(coord.axis);
+    stream.writeScalar(coord.value);
+  }
+  return stream.detachAsData();
+}
+
+static sk_sp<SkImage> skiac_deserialize_image(const void* data,
+                                              size_t length,
+                                              void*) {
+  auto codec = SkCodec::MakeFromData(SkData::MakeWithCopy(data, length));
+  if (!codec) {
+    return nullptr;
+  }
+  return std::get<0>(codec->getImage());
+}
+
+// Embedded fonts are loaded, referenced ones are looked up in the collection
+// `ctx` like text drawn with their family and style
+static sk_sp<SkTypeface> skiac_deserialize_typeface(const void* data,
+                                                    size_t length,
+                                                    void* ctx) {
+  SkMemoryStream stream(data, length, false);
+  auto collection = reinterpret_cast<skiac_font_collection*>(ctx);
+  uint8_t kind;
+  if (!stream.readU8(&kind)) {
+    return nullptr;
+  }
+  if (kind == static_cast<uint8_t>(SerializedTypeface::kEmbedded)) {
+    return SkTypeface::MakeDeserialize(&stream, collection->font_mgr);
+  }
+  size_t family_len;
+  if (kind != static_cast<uint8_t>(SerializedTypeface::kReference) ||
+      !stream.readPackedUInt(&family_len) ||
+      family_len > stream.getLength() - stream.getPosition()) {
+    return nullptr;
+  }
+  SkString family(family_len);
+  int32_t weight, width, slant;
+  uint32_t count;
+  if (stream.read(family.data(), family_len) != family_len ||
+      !stream.readS32(&weight) || !stream.readS32(&width) ||
+      !stream.readS32(&slant) || !stream.readU32(&count) ||
+      count > (stream.getLength() - stream.getPosition()) / 8) {
+    return nullptr;
+  }
+  std::vector<SkFontArguments::VariationPosition::Coordinate> coords(count);
+  for (auto& coord : coords) {
+    if (!stream.readU32(&coord.axis) || !stream.readScalar(&coord.value)) {
+      return nullptr;
+    }
+  }
+  if (collection->fallback) {
+    collection->syncFallback();
+  }
+  SkFontStyle style(weight, width, (SkFontStyle::Slant)slant);
+  auto typefaces =
+      collection->collection->findTypefaces({family}, style, std::nullopt);
+  if (typefaces.empty()) {
+    return nullptr;
+  }
+  auto typeface = typefaces.front();
+  if (coords.empty()) {
+    return typeface;
+  }
+  SkFontArguments args;
+  args.setVariationDesignPosition(
+      {coords.data(), static_cast<int>(coords.size())});
+  return typeface->makeClone(args);
+}
+
+void skiac_picture_serialize(skiac_picture* c_picture,
+                             bool embed_fonts,
+                             skiac_sk_data* data) {
+  SkSerialProcs procs;
+  procs.fImageProc = skiac_serialize_image;
+  procs.fTypefaceProc = skiac_serialize_typeface;
+  procs.fTypefaceCtx = &embed_fonts;
+  auto sk_data = reinterpret_cast<SkPicture*>(c_picture)->serialize(&procs);
+  if (sk_data) {
+    data->ptr = sk_data->bytes();
+    data->size = sk_data->size();
+    data->data = reinterpret_cast<skiac_data*>(sk_data.release());
+  }
+}
+
+skiac_picture* skiac_picture_deserialize(const uint8_t* data,
+                                         size_t length,
+                                         skiac_font_collection* c_collection) {
+  SkDeserialProcs procs;
+  procs.fImageProc = skiac_deserialize_image;
+  procs.fTypefaceProc = skiac_deserialize_typeface;
+  procs.fTypefaceCtx = c_collection;
+  auto picture = SkPicture::MakeFromData(data, length, &procs);
+  return reinterpret_cast<skiac_picture*>(picture.release());
+}
+
 // SkPictureRecorder
 skiac_picture_recorder* skiac_picture_recorder_create() {
   return reinterpret_cast<skiac_picture_recorder*>(new SkPictureRecorder());
@@ -1871,6 +2664,18 @@ void skiac_canvas_draw_sk_image(skiac_canvas* c_canvas,
 
 // SkData
 
+bool skiac_sk_data_from_file(const char* path, skiac_sk_data* c_data) {
+  // Memory-mapped when the platform supports it
+  auto data = SkData::MakeFromFileName(path);
+  if (!data) {
+    return false;
+  }
+  c_data->ptr = data->bytes();
+  c_data->size = data->size();
+  c_data->data = reinterpret_cast<skiac_data*>(data.release());
+  return true;
+}
+
 void skiac_sk_data_destroy(skiac_data* c_data) {
   auto data = reinterpret_cast<SkData*>(c_data);
   data->unref();
@@ -1878,29 +2683,20 @@ void skiac_sk_data_destroy(skiac_data* c_data) {
 
 // Bitmap
 
-void skiac_bitmap_make_from_buffer(const uint8_t* ptr,
-                                   size_t size,
-                                   skiac_bitmap_info* bitmap_info) {
-  auto data = SkData::MakeWithoutCopy(reinterpret_cast<const void*>(ptr), size);
-  auto codec = SkCodec::MakeFromData(data);
-  auto info = codec->getInfo();
-  auto row_bytes = info.minRowBytes();
-  auto bitmap = new SkBitmap();
-  bitmap->allocPixels(info);
-  codec->getPixels(info, bitmap->getPixels(), row_bytes);
-  auto dimension = codec->dimensions();
-  auto origin = codec->getOrigin();
-  auto width = dimension.width();
-  auto height = dimension.height();
+// Applies the EXIF orientation of a decoded bitmap and hands ownership of the
+// result to bitmap_info.
+static void skiac_bitmap_apply_origin(SkBitmap* bitmap,
+                                      SkEncodedOrigin origin,
+                                      skiac_bitmap_info* bitmap_info) {
+  auto info = bitmap->info();
+  auto width = bitmap->width();
+  auto height = bitmap->height();
   // https://github.com/chromium/chromium/blob/126.0.6423.1/third_party/blink/renderer/platform/graphics/image.cc#L124
   // need to create a new bitmap with the correct orientation
   if (origin != SkEncodedOrigin::kTopLeft_SkEncodedOrigin) {
-    if (origin == SkEncodedOrigin::kLeftTop_SkEncodedOrigin ||
-        origin == SkEncodedOrigin::kRightTop_SkEncodedOrigin ||
-        origin == SkEncodedOrigin::kRightBottom_SkEncodedOrigin ||
-        origin == SkEncodedOrigin::kLeftBottom_SkEncodedOrigin) {
-      width = height;
-      height = dimension.width();
+    if (SkEncodedOriginSwapsWidthHeight(origin)) {
+      width = bitmap->height();
+      height = bitmap->width();
     }
     auto oriented_bitmap = new SkBitmap();
     auto oriented_bitmap_info =
@@ -1923,14 +2719,166 @@ void skiac_bitmap_make_from_buffer(const uint8_t* ptr,
   bitmap_info->height = height;
 }
 
-bool skiac_bitmap_make_from_svg(const uint8_t* data,
-                                size_t length,
-                                float width,
-                                float height,
-                                skiac_bitmap_info* bitmap_info,
-                                skiac_font_collection* c_collection,
-                                uint8_t cs) {
-  auto color_space = COLOR_SPACE_CAST;
+// Resamples a decoded bitmap to the given size, taking ownership of it.
+static SkBitmap* skiac_bitmap_resize(SkBitmap* bitmap, SkISize size) {
+  if (bitmap->dimensions() == size) {
+    return bitmap;
+  }
+  auto resized = new SkBitmap();
+  resized->allocPixels(bitmap->info().makeDimensions(size));
+  bitmap->pixmap().scalePixels(resized->pixmap(),
+                               SkSamplingOptions(SkCubicResampler::Mitchell()));
+  delete bitmap;
+  return resized;
+}
+
+void skiac_bitmap_make_from_buffer(const uint8_t* ptr,
+                                   size_t size,
+                                   skiac_bitmap_info* bitmap_info) {
+  auto data = SkData::MakeWithoutCopy(reinterpret_cast<const void*>(ptr), size);
+  auto codec = SkCodec::MakeFromData(data);
+  auto info = codec->getInfo();
+  auto row_bytes = info.minRowBytes();
+  auto bitmap = new SkBitmap();
+  bitmap->allocPixels(info);
+  codec->getPixels(info, bitmap->getPixels(), row_bytes);
+  skiac_bitmap_apply_origin(bitmap, codec->getOrigin(), bitmap_info);
+}
+
+void skiac_bitmap_make_from_buffer_with_max_size(
+    const uint8_t* ptr,
+    size_t size,
+    int max_width,
+    int max_height,
+    skiac_bitmap_info* bitmap_info) {
+  auto data = SkData::MakeWithoutCopy(reinterpret_cast<const void*>(ptr), size);
+  auto codec = SkAndroidCodec::MakeFromData(data);
+  if (!codec) {
+    return;
+  }
+  auto origin = codec->codec()->getOrigin();
+  auto dimensions = codec->getInfo().dimensions();
+  // The limits are given in display orientation, the codec decodes in encoded
+  // orientation.
+  if (SkEncodedOriginSwapsWidthHeight(origin)) {
+    std::swap(max_width, max_height);
+  }
+  auto scale = 1.0f;
+  if (max_width > 0) {
+    scale = std::min(scale, (float)max_width / dimensions.width());
+  }
+  if (max_height > 0) {
+    scale = std::min(scale, (float)max_height / dimensions.height());
+  }
+  auto target = SkISize::Make(
+      std::max(1, (int)std::round(dimensions.width() * scale)),
+      std::max(1, (int)std::round(dimensions.height() * scale)));
+  // Let the codec skip work natively (DCT scaling for JPEG, subsampling for
+  // the others); the sampled size is the smallest one not below the target.
+  auto sampled = dimensions;
+  SkAndroidCodec::AndroidOptions options;
+  if (scale < 1.0f) {
+    sampled = target;
+    options.fSampleSize = codec->computeSampleSize(&sampled);
+  }
+  auto info = codec->getInfo().makeDimensions(sampled);
+  auto bitmap = new SkBitmap();
+  bitmap->allocPixels(info);
+  auto result = codec->getAndroidPixels(info, bitmap->getPixels(),
+                                        bitmap->rowBytes(), &options);
+  if (result != SkCodec::kSuccess && result != SkCodec::kIncompleteInput &&
+      result != SkCodec::kErrorInInput) {
+    delete bitmap;
+    return;
+  }
+  // Sample sizes are coarse, finish the last step with a cubic resample.
+  bitmap = skiac_bitmap_resize(bitmap, target);
+  skiac_bitmap_apply_origin(bitmap, origin, bitmap_info);
+}
+
+bool skiac_bitmap_make_from_buffer_region(const uint8_t* ptr,
+                                          size_t size,
+                                          int x,
+                                          int y,
+                                          int width,
+                                          int height,
+                                          float scale,
+                                          skiac_bitmap_info* bitmap_info) {
+  auto data = SkData::MakeWithoutCopy(reinterpret_cast<const void*>(ptr), size);
+  auto codec = SkAndroidCodec::MakeFromData(data);
+  if (!codec) {
+    return false;
+  }
+  auto origin = codec->codec()->getOrigin();
+  auto dimensions = codec->getInfo().dimensions();
+  auto oriented = SkEncodedOriginSwapsWidthHeight(origin)
+                      ? SkISize::Make(dimensions.height(), dimensions.width())
+                      : dimensions;
+  auto region = SkIRect::MakeXYWH(x, y, width, height);
+  if (!region.intersect(SkIRect::MakeSize(oriented))) {
+    return false;
+  }
+  // The region is given in display orientation, map it back to the encoded
+  // pixels.
+  SkMatrix inverse;
+  if (!SkEncodedOriginToMatrix(origin, oriented.width(), oriented.height())
+           .invert(&inverse)) {
+    return false;
+  }
+  auto subset = inverse.mapRect(SkRect::Make(region)).round();
+  // Some codecs (WebP) only decode from even offsets and widen the subset.
+  auto supported = subset;
+  if (!codec->getSupportedSubset(&supported)) {
+    supported = subset;
+  }
+  auto sample_size = std::max(1, (int)std::floor(1.0f / scale));
+  auto sampled = codec->getSampledSubsetDimensions(sample_size, supported);
+  if (sampled.isEmpty()) {
+    return false;
+  }
+  // Scanline codecs skip the rows and columns outside of the subset, so only
+  // the region is ever held in memory.
+  SkAndroidCodec::AndroidOptions options;
+  options.fSubset = &supported;
+  options.fSampleSize = sample_size;
+  auto info = codec->getInfo().makeDimensions(sampled);
+  auto bitmap = new SkBitmap();
+  bitmap->allocPixels(info);
+  auto result = codec->getAndroidPixels(info, bitmap->getPixels(),
+                                        bitmap->rowBytes(), &options);
+  if (result != SkCodec::kSuccess && result != SkCodec::kIncompleteInput &&
+      result != SkCodec::kErrorInInput) {
+    delete bitmap;
+    return false;
+  }
+  if (supported != subset) {
+    auto crop = SkIRect::MakeXYWH(
+        (subset.x() - supported.x()) / sample_size,
+        (subset.y() - supported.y()) / sample_size,
+        std::max(1, subset.width() / sample_size),
+        std::max(1, subset.height() / sample_size));
+    auto cropped = new SkBitmap();
+    if (!crop.intersect(SkIRect::MakeSize(sampled)) ||
+        !bitmap->extractSubset(cropped, crop)) {
+      delete cropped;
+      delete bitmap;
+      return false;
+    }
+    delete bitmap;
+    bitmap = cropped;
+  }
+  auto target = SkISize::Make(
+      std::max(1, (int)std::round(subset.width() * scale)),
+      std::max(1, (int)std::round(subset.height() * scale)));
+  bitmap = skiac_bitmap_resize(bitmap, target);
+  skiac_bitmap_apply_origin(bitmap, origin, bitmap_info);
+  return true;
+}
+
+bool skiac_svg_picture_make(const uint8_t* data,
+                            size_t length,
+                            skiac_font_collection* c_collection,
+                            skiac_svg_picture* c_svg_picture) {
   SkMemoryStream svg_stream(data, length, false);
   auto svg_dom =
       SkSVGDOM::Builder().setFontManager(c_collection->assets).make(svg_stream);
@@ -1951,24 +2899,41 @@ bool skiac_bitmap_make_from_svg(const uint8_t* data,
     }
     svg_dom->setContainerSize(svg_container_size);
   }
-  auto image_w = svg_container_size.width();
-  auto image_h = svg_container_size.height();
-  if (width > 0 && height > 0) {
-    svg_root->setTransform(SkMatrix::Scale(width / image_w, height / image_h));
-    image_w = width;
-    image_h = height;
+  // Record the document once, drawing replays it as vectors at any scale.
+  SkPictureRecorder recorder;
+  auto canvas = recorder.beginRecording(SkRect::MakeSize(svg_container_size));
+  svg_dom->render(canvas);
+  c_svg_picture->picture = reinterpret_cast<skiac_picture*>(
+      recorder.finishRecordingAsPicture().release());
+  c_svg_picture->width = svg_container_size.width();
+  c_svg_picture->height = svg_container_size.height();
+  return true;
+}
+
+bool skiac_bitmap_make_from_picture(skiac_picture* c_picture,
+                                    float picture_width,
+                                    float picture_height,
+                                    int width,
+                                    int height,
+                                    skiac_bitmap_info* bitmap_info,
+                                    uint8_t cs) {
+  if (width <= 0 || height <= 0 || picture_width <= 0 ||
+      picture_height <= 0) {
+    return false;
   }
+  auto color_space = COLOR_SPACE_CAST;
   auto imageinfo =
-      SkImageInfo::Make(image_w, image_h, kRGBA_8888_SkColorType,
+      SkImageInfo::Make(width, height, kRGBA_8888_SkColorType,
                         SkAlphaType::kPremul_SkAlphaType, color_space);
   auto bitmap = new SkBitmap();
   bitmap->allocPixels(imageinfo);
-  auto sk_svg_canvas = new SkCanvas(*bitmap);
-  svg_dom->render(sk_svg_canvas);
-  delete sk_svg_canvas;
+  auto canvas = new SkCanvas(*bitmap);
+  canvas->scale(width / picture_width, height / picture_height);
+  canvas->drawPicture(reinterpret_cast<SkPicture*>(c_picture));
+  delete canvas;
   bitmap_info->bitmap = reinterpret_cast<skiac_bitmap*>(bitmap);
-  bitmap_info->width = imageinfo.width();
-  bitmap_info->height = imageinfo.height();
+  bitmap_info->width = width;
+  bitmap_info->height = height;
   return true;
 }
 
@@ -2028,6 +2993,15 @@ skiac_shader* skiac_bitmap_get_shader(
   return nullptr;
 }
 
+skiac_bitmap* skiac_bitmap_share(skiac_bitmap* c_bitmap) {
+  // SkBitmap copies share the same ref-counted pixel storage
+  return reinterpret_cast<skiac_bitmap*>(new SkBitmap(*BITMAP_CAST));
+}
+
+size_t skiac_bitmap_get_byte_size(skiac_bitmap* c_bitmap) {
+  return BITMAP_CAST->computeByteSize();
+}
+
 void skiac_bitmap_destroy(skiac_bitmap* c_bitmap) {
   delete BITMAP_CAST;
 }
@@ -2041,6 +3015,16 @@ skiac_font_collection* skiac_font_collection_create() {
   return new skiac_font_collection();
 }
 
+skiac_font_collection* skiac_font_collection_create_scoped(
+    skiac_font_collection* fallback) {
+  return new skiac_font_collection(fallback);
+}
+
+void skiac_font_collection_sync_fallback(
+    skiac_font_collection* c_font_collection) {
+  c_font_collection->syncFallback();
+}
+
 uint32_t skiac_font_collection_get_default_fonts_count(
     skiac_font_collection* c_font_collection) {
   return c_font_collection->assets->countFamilies();
@@ -2088,6 +3072,35 @@ uint32_t skiac_font_collection_register(
     typeface_id = c_font_collection->assets->registerTypefaceWithTracking(
         typeface_data, typeface);
   }
+  // A new family can change how cached families resolve or fall back
+  c_font_collection->invalidateCaches();
+  return typeface_id;
+}
+
+// Leaves the caches to the caller, a batch invalidates them once
+static uint32_t track_typeface_from_path(
+    skiac_font_collection* c_font_collection,
+    const char* font_path,
+    sk_sp<SkTypeface> typeface,
+    const char* name_alias) {
+  std::string path_str(font_path);
+  if (name_alias) {
+    auto alias = SkString(name_alias);
+    return c_font_collection->assets->registerTypefaceFromPathWithTracking(
+        path_str, typeface, alias);
+  }
+  return c_font_collection->assets->registerTypefaceFromPathWithTracking(
+      path_str, typeface);
+}
+
+static uint32_t register_typeface_from_path(
+    skiac_font_collection* c_font_collection,
+    const char* font_path,
+    sk_sp<SkTypeface> typeface,
+    const char* name_alias) {
+  auto typeface_id = track_typeface_from_path(c_font_collection, font_path,
+                                              std::move(typeface), name_alias);
+  c_font_collection->invalidateCaches();
   return typeface_id;
 }
 
@@ -2102,20 +3115,71 @@ uint32_t skiac_font_collection_register_from_path(
   if (!typeface) {
     return 0;
   }
+  return register_typeface_from_path(c_font_collection, font_path,
+                                     std::move(typeface), name_alias);
+}
 
-  std::string path_str(font_path);
-  uint32_t typeface_id;
-  if (name_alias) {
-    auto alias = SkString(name_alias);
-    typeface_id =
-        c_font_collection->assets->registerTypefaceFromPathWithTracking(
-            path_str, typeface, alias);
-  } else {
-    typeface_id =
-        c_font_collection->assets->registerTypefaceFromPathWithTracking(
-            path_str, typeface);
+// Parses a font file without touching any font collection, so several
+// threads can scan font directories at once.
+skiac_typeface* skiac_typeface_make_from_file(const char* font_path) {
+  // SkFontMgr_Custom serializes scanning on a per manager FreeType lock, each
+  // scanning thread gets its own manager
+  thread_local sk_sp<SkFontMgr> font_mgr = SkFontMgr_New_Custom_Empty();
+  auto typeface = font_mgr->makeFromFile(font_path);
+  return reinterpret_cast<skiac_typeface*>(typeface.release());
+}
+
+void skiac_typeface_destroy(skiac_typeface* c_typeface) {
+  SkSafeUnref(TYPEFACE_CAST);
+}
+
+void skiac_typeface_get_info(skiac_typeface* c_typeface,
+                             skiac_string* c_family,
+                             skiac_typeface_info* c_info) {
+  auto typeface = TYPEFACE_CAST;
+  auto family = new SkString();
+  typeface->getFamilyName(family);
+  c_family->length = family->size();
+  c_family->ptr = family->c_str();
+  c_family->sk_string = family;
+  auto style = typeface->fontStyle();
+  c_info->weight = style.weight();
+  c_info->width = style.width();
+  c_info->slant = (int)style.slant();
+  c_info->fixed_pitch = typeface->isFixedPitch();
+}
+
+// Typeface for a font file described by the font index. Nothing is read
+// until the typeface is asked for glyphs or tables, then the file is mapped.
+skiac_typeface* skiac_typeface_make_from_index(
+    const char* font_path,
+    const char* family,
+    const skiac_typeface_info* c_info) {
+  auto style = SkFontStyle(c_info->weight, c_info->width,
+                           (SkFontStyle::Slant)c_info->slant);
+  sk_sp<SkTypeface> typeface = sk_make_sp<SkTypeface_File>(
+      style, c_info->fixed_pitch, true, SkString(family), font_path, 0);
+  return reinterpret_cast<skiac_typeface*>(typeface.release());
+}
+
+// Registers a typeface parsed by skiac_typeface_make_from_file, the
+// collection takes its own reference.
+void skiac_font_collection_register_typefaces_from_paths(
+    skiac_font_collection* c_font_collection,
+    const char* const* font_paths,
+    skiac_typeface* const* c_typefaces,
+    size_t count,
+    uint32_t* typeface_ids) {
+  for (size_t i = 0; i < count; i++) {
+    auto c_typeface = c_typefaces[i];
+    typeface_ids[i] =
+        c_typeface ? track_typeface_from_path(c_font_collection, font_paths[i],
+                                              sk_ref_sp(TYPEFACE_CAST), nullptr)
+                   : 0;
+  }
+  if (count > 0) {
+    c_font_collection->invalidateCaches();
   }
-  return typeface_id;
 }
 
 size_t skiac_font_collection_unregister(
@@ -2224,6 +3288,7 @@ bool skiac_font_collection_set_alias(skiac_font_collection* c_font_collection,
   // Register the alias - this will shadow any existing font with the same name
   c_font_collection->assets->registerTypeface(std::move(typeface),
                                               SkString(alias));
+  c_font_collection->invalidateCaches();
   return true;
 }
 
@@ -2231,6 +3296,119 @@ void skiac_font_collection_destroy(skiac_font_collection* c_font_collection) {
   delete c_font_collection;
 }
 
+void skiac_font_collection_get_paragraph_cache_stats(
+    skiac_font_collection* c_font_collection,
+    skiac_paragraph_cache_stats* c_stats) {
+  const auto& cache = c_font_collection->paragraph_cache;
+  c_stats->capacity = cache.capacity;
+  c_stats->count = cache.count();
+  c_stats->hits = cache.hits;
+  c_stats->misses = cache.misses;
+  c_stats->evictions = cache.evictions;
+}
+
+void skiac_font_collection_set_paragraph_cache_capacity(
+    skiac_font_collection* c_font_collection,
+    size_t capacity) {
+  c_font_collection->paragraph_cache.setCapacity(capacity);
+}
+
+void skiac_font_collection_clear_paragraph_cache(
+    skiac_font_collection* c_font_collection) {
+  auto& cache = c_font_collection->paragraph_cache;
+  cache.clear();
+  cache.hits = 0;
+  cache.misses = 0;
+  cache.evictions = 0;
+}
+
+size_t skiac_font_collection_warm_up(skiac_font_collection* c_font_collection,
+                                     const char* const* families,
+                                     size_t count) {
+  auto& assets = c_font_collection->assets;
+  std::vector<SkString> names;
+  if (families) {
+    for (size_t i = 0; i < count; i++) {
+      names.emplace_back(families[i]);
+    }
+  } else {
+    for (int i = 0; i < assets->countFamilies(); i++) {
+      SkString name;
+      assets->getFamilyName(i, &name);
+      names.push_back(std::move(name));
+    }
+  }
+  size_t opened = 0;
+  for (const auto& name : names) {
+    auto style_set = assets->matchFamily(name.c_str());
+    if (!style_set) {
+      continue;
+    }
+    for (int i = 0; i < style_set->count(); i++) {
+      auto typeface = style_set->createTypeface(i);
+      // Counting glyphs maps the file and opens its FreeType face, both are
+      // kept by the typeface and shared copy-on-write after fork
+      if (typeface && typeface->countGlyphs() > 0) {
+        opened++;
+      }
+    }
+  }
+  return opened;
+}
+
+void skiac_font_collection_set_simple_text_fast_path(
+    skiac_font_collection* c_font_collection,
+    bool enabled) {
+  if (c_font_collection->simple_text_fast_path != enabled) {
+    // The cached lines were shaped by the other path
+    c_font_collection->paragraph_cache.clear();
+    c_font_collection->simple_text_fast_path = enabled;
+  }
+}
+
+void skiac_font_collection_get_variation_cache_stats(
+    skiac_font_collection* c_font_collection,
+    skiac_variation_cache_stats* c_stats) {
+  const auto& cache = c_font_collection->variation_instances;
+  c_stats->capacity = cache.capacity;
+  c_stats->count = cache.count();
+  c_stats->hits = cache.hits;
+  c_stats->misses = cache.misses;
+  c_stats->evictions = cache.evictions;
+}
+
+void skiac_font_collection_set_variation_cache_capacity(
+    skiac_font_collection* c_font_collection,
+    size_t capacity) {
+  auto& cache = c_font_collection->variation_instances;
+  cache.capacity = capacity;
+  cache.shrinkTo(capacity);
+}
+
+void skiac_font_collection_set_fallback_families(
+    skiac_font_collection* c_font_collection,
+    const char* const* families,
+    size_t count) {
+  std::vector<std::string> fallback_families;
+  fallback_families.reserve(count);
+  for (size_t i = 0; i < count; i++) {
+    fallback_families.emplace_back(families[i]);
+  }
+  c_font_collection->assets->setFallbackFamilies(std::move(fallback_families));
+  c_font_collection->invalidateCaches();
+}
+
+size_t skiac_font_collection_get_fallback_families_count(
+    skiac_font_collection* c_font_collection) {
+  return c_font_collection->assets->getFallbackFamilies().size();
+}
+
+const char* skiac_font_collection_get_fallback_family(
+    skiac_font_collection* c_font_collection,
+    size_t index) {
+  return c_font_collection->assets->getFallbackFamilies()[index].c_str();
+}
+
 // Variable Fonts
 int skiac_typeface_get_variation_design_position(
     skiac_font_collection* c_font_collection,
@@ -1,6 +1,7 @@
 #ifndef SKIA_CAPI_H
 #define SKIA_CAPI_H
 
+#include <include/codec/SkAndroidCodec.h>
 #include <include/codec/SkCodec.h>
 #include <include/codec/SkEncodedImageFormat.h>
 #include <include/core/SkAnnotation.h>
@@ -21,10 +22,12 @@
 #include <include/core/SkPicture.h>
 #include <include/core/SkPictureRecorder.h>
 #include <include/core/SkSamplingOptions.h>
+#include <include/core/SkSerialProcs.h>
 #include <include/core/SkStream.h>
 #include <include/core/SkString.h>
 #include <include/core/SkStrokeRec.h>
 #include <include/core/SkSurface.h>
+#include <include/core/SkTextBlob.h>
 #include <include/docs/SkPDFDocument.h>
 #include <include/docs/SkPDFJpegHelpers.h>
 #include <include/effects/SkColorMatrix.h>
@@ -38,6 +41,7 @@
 #include <include/encode/SkWebpEncoder.h>
 #include <include/pathops/SkPathOps.h>
 #include <include/svg/SkSVGCanvas.h>
+#include <include/utils/SkNoDrawCanvas.h>
 #include <include/utils/SkParsePath.h>
 #include <modules/skottie/include/Skottie.h>
 #include <modules/skparagraph/include/FontCollection.h>
@@ -46,7 +50,10 @@
 #include <modules/skparagraph/include/TypefaceFontProvider.h>
 #include <modules/skparagraph/src/ParagraphBuilderImpl.h>
 #include <modules/skparagraph/src/ParagraphImpl.h>
+#include <modules/skparagraph/src/ParagraphPainterImpl.h>
 #include <modules/skresources/include/SkResources.h>
+#include <modules/skshaper/include/SkShaper.h>
+#include <modules/skshaper/include/SkShaper_harfbuzz.h>
 #include <modules/skunicode/include/SkUnicode_icu.h>
 #include <modules/svg/include/SkSVGDOM.h>
 #include <modules/svg/include/SkSVGNode.h>
@@ -57,9 +64,13 @@
 #include <src/xml/SkXMLWriter.h>
 #include <algorithm>
 #include <cstring>
+#include <list>
 #include <map>
+#include <memory>
+#include <mutex>
 #include <set>
 #include <string>
+#include <unordered_map>
 #include <vector>
 
 #include <stdint.h>
@@ -90,6 +101,7 @@ typedef struct skiac_drawable skiac_drawable;
 typedef struct skiac_encoder skiac_encoder;
 typedef struct skiac_document skiac_document;
 typedef struct skiac_skottie_animation skiac_skottie_animation;
+typedef struct skiac_text_blob skiac_text_blob;
 
 #if defined(WIN32) || defined(_WIN32) || defined(__WIN32__) || defined(__NT__)
 #define SK_FONT_FILE_PREFIX "C:/Windows/Fonts"
@@ -152,8 +164,27 @@ struct RegisteredFont {
 
 class TypefaceFontProviderCustom : public TypefaceFontProvider {
  public:
-  explicit TypefaceFontProviderCustom(sk_sp<SkFontMgr> mgr)
-      : font_mgr(std::move(mgr)) {}
+  // `match_font_mgr_characters` makes the default per-character fallback ask
+  // `mgr` as well, so its answer is cached here. Only for providers that
+  // FontCollection searches right before `mgr`.
+  explicit TypefaceFontProviderCustom(sk_sp<SkFontMgr> mgr,
+                                      bool match_font_mgr_characters = false)
+      : font_mgr(std::move(mgr)),
+        match_font_mgr_characters(match_font_mgr_characters) {}
+
+  bool matchesFontMgrCharacters() const { return match_font_mgr_characters; }
+
+  // Hide TypefaceFontProvider::registerTypeface, a new typeface may cover
+  // characters that were resolved to another one or to none
+  size_t registerTypeface(sk_sp<SkTypeface> typeface) {
+    clearFallbackCache();
+    return TypefaceFontProvider::registerTypeface(std::move(typeface));
+  }
+
+  size_t registerTypeface(sk_sp<SkTypeface> typeface, const SkString& alias) {
+    clearFallbackCache();
+    return TypefaceFontProvider::registerTypeface(std::move(typeface), alias);
+  }
 
   ~TypefaceFontProviderCustom() {};
 
@@ -518,8 +549,111 @@ class TypefaceFontProviderCustom : public TypefaceFontProvider {
     return count;
   }
 
+  // Families searched, in order, for characters that none of the requested
+  // families cover. Empty keeps Skia's own per-character lookup.
+  void setFallbackFamilies(std::vector<std::string> families) {
+    std::lock_guard<std::mutex> lock(fallback_mutex);
+    fallback_families = std::move(families);
+    fallback_cache.clear();
+    fallback_index.clear();
+  }
+
+  const std::vector<std::string>& getFallbackFamilies() const {
+    return fallback_families;
+  }
+
+  // A provider resolving the same families that later registrations here do
+  // not touch, so it can be searched without holding this one's lock. The
+  // typefaces are shared, not reloaded.
+  sk_sp<TypefaceFontProviderCustom> snapshot() const {
+    auto copy = sk_make_sp<TypefaceFontProviderCustom>(
+        font_mgr, match_font_mgr_characters);
+    copy->fallback_families = fallback_families;
+    for (int i = 0; i < this->countFamilies(); i++) {
+      SkString family;
+      this->getFamilyName(i, &family);
+      auto styles = this->matchFamily(family.c_str());
+      for (int j = 0; styles && j < styles->count(); j++) {
+        copy->TypefaceFontProvider::registerTypeface(styles->createTypeface(j),
+                                                     family);
+      }
+    }
+    return copy;
+  }
+
+  void clearFallbackCache() const {
+    std::lock_guard<std::mutex> lock(fallback_mutex);
+    fallback_cache.clear();
+    fallback_index.clear();
+  }
+
+  // Called by FontCollection::defaultFallback for every character missing
+  // from the resolved typefaces. The answer only depends on the character,
+  // style and locale, so the last kFallbackCacheCapacity answers are
+  // remembered until the fonts change.
+  sk_sp<SkTypeface> onMatchFamilyStyleCharacter(
+      const char family_name[],
+      const SkFontStyle& style,
+      const char* bcp47[],
+      int bcp47_count,
+      SkUnichar character) const override {
+    std::lock_guard<std::mutex> lock(fallback_mutex);
+    std::string key;
+    const int ints[] = {character, style.weight(), style.width(),
+                        (int)style.slant()};
+    key.append(reinterpret_cast<const char*>(ints), sizeof(ints));
+    if (family_name) {
+      key.append(family_name);
+    }
+    for (int i = 0; i < bcp47_count; i++) {
+      key.push_back('\0');
+      key.append(bcp47[i]);
+    }
+    auto it = fallback_index.find(key);
+    if (it != fallback_index.end()) {
+      // Move to the front, the back is the least recently used entry
+      fallback_cache.splice(fallback_cache.begin(), fallback_cache,
+                            it->second);
+      return it->second->second;
+    }
+    sk_sp<SkTypeface> typeface;
+    if (fallback_families.empty()) {
+      typeface = TypefaceFontProvider::onMatchFamilyStyleCharacter(
+          family_name, style, bcp47, bcp47_count, character);
+      if (!typeface && match_font_mgr_characters) {
+        typeface = font_mgr->matchFamilyStyleCharacter(
+            family_name, style, bcp47, bcp47_count, character);
+      }
+    } else {
+      for (const auto& family : fallback_families) {
+        auto candidate = this->matchFamilyStyle(family.c_str(), style);
+        if (candidate && candidate->unicharToGlyph(character) != 0) {
+          typeface = std::move(candidate);
+          break;
+        }
+      }
+    }
+    // Misses are cached too, they are the expensive case
+    if (fallback_cache.size() >= kFallbackCacheCapacity) {
+      fallback_index.erase(fallback_cache.back().first);
+      fallback_cache.pop_back();
+    }
+    fallback_cache.emplace_front(std::move(key), typeface);
+    fallback_index[fallback_cache.front().first] = fallback_cache.begin();
+    return typeface;
+  }
+
  private:
+  static constexpr size_t kFallbackCacheCapacity = 4096;
+
   sk_sp<SkFontMgr> font_mgr;
+  bool match_font_mgr_characters;
+  std::vector<std::string> fallback_families;
+  mutable std::mutex fallback_mutex;
+  using FallbackEntry = std::pair<std::string, sk_sp<SkTypeface>>;
+  mutable std::list<FallbackEntry> fallback_cache;
+  mutable std::unordered_map<std::string, std::list<FallbackEntry>::iterator>
+      fallback_index;
   std::map<uint32_t, RegisteredFont> registered_fonts;
   // Secondary index: content hash -> set of registered IDs with that hash
   // This enables fast duplicate detection even after removals break the probe
@@ -534,6 +668,236 @@ struct skiac_svg_surface {
   skiac_canvas* canvas;
 };
 
+// Defined in skia_c.cpp: a laid-out line of text, with the paragraph it was
+// taken from unless it was shaped without one
+struct TextLineLayout;
+
+// LRU cache of the text laid out by fillText / strokeText / measureText and
+// the text blocks, including single lines shaped without a paragraph. The key
+// holds the text and every style input that changes shaping; the paint is not
+// part of it and is applied at draw time.
+// Access is serialized by the owner of the font collection.
+class skiac_paragraph_cache {
+ public:
+  static constexpr size_t kDefaultCapacity = 1024;
+
+  std::shared_ptr<const TextLineLayout> find(const std::string& key) {
+    auto it = index.find(key);
+    if (it == index.end()) {
+      misses++;
+      return nullptr;
+    }
+    // Move to the front, the back is the least recently used entry
+    entries.splice(entries.begin(), entries, it->second);
+    hits++;
+    return it->second->second;
+  }
+
+  void insert(std::string key, std::shared_ptr<const TextLineLayout> layout) {
+    if (capacity == 0) {
+      return;
+    }
+    auto it = index.find(key);
+    if (it != index.end()) {
+      entries.erase(it->second);
+      index.erase(it);
+    }
+    entries.emplace_front(std::move(key), std::move(layout));
+    index[entries.front().first] = entries.begin();
+    evictTo(capacity);
+  }
+
+  void setCapacity(size_t new_capacity) {
+    capacity = new_capacity;
+    evictTo(capacity);
+  }
+
+  void clear() {
+    entries.clear();
+    index.clear();
+  }
+
+  size_t count() const { return entries.size(); }
+
+  size_t capacity = kDefaultCapacity;
+  uint64_t hits = 0;
+  uint64_t misses = 0;
+  uint64_t evictions = 0;
+
+ private:
+  void evictTo(size_t max_count) {
+    while (entries.size() > max_count) {
+      index.erase(entries.back().first);
+      entries.pop_back();
+      evictions++;
+    }
+  }
+
+  using Entry = std::pair<std::string, std::shared_ptr<const TextLineLayout>>;
+  std::list<Entry> entries;
+  std::unordered_map<std::string, std::list<Entry>::iterator> index;
+};
+
+// Glyph outlines for textToPath, keyed by everything SkFont::getPaths depends
+// on. Outlines do not depend on the fonts registered, typeface ids are unique
+// per process, so one cache serves every collection. When full it is emptied
+// wholesale, like the parse caches on the Rust side.
+class skiac_glyph_path_cache {
+ public:
+  static constexpr size_t kCapacity = 4096;
+
+  struct Key {
+    SkTypefaceID typeface_id;
+    SkGlyphID glyph;
+    float size;
+    float scale_x;
+    float skew_x;
+    bool embolden;
+
+    bool operator==(const Key& other) const {
+      return typeface_id == other.typeface_id && glyph == other.glyph &&
+             size == other.size && scale_x == other.scale_x &&
+             skew_x == other.skew_x && embolden == other.embolden;
+    }
+  };
+
+  struct KeyHash {
+    size_t operator()(const Key& key) const {
+      size_t hash = std::hash<uint32_t>()(key.typeface_id);
+      for (size_t part :
+           {std::hash<uint32_t>()(key.glyph), std::hash<float>()(key.size),
+            std::hash<float>()(key.scale_x), std::hash<float>()(key.skew_x),
+            std::hash<bool>()(key.embolden)}) {
+        hash ^= part + 0x9e3779b9 + (hash << 6) + (hash >> 2);
+      }
+      return hash;
+    }
+  };
+
+  static Key keyFor(const SkFont& font, SkGlyphID glyph) {
+    return {font.getTypeface()->uniqueID(), glyph, font.getSize(),
+            font.getScaleX(), font.getSkewX(), font.isEmbolden()};
+  }
+
+  // Appends the outlines of `glyphs` set in `font` to `builder`, each moved
+  // to `origin` + its position
+  void addGlyphs(const SkFont& font,
+                 SkSpan<const SkGlyphID> glyphs,
+                 const SkPoint* positions,
+                 SkPoint origin,
+                 SkPathBuilder* builder) {
+    std::lock_guard<std::mutex> lock(mutex);
+    std::vector<SkGlyphID> missing;
+    for (auto glyph : glyphs) {
+      if (paths.find(keyFor(font, glyph)) == paths.end()) {
+        missing.push_back(glyph);
+      }
+    }
+    if (!missing.empty()) {
+      if (paths.size() + missing.size() > kCapacity) {
+        // Emptied wholesale, the glyphs found above are gone too
+        paths.clear();
+        missing.assign(glyphs.begin(), glyphs.end());
+      }
+      struct Context {
+        skiac_glyph_path_cache* cache;
+        const SkFont* font;
+        const SkGlyphID* glyph;
+      } context{this, &font, missing.data()};
+      font.getPaths(
+          missing,
+          [](const SkPath* path, const SkMatrix& matrix, void* ctx) {
+            auto context = static_cast<Context*>(ctx);
+            // Null for glyphs without an outline, e.g. spaces
+            context->cache->paths[keyFor(*context->font, *context->glyph++)] =
+                path ? path->makeTransform(matrix) : SkPath();
+          },
+          &context);
+    }
+    for (size_t i = 0; i < glyphs.size(); i++) {
+      auto it = paths.find(keyFor(font, glyphs[i]));
+      if (it == paths.end()) {
+        continue;
+      }
+      const auto& path = it->second;
+      if (!path.isEmpty()) {
+        builder->addPath(path,
+                         SkMatrix::Translate(origin.fX + positions[i].fX,
+                                             origin.fY + positions[i].fY),
+                         SkPath::AddPathMode::kAppend_AddPathMode);
+      }
+    }
+  }
+
+  void clear() {
+    std::lock_guard<std::mutex> lock(mutex);
+    paths.clear();
+  }
+
+ private:
+  std::mutex mutex;
+  std::unordered_map<Key, SkPath, KeyHash> paths;
+};
+
+// Variable font instances are created by FontCollection::findTypefaces, which
+// clones the matched typeface with the variation coordinates and keeps the
+// clone in its family cache with no eviction. Sweeping an axis creates a new
+// instance per value, so text with variation coordinates is resolved through
+// a FontCollection of its own per coordinate set, kept here in LRU order.
+// Evicting a set releases only the instances cloned for it, the family
+// lookups of the main collection stay cached.
+class skiac_variation_instance_cache {
+ public:
+  static constexpr size_t kDefaultCapacity = 64;
+
+  // The collection for the coordinate set `key`, made by `make` when missing
+  template <typename Make>
+  sk_sp<FontCollection> find(const std::string& key, Make make) {
+    auto it = index.find(key);
+    if (it != index.end()) {
+      // Move to the front, the back is the least recently used entry
+      entries.splice(entries.begin(), entries, it->second);
+      hits++;
+      return it->second->second;
+    }
+    misses++;
+    auto collection = make();
+    if (capacity == 0) {
+      return collection;
+    }
+    shrinkTo(capacity - 1);
+    entries.emplace_front(key, collection);
+    index[entries.front().first] = entries.begin();
+    return collection;
+  }
+
+  // Evict least recently used sets until at most `count` are left
+  void shrinkTo(size_t count) {
+    while (entries.size() > count) {
+      index.erase(entries.back().first);
+      entries.pop_back();
+      evictions++;
+    }
+  }
+
+  void clear() {
+    entries.clear();
+    index.clear();
+  }
+
+  size_t count() const { return entries.size(); }
+
+  size_t capacity = kDefaultCapacity;
+  uint64_t hits = 0;
+  uint64_t misses = 0;
+  uint64_t evictions = 0;
+
+ private:
+  using Entry = std::pair<std::string, sk_sp<FontCollection>>;
+  std::list<Entry> entries;
+  std::unordered_map<std::string, std::list<Entry>::iterator> index;
+};
+
 struct skiac_font_collection {
   sk_sp<FontCollection> collection;
   sk_sp<SkFontMgr> font_mgr;
@@ -542,15 +906,91 @@ struct skiac_font_collection {
   std::vector<sk_sp<TypefaceFontProviderCustom>> retired_assets;
   // Track setAlias mappings for rebuild: {family, alias} pairs
   std::set<std::pair<std::string, std::string>> set_aliases;
+  // Paragraphs hold typefaces resolved from this collection, so the cache is
+  // cleared whenever fonts are registered, removed or aliased
+  skiac_paragraph_cache paragraph_cache;
+  skiac_variation_instance_cache variation_instances;
+  // Shape simple single lines without building a paragraph, see
+  // skiac_shape_simple_line
+  bool simple_text_fast_path = true;
+  // Bumped by invalidateCaches(), tells scoped collections using this one as
+  // their fallback that its fonts changed
+  uint64_t generation = 0;
+  // Scoped collections only: searched after their own fonts. It is the
+  // process-wide collection, which outlives every scoped one.
+  skiac_font_collection* fallback = nullptr;
+  // The fallback's registered fonts as of fallback_generation, searched
+  // instead of its provider so shaping does not need the fallback locked
+  sk_sp<TypefaceFontProviderCustom> fallback_assets;
+  uint64_t fallback_generation = 0;
 
   skiac_font_collection()
       : collection(sk_make_sp<FontCollection>()),
         font_mgr(SkFontMgr_New_Custom_Directory(SK_FONT_FILE_PREFIX)),
-        assets(sk_make_sp<TypefaceFontProviderCustom>(font_mgr)) {
-    collection->setDefaultFontManager(SkFontMgr_New_Custom_Empty());
-    collection->setAssetFontManager(font_mgr);
-    collection->setDynamicFontManager(assets);
-    collection->enableFontFallback();
+        assets(sk_make_sp<TypefaceFontProviderCustom>(font_mgr, true)) {
+    configure(collection.get());
+  }
+
+  // A collection of its own fonts, followed by the registered and directory
+  // fonts of `fallback_collection` when given. No directory is scanned.
+  explicit skiac_font_collection(skiac_font_collection* fallback_collection)
+      : collection(sk_make_sp<FontCollection>()),
+        font_mgr(fallback_collection ? fallback_collection->font_mgr
+                                     : SkFontMgr_New_Custom_Empty()),
+        assets(sk_make_sp<TypefaceFontProviderCustom>(font_mgr)),
+        fallback(fallback_collection) {
+    configure(collection.get());
+    syncFallback();
+  }
+
+  // Set the font managers of `target`, searched in this order: the registered
+  // fonts, then those of the fallback collection, or the directory fonts.
+  void configure(FontCollection* target) const {
+    target->setDefaultFontManager(SkFontMgr_New_Custom_Empty());
+    target->setDynamicFontManager(assets);
+    if (fallback) {
+      target->setAssetFontManager(fallback_assets);
+      target->setTestFontManager(fallback->font_mgr);
+    } else {
+      target->setAssetFontManager(font_mgr);
+    }
+    target->enableFontFallback();
+  }
+
+  // A collection resolving the same fonts, whose family cache only holds the
+  // instances of one variation coordinate set, see
+  // skiac_variation_instance_cache
+  sk_sp<FontCollection> makeInstanceCollection() const {
+    auto instances = sk_make_sp<FontCollection>();
+    configure(instances.get());
+    // Paragraphs are cached by paragraph_cache already
+    instances->getParagraphCache()->turnOn(false);
+    return instances;
+  }
+
+  // Snapshot the fallback's registered fonts when they changed since the last
+  // call, and forget what was resolved from the previous snapshot. The
+  // fallback must not be modified concurrently.
+  void syncFallback() {
+    if (!fallback || (fallback_assets &&
+                      fallback_generation == fallback->generation)) {
+      return;
+    }
+    fallback_assets = fallback->assets->snapshot();
+    fallback_generation = fallback->generation;
+    collection->setAssetFontManager(fallback_assets);
+    invalidateCaches();
+  }
+
+  // Drop everything resolved from the registered fonts: the family ->
+  // typefaces lookups kept by FontCollection, the per-character fallback
+  // answers and the laid-out paragraphs that used them.
+  void invalidateCaches() {
+    collection->clearCaches();
+    assets->clearFallbackCache();
+    paragraph_cache.clear();
+    variation_instances.clear();
+    generation++;
   }
 
   // Rebuild the dynamic font provider with only remaining fonts
@@ -561,10 +1001,12 @@ struct skiac_font_collection {
     auto old_fonts = assets->getRegisteredFonts();
 
     // Clear caches before swap
-    collection->clearCaches();
+    invalidateCaches();
 
     // Create new provider
-    auto new_assets = sk_make_sp<TypefaceFontProviderCustom>(font_mgr);
+    auto new_assets = sk_make_sp<TypefaceFontProviderCustom>(
+        font_mgr, assets->matchesFontMgrCharacters());
+    new_assets->setFallbackFamilies(assets->getFallbackFamilies());
 
     // Re-register all remaining fonts, preserving original IDs
     for (const auto& [id, font_info] : old_fonts) {
@@ -651,6 +1093,54 @@ class SkJavaScriptWStream : public SkWStream {
   write_callback_t fWriteCallback;
   void* fContext;
 };
+struct skiac_typeface_info {
+  int weight;
+  int width;
+  int slant;
+  bool fixed_pitch;
+};
+
+struct skiac_font_cache_stats {
+  size_t used_bytes;
+  size_t limit_bytes;
+  int count;
+  int count_limit;
+};
+
+struct skiac_paragraph_cache_stats {
+  size_t capacity;
+  size_t count;
+  uint64_t hits;
+  uint64_t misses;
+  uint64_t evictions;
+};
+
+struct skiac_variation_cache_stats {
+  size_t capacity;
+  size_t count;
+  uint64_t hits;
+  uint64_t misses;
+  uint64_t evictions;
+};
+
+// Wrapping and alignment of a multi-line text block.
+// max_width <= 0: no wrapping, line_height <= 0: font line height,
+// max_lines == 0: unlimited.
+struct skiac_text_block {
+  float max_width;
+  float line_height;
+  uint32_t max_lines;
+  const char* ellipsis;
+  int align;
+};
+
+struct skiac_text_block_metrics {
+  float width;
+  float height;
+  uint32_t line_count;
+  bool did_exceed_max_lines;
+};
+
 struct skiac_line_metrics {
   float ascent;
   float descent;
@@ -695,6 +1185,12 @@ struct skiac_bitmap_info {
   bool is_canvas;
 };
 
+struct skiac_svg_picture {
+  skiac_picture* picture;
+  float width;
+  float height;
+};
+
 struct skiac_string {
   const char* ptr;
   size_t length;
@@ -752,6 +1248,11 @@ struct skiac_font_variation {
 
 extern "C" {
 void skiac_clear_all_cache();
+size_t skiac_set_font_cache_limit(size_t bytes);
+int skiac_set_font_cache_count_limit(int count);
+void skiac_get_font_cache_stats(skiac_font_cache_stats* c_stats);
+void skiac_purge_font_cache();
+void skiac_purge_resource_cache();
 // Surface
 skiac_surface* skiac_surface_create_rgba_premultiplied(int width,
                                                        int height,
@@ -782,6 +1283,15 @@ bool skiac_surface_read_pixels_rect(skiac_surface* c_surface,
                                     int w,
                                     int h,
                                     uint8_t cs);
+bool skiac_surface_read_pixels_rect_with_pictures(skiac_surface* c_surface,
+                                                  skiac_picture** c_pictures,
+                                                  size_t count,
+                                                  uint8_t* data,
+                                                  int x,
+                                                  int y,
+                                                  int w,
+                                                  int h,
+                                                  uint8_t cs);
 void skiac_surface_png_data(skiac_surface* c_surface, skiac_sk_data* data);
 void skiac_surface_encode_data(skiac_surface* c_surface,
                                skiac_sk_data* data,
@@ -880,6 +1390,62 @@ void skiac_canvas_get_line_metrics_or_draw_text(
     int variant_caps,
     const char* lang,
     int text_rendering);
+void skiac_canvas_get_text_block_metrics_or_draw_text(
+    const char* text,
+    size_t text_len,
+    float x,
+    float y,
+    const skiac_text_block* block,
+    skiac_font_collection* c_collection,
+    float font_size,
+    int weight,
+    int stretch,
+    float stretch_width,
+    int slant,
+    const char* font_family,
+    int baseline,
+    int direction,
+    float letter_spacing,
+    float world_spacing,
+    skiac_paint* c_paint,
+    skiac_canvas* c_canvas,
+    skiac_text_block_metrics* c_metrics,
+    const skiac_font_variation* variations,
+    int variations_count,
+    int kerning,
+    int variant_caps,
+    const char* lang,
+    int text_rendering);
+skiac_text_blob* skiac_text_blob_make(const char* text,
+                                      size_t text_len,
+                                      skiac_font_collection* c_collection,
+                                      float font_size,
+                                      int weight,
+                                      int stretch,
+                                      float stretch_width,
+                                      int slant,
+                                      const char* font_family,
+                                      int baseline,
+                                      int align,
+                                      int direction,
+                                      float letter_spacing,
+                                      float world_spacing,
+                                      const skiac_font_variation* variations,
+                                      int variations_count,
+                                      int kerning,
+                                      int variant_caps,
+                                      const char* lang,
+                                      int text_rendering,
+                                      skiac_line_metrics* c_line_metrics);
+void skiac_text_blob_destroy(skiac_text_blob* c_text_blob);
+skiac_path* skiac_text_blob_to_path(skiac_text_blob* c_text_blob,
+                                    float x,
+                                    float y);
+void skiac_canvas_draw_text_blob(skiac_canvas* c_canvas,
+                                 skiac_text_blob* c_text_blob,
+                                 float x,
+                                 float y,
+                                 skiac_paint* c_paint);
 void skiac_canvas_reset_transform(skiac_canvas* c_canvas);
 void skiac_canvas_clip_rect(skiac_canvas* c_canvas,
                             float x,
@@ -1168,19 +1734,38 @@ void skiac_canvas_draw_sk_image(skiac_canvas* c_canvas,
                                 int filter_quality);
 
 // Data
+bool skiac_sk_data_from_file(const char* path, skiac_sk_data* c_data);
 void skiac_sk_data_destroy(skiac_data* c_data);
 
 // Bitmap
 void skiac_bitmap_make_from_buffer(const uint8_t* ptr,
                                    size_t size,
                                    skiac_bitmap_info* bitmap_info);
-bool skiac_bitmap_make_from_svg(const uint8_t* data,
-                                size_t length,
-                                float width,
-                                float height,
-                                skiac_bitmap_info* bitmap_info,
-                                skiac_font_collection* c_collection,
-                                uint8_t cs);
+void skiac_bitmap_make_from_buffer_with_max_size(
+    const uint8_t* ptr,
+    size_t size,
+    int max_width,
+    int max_height,
+    skiac_bitmap_info* bitmap_info);
+bool skiac_bitmap_make_from_buffer_region(const uint8_t* ptr,
+                                          size_t size,
+                                          int x,
+                                          int y,
+                                          int width,
+                                          int height,
+                                          float scale,
+                                          skiac_bitmap_info* bitmap_info);
+bool skiac_svg_picture_make(const uint8_t* data,
+                            size_t length,
+                            skiac_font_collection* c_collection,
+                            skiac_svg_picture* c_svg_picture);
+bool skiac_bitmap_make_from_picture(skiac_picture* c_picture,
+                                    float picture_width,
+                                    float picture_height,
+                                    int width,
+                                    int height,
+                                    skiac_bitmap_info* bitmap_info,
+                                    uint8_t cs);
 skiac_bitmap* skiac_bitmap_make_from_image_data(uint8_t* ptr,
                                                 size_t width,
                                                 size_t height,
@@ -1198,6 +1783,8 @@ skiac_shader* skiac_bitmap_get_shader(
     float B,
     float C,  // See SkSamplingOptions.h for docs.
     skiac_transform c_ts);
+skiac_bitmap* skiac_bitmap_share(skiac_bitmap* c_bitmap);
+size_t skiac_bitmap_get_byte_size(skiac_bitmap* c_bitmap);
 void skiac_bitmap_destroy(skiac_bitmap* c_bitmap);
 
 // SkString
@@ -1205,6 +1792,10 @@ void skiac_delete_sk_string(skiac_sk_string* c_sk_string);
 
 // FontCollection
 skiac_font_collection* skiac_font_collection_create();
+skiac_font_collection* skiac_font_collection_create_scoped(
+    skiac_font_collection* fallback);
+void skiac_font_collection_sync_fallback(
+    skiac_font_collection* c_font_collection);
 uint32_t skiac_font_collection_get_default_fonts_count(
     skiac_font_collection* c_font_collection);
 void skiac_font_collection_get_family(
@@ -1222,6 +1813,21 @@ uint32_t skiac_font_collection_register_from_path(
     skiac_font_collection* c_font_collection,
     const char* font_path,
     const char* name_alias);
+skiac_typeface* skiac_typeface_make_from_file(const char* font_path);
+void skiac_typeface_destroy(skiac_typeface* c_typeface);
+void skiac_typeface_get_info(skiac_typeface* c_typeface,
+                             skiac_string* c_family,
+                             skiac_typeface_info* c_info);
+skiac_typeface* skiac_typeface_make_from_index(
+    const char* font_path,
+    const char* family,
+    const skiac_typeface_info* c_info);
+void skiac_font_collection_register_typefaces_from_paths(
+    skiac_font_collection* c_font_collection,
+    const char* const* font_paths,
+    skiac_typeface* const* c_typefaces,
+    size_t count,
+    uint32_t* typeface_ids);
 size_t skiac_font_collection_unregister(
     skiac_font_collection* c_font_collection,
     uint32_t typeface_id);
@@ -1235,6 +1841,35 @@ bool skiac_font_collection_set_alias(skiac_font_collection* c_font_collection,
                                      const char* family,
                                      const char* alias);
 void skiac_font_collection_destroy(skiac_font_collection* c_font_collection);
+void skiac_font_collection_get_paragraph_cache_stats(
+    skiac_font_collection* c_font_collection,
+    skiac_paragraph_cache_stats* c_stats);
+void skiac_font_collection_set_paragraph_cache_capacity(
+    skiac_font_collection* c_font_collection,
+    size_t capacity);
+void skiac_font_collection_clear_paragraph_cache(
+    skiac_font_collection* c_font_collection);
+void skiac_font_collection_set_simple_text_fast_path(
+    skiac_font_collection* c_font_collection,
+    bool enabled);
+size_t skiac_font_collection_warm_up(skiac_font_collection* c_font_collection,
+                                     const char* const* families,
+                                     size_t count);
+void skiac_font_collection_get_variation_cache_stats(
+    skiac_font_collection* c_font_collection,
+    skiac_variation_cache_stats* c_stats);
+void skiac_font_collection_set_variation_cache_capacity(
+    skiac_font_collection* c_font_collection,
+    size_t capacity);
+void skiac_font_collection_set_fallback_families(
+    skiac_font_collection* c_font_collection,
+    const char* const* families,
+    size_t count);
+size_t skiac_font_collection_get_fallback_families_count(
+    skiac_font_collection* c_font_collection);
+const char* skiac_font_collection_get_fallback_family(
+    skiac_font_collection* c_font_collection,
+    size_t index);
 
 // Variable Fonts
 int skiac_typeface_get_variation_design_position(
@@ -1268,6 +1903,14 @@ void skiac_svg_text_to_path(const uint8_t* data,
 void skiac_picture_ref(skiac_picture* c_picture);
 void skiac_picture_destroy(skiac_picture* c_picture);
 void skiac_picture_playback(skiac_picture* c_picture, skiac_canvas* c_canvas);
+size_t skiac_picture_approximate_bytes_used(skiac_picture* c_picture);
+void skiac_picture_get_cull_rect(skiac_picture* c_picture, skiac_rect* c_rect);
+void skiac_picture_serialize(skiac_picture* c_picture,
+                             bool embed_fonts,
+                             skiac_sk_data* data);
+skiac_picture* skiac_picture_deserialize(const uint8_t* data,
+                                         size_t length,
+                                         skiac_font_collection* c_collection);
 skiac_picture_recorder* skiac_picture_recorder_create();
 void skiac_picture_recorder_destroy(skiac_picture_recorder* c_picture_recorder);
 void skiac_picture_recorder_begin_recording(
@@ -3,13 +3,14 @@ use std::f32::consts::PI;
 use std::result;
 use std::slice;
 use std::str::FromStr;
-use std::sync::LazyLock;
+use std::sync::{Arc, LazyLock};
 
 use cssparser::{Parser, ParserInput};
 use cssparser_color::{Color as CSSColor, hsl_to_rgb};
 use libavif::AvifData;
 use pyo3::exceptions::{PyRuntimeError, PyValueError};
 use pyo3::prelude::*;
+use pyo3::pybacked::PyBackedStr;
 use pyo3::types::{PyBytes, PyDict, PyString, PyWeakrefReference};
 use regex::Regex;
 use rgb::RGBA;
@@ -17,10 +18,12 @@ use rgb::RGBA;
 use crate::a_either::{PyEither, PyEither3, PyEither4};
 use crate::a_geometry::DOMMatrix;
 use crate::font::FONT_MEDIUM_PX;
+use crate::font::ParseCache;
 use crate::font::parse_size_px;
+use crate::font_collection::{PyFontCollection, ScopedFonts, lock_fonts};
 use crate::gif::GifConfig;
-use crate::global_fonts::get_font;
-use crate::page_recorder::PageRecorder;
+use crate::page_recorder::{MAX_CULLED_READ_LAYERS, PageRecorder};
+use crate::picture::{Picture, PictureRecording};
 use crate::picture_recorder::PictureRecorder;
 use crate::sk::Canvas;
 use crate::{
@@ -37,7 +40,8 @@ use crate::{
   sk::{
     AlphaType, Bitmap, BlendMode, ColorSpace, FillType, FontVariantCaps, ImageFilter, LineMetrics,
     MaskFilter, Matrix, Paint, PaintStyle, Path as SkPath, PathEffect, PathOp,
-    SkEncodedImageFormat, SkWMemoryStream, SkiaDataRef, Surface, SurfaceRef, Transform,
+    SkEncodedImageFormat, SkWMemoryStream, SkiaDataRef, Surface, SurfaceRef, TextAlign, TextBlob,
+    TextBlock, Transform,
   },
   state::Context2dRenderingState,
 };
@@ -45,6 +49,12 @@ use crate::{
 static CSS_SIZE_REGEXP: LazyLock<Regex> =
   LazyLock::new(|| Regex::new(r#"(-?[\d\.]+)(%|px|pt|pc|in|cm|mm|%|em|ex|ch|rem|q)?\s*"#).unwrap());
 
+// letterSpacing / wordSpacing values
+static CSS_SIZE_CACHE: ParseCache<Option<f32>> = ParseCache::new();
+
+static FONT_VARIATION_SETTINGS_CACHE: ParseCache<(String, Vec<crate::sk::FontVariation>)> =
+  ParseCache::new();
+
 impl From<SkError> for PyErr {
   fn from(err: SkError) -> PyErr {
     PyValueError::new_err(format!("{err}"))
@@ -64,6 +74,10 @@ pub struct Context {
   pub height: u32,
   pub color_space: ColorSpace,
   pub stream: Option<SkWMemoryStream>,
+  // Fonts used for text instead of the global collection, see `fontCollection`
+  pub(crate) font_collection: Option<Arc<ScopedFonts>>,
+  // Set between `beginRecording` and `endRecording`, drawing goes to its picture
+  recording: Option<PictureRecording>,
 }
 
 impl Context {
@@ -92,6 +106,8 @@ impl Context {
       height,
       color_space,
       stream: Some(stream),
+      font_collection: None,
+      recording: None,
     })
   }
 
@@ -100,7 +116,11 @@ impl Context {
       .ok_or_else(|| PyRuntimeError::new_err("Create skia surface failed"))?;
     Ok(Context {
       surface,
-      page_recorder: Some(RefCell::new(PageRecorder::new(width as f32, height as f32))), // Enable deferred rendering
+      page_recorder: Some(RefCell::new(PageRecorder::new(
+        width as f32,
+        height as f32,
+        color_space,
+      ))), // Enable deferred rendering
       alpha: true,
       path: SkPath::new(),
       states: vec![],
@@ -109,6 +129,8 @@ impl Context {
       height,
       color_space,
       stream: None,
+      font_collection: None,
+      recording: None,
     })
   }
 
@@ -125,9 +147,22 @@ impl Context {
       height,
       color_space: ColorSpace::default(),
       stream: None,
+      font_collection: None,
+      recording: None,
     }
   }
 
+  /// Draw straight to the surface instead of recording, as SVG and PDF contexts do.
+  /// Only meant for a context nothing was drawn on yet.
+  pub(crate) fn into_immediate(mut self) -> Self {
+    self.page_recorder = None;
+    self
+  }
+
+  pub(crate) fn is_deferred(&self) -> bool {
+    self.page_recorder.is_some()
+  }
+
   /// Flush deferred rendering to surface (if deferred mode is enabled)
   pub fn flush(&mut self) {
     if let Some(ref recorder) = self.page_recorder {
@@ -144,6 +179,12 @@ impl Context {
   where
     F: FnOnce(&mut Canvas),
   {
+    if let Some(recording) = self.recording.as_mut()
+      && let Some(canvas) = recording.recorder.get_recording_canvas()
+    {
+      f(canvas);
+      return;
+    }
     if let Some(ref recorder) = self.page_recorder {
       let mut rec = recorder.borrow_mut();
       if let Some(canvas) = rec.get_recording_canvas() {
@@ -157,6 +198,9 @@ impl Context {
 
   /// Sync transform state to PageRecorder for restoration after layer promotion
   fn sync_transform_to_recorder(&self) {
+    if self.recording.is_some() {
+      return;
+    }
     if let Some(ref recorder) = self.page_recorder {
       recorder.borrow_mut().set_transform(&self.state.transform);
     }
@@ -164,6 +208,9 @@ impl Context {
 
   /// Sync clip state to PageRecorder for restoration after layer promotion
   fn sync_clip_to_recorder(&self) {
+    if self.recording.is_some() {
+      return;
+    }
     if let Some(ref recorder) = self.page_recorder {
       recorder.borrow_mut().set_clip(self.state.clip_path.clone());
     }
@@ -177,25 +224,31 @@ impl Context {
     F: Fn(&mut Canvas, &Paint) -> result::Result<(), SkError>,
   {
     let blend_mode = self.state.global_composite_operation;
-    let width = self.width as f32;
-    let height = self.height as f32;
+    let bounds = self.layer_bounds();
 
+    if let Some(recording) = self.recording.as_mut()
+      && let Some(canvas) = recording.recorder.get_recording_canvas()
+    {
+      return Self::render_canvas(canvas, paint, blend_mode, bounds, f);
+    }
     if let Some(ref recorder) = self.page_recorder {
       let mut rec = recorder.borrow_mut();
       if let Some(canvas) = rec.get_recording_canvas() {
         // Use the recording canvas for deferred mode
-        return Self::render_canvas(canvas, paint, blend_mode, width, height, f);
+        return Self::render_canvas(canvas, paint, blend_mode, bounds, f);
       }
     }
     // Direct mode - use surface canvas
-    Self::render_canvas(
-      &mut self.surface.canvas,
-      paint,
-      blend_mode,
-      width,
-      height,
-      f,
-    )
+    Self::render_canvas(&mut self.surface.canvas, paint, blend_mode, bounds, f)
+  }
+
+  /// The area covered by the layers isolating a blend mode or a shadow: the
+  /// picture bounds while recording, otherwise the canvas.
+  fn layer_bounds(&self) -> (f32, f32, f32, f32) {
+    match &self.recording {
+      Some(recording) => recording.bounds,
+      None => (0.0, 0.0, self.width as f32, self.height as f32),
+    }
   }
 
   pub fn arc(
@@ -311,6 +364,7 @@ impl Context {
       && self.state.transform.get_transform().is_identity()
       && self.state.clip_path.is_none()
       && self.states.is_empty()
+      && self.recording.is_none()
     {
       // Full canvas clear - reset layers instead of accumulating
       if let Some(ref recorder) = self.page_recorder {
@@ -357,7 +411,9 @@ impl Context {
     self.sync_transform_to_recorder();
     self.sync_clip_to_recorder();
     // Track save count for layer promotion restoration
-    if let Some(ref recorder) = self.page_recorder {
+    if let Some(ref recorder) = self.page_recorder
+      && self.recording.is_none()
+    {
       recorder.borrow_mut().increment_save();
     }
   }
@@ -397,13 +453,18 @@ impl Context {
       self.sync_transform_to_recorder();
       self.sync_clip_to_recorder();
       // Track save count for layer promotion restoration
-      if let Some(ref recorder) = self.page_recorder {
+      if let Some(ref recorder) = self.page_recorder
+        && self.recording.is_none()
+      {
         recorder.borrow_mut().decrement_save();
       }
     }
   }
 
   pub fn reset(&mut self) {
+    // An unfinished recording is discarded, together with the state it saved
+    self.recording = None;
+
     // Clear the backing buffer to transparent black and reset canvas state
     self.with_canvas_state(|canvas| {
       canvas.clear();
@@ -435,8 +496,7 @@ impl Context {
     // Extract state for shadow rendering to avoid borrow conflicts
     let shadow_paint = Self::shadow_blur_paint(&self.state, &stroke_paint);
     let global_composite_operation = self.state.global_composite_operation;
-    let width = self.width as f32;
-    let height = self.height as f32;
+    let bounds = self.layer_bounds();
     let shadow_offset_x = self.state.shadow_offset_x;
     let shadow_offset_y = self.state.shadow_offset_y;
     let shadow_blur = self.state.shadow_blur;
@@ -448,8 +508,7 @@ impl Context {
           canvas,
           shadow_paint,
           global_composite_operation,
-          width,
-          height,
+          bounds,
           shadow_offset_x,
           shadow_offset_y,
           shadow_blur,
@@ -564,8 +623,7 @@ impl Context {
     // Extract state for shadow rendering to avoid borrow conflicts
     let shadow_paint = Self::shadow_blur_paint(&self.state, &fill_paint);
     let global_composite_operation = self.state.global_composite_operation;
-    let width = self.width as f32;
-    let height = self.height as f32;
+    let bounds = self.layer_bounds();
     let shadow_offset_x = self.state.shadow_offset_x;
     let shadow_offset_y = self.state.shadow_offset_y;
     let shadow_blur = self.state.shadow_blur;
@@ -577,8 +635,7 @@ impl Context {
           canvas,
           shadow_paint,
           global_composite_operation,
-          width,
-          height,
+          bounds,
           shadow_offset_x,
           shadow_offset_y,
           shadow_blur,
@@ -622,6 +679,17 @@ impl Context {
     Ok(())
   }
 
+  pub fn fill_text_block(
+    &mut self,
+    text: &str,
+    x: f32,
+    y: f32,
+    block: &TextBlock,
+  ) -> result::Result<(), SkError> {
+    let fill_paint = self.fill_paint()?;
+    self.draw_text_block(text, x, y, block, &fill_paint)
+  }
+
   pub fn stroke(&mut self, path: Option<&mut SkPath>) -> PyResult<()> {
     let stroke_paint = self.stroke_paint()?;
 
@@ -634,8 +702,7 @@ impl Context {
     // Extract state for shadow rendering to avoid borrow conflicts
     let shadow_paint = Self::shadow_blur_paint(&self.state, &stroke_paint);
     let global_composite_operation = self.state.global_composite_operation;
-    let width = self.width as f32;
-    let height = self.height as f32;
+    let bounds = self.layer_bounds();
     let shadow_offset_x = self.state.shadow_offset_x;
     let shadow_offset_y = self.state.shadow_offset_y;
     let shadow_blur = self.state.shadow_blur;
@@ -647,8 +714,7 @@ impl Context {
           canvas,
           shadow_paint,
           global_composite_operation,
-          width,
-          height,
+          bounds,
           shadow_offset_x,
           shadow_offset_y,
           shadow_blur,
@@ -676,8 +742,7 @@ impl Context {
     surface_canvas: &mut Canvas,
     paint: &Paint,
     blend_mode: BlendMode,
-    width: f32,
-    height: f32,
+    (x, y, width, height): (f32, f32, f32, f32),
     f: F,
   ) -> result::Result<(), SkError>
   where
@@ -693,7 +758,7 @@ impl Context {
         let mut layer_paint = paint.clone();
         layer_paint.set_blend_mode(BlendMode::SourceOver);
         let mut layer = PictureRecorder::new();
-        layer.begin_recording(0.0, 0.0, width, height);
+        layer.begin_recording(x, y, width, height);
         if let Some(canvas) = layer.get_recording_canvas() {
           f(canvas, &layer_paint)?;
         }
@@ -730,8 +795,7 @@ impl Context {
     // Extract state for shadow rendering to avoid borrow conflicts
     let shadow_paint = Self::shadow_blur_paint(&self.state, &fill_paint);
     let global_composite_operation = self.state.global_composite_operation;
-    let width = self.width as f32;
-    let height = self.height as f32;
+    let bounds = self.layer_bounds();
     let shadow_offset_x = self.state.shadow_offset_x;
     let shadow_offset_y = self.state.shadow_offset_y;
     let shadow_blur = self.state.shadow_blur;
@@ -743,8 +807,7 @@ impl Context {
           canvas,
           shadow_paint,
           global_composite_operation,
-          width,
-          height,
+          bounds,
           shadow_offset_x,
           shadow_offset_y,
           shadow_blur,
@@ -823,7 +886,7 @@ impl Context {
   }
 
   pub fn set_font(&mut self, font: String) -> result::Result<(), SkError> {
-    self.state.font_style = Font::new(&font)?;
+    self.state.font_style = Font::parse_cached(&font)?;
     // Apply CSS font-variant-css2 to fontVariantCaps state.
     // In font shorthand, it only supports `<font-variant-css2>= normal | small-caps`
     // Spec: https://drafts.csswg.org/css-fonts/#font-prop
@@ -840,7 +903,8 @@ impl Context {
   }
 
   pub fn set_font_variation_settings(&mut self, settings: String) -> result::Result<(), SkError> {
-    let (settings, variations) = parse_font_variation_settings(&settings);
+    let (settings, variations) =
+      FONT_VARIATION_SETTINGS_CACHE.get_or_insert(&settings, parse_font_variation_settings);
     self.state.font_variation_settings = settings;
     self.state.font_variations = variations;
     Ok(())
@@ -960,14 +1024,24 @@ impl Context {
     h: f32,
     color_type: ColorSpace,
   ) -> Option<Vec<u8>> {
-    // Use RecordingSurface for deferred mode - enables incremental rendering
     if let Some(ref recorder) = self.page_recorder {
-      return recorder
-        .borrow_mut()
-        .get_pixels(x as u32, y as u32, w as u32, h as u32, color_type);
+      let mut rec = recorder.borrow_mut();
+      let pending = rec.pending_layers();
+      // A small region is rendered on its own, replaying only the pending commands that
+      // intersect it; the layers stay pending for the next full read or encode
+      if !pending.is_empty()
+        && pending.len() <= MAX_CULLED_READ_LAYERS
+        && w >= 1.0
+        && h >= 1.0
+        && w * h * 4.0 <= self.width as f32 * self.height as f32
+      {
+        return self
+          .surface
+          .read_pixels_with_pictures(pending, x as u32, y as u32, w as u32, h as u32, color_type);
+      }
     }
-
-    // Direct mode - read from main surface
+    // Deferred mode replays only the layers recorded since the last flush
+    self.flush();
     self
       .surface
       .read_pixels(x as u32, y as u32, w as u32, h as u32, color_type)
@@ -1102,8 +1176,7 @@ impl Context {
     // Extract state for shadow rendering to avoid borrow conflicts
     let drop_shadow_paint = Self::drop_shadow_paint(&self.state, &paint);
     let global_composite_operation = self.state.global_composite_operation;
-    let width = self.width as f32;
-    let height = self.height as f32;
+    let bounds = self.layer_bounds();
     let shadow_offset_x = self.state.shadow_offset_x;
     let shadow_offset_y = self.state.shadow_offset_y;
     let shadow_blur = self.state.shadow_blur;
@@ -1117,8 +1190,7 @@ impl Context {
           canvas,
           drop_shadow_paint,
           global_composite_operation,
-          width,
-          height,
+          bounds,
           shadow_offset_x,
           shadow_offset_y,
           shadow_blur,
@@ -1192,8 +1264,7 @@ impl Context {
     // Extract state for shadow rendering to avoid borrow conflicts
     let drop_shadow_paint = Self::drop_shadow_paint(&self.state, &paint);
     let global_composite_operation = self.state.global_composite_operation;
-    let width = self.width as f32;
-    let height = self.height as f32;
+    let bounds = self.layer_bounds();
     let shadow_offset_x = self.state.shadow_offset_x;
     let shadow_offset_y = self.state.shadow_offset_y;
     let shadow_blur = self.state.shadow_blur;
@@ -1205,8 +1276,7 @@ impl Context {
           canvas,
           drop_shadow_paint,
           global_composite_operation,
-          width,
-          height,
+          bounds,
           shadow_offset_x,
           shadow_offset_y,
           shadow_blur,
@@ -1235,40 +1305,125 @@ impl Context {
     Ok(())
   }
 
-  fn draw_text(
+  /// Redirect drawing into a picture covering `x, y, width, height`. The
+  /// picture starts from the identity transform without clip, styles carry over.
+  pub(crate) fn begin_recording(
     &mut self,
-    text: &str,
     x: f32,
     y: f32,
-    max_width: f32,
-    paint: &Paint,
-    variations: &[crate::sk::FontVariation],
+    width: f32,
+    height: f32,
   ) -> result::Result<(), SkError> {
-    let font = get_font()?;
+    if self.recording.is_some() {
+      return Err(SkError::Generic(
+        "A recording is already in progress".to_owned(),
+      ));
+    }
+    let mut recorder = PictureRecorder::new();
+    recorder.begin_recording(x, y, width, height);
+
+    let mut state = self.state.clone();
+    state.transform = Matrix::identity();
+    state.clip_path = None;
+    self.path.transform_self(&self.state.transform);
+    let saved_state = std::mem::replace(&mut self.state, state);
+    self.recording = Some(PictureRecording {
+      recorder,
+      bounds: (x, y, width, height),
+      state: saved_state,
+      // `restore()` inside the recording must not unwind the states saved before it
+      states: std::mem::take(&mut self.states),
+    });
+    Ok(())
+  }
+
+  /// Finish the recording started by `begin_recording` and return to the state it saved.
+  pub(crate) fn end_recording(&mut self) -> result::Result<Picture, SkError> {
+    let Some(mut recording) = self.recording.take() else {
+      return Err(SkError::Generic("No recording in progress".to_owned()));
+    };
+    let picture = recording.recorder.finish_recording_as_picture();
+    if let Some(inverse) = recording.state.transform.invert() {
+      self.path.transform_self(&inverse);
+    }
+    self.state = recording.state;
+    self.states = recording.states;
+    let inner =
+      picture.ok_or_else(|| SkError::Generic("Finish picture recording failed".to_owned()))?;
+    Ok(Picture {
+      inner,
+      bounds: recording.bounds,
+      embed_fonts: false,
+    })
+  }
+
+  /// Replay `picture` with `matrix` applied on top of the current transform, honouring
+  /// `globalAlpha`, `globalCompositeOperation`, `filter` and the shadow.
+  pub(crate) fn draw_picture(
+    &mut self,
+    picture: &crate::sk::SkPicture,
+    matrix: &Matrix,
+  ) -> result::Result<(), SkError> {
+    let mut paint = Paint::new();
+    paint.set_alpha((self.state.global_alpha * 255.0).round() as u8);
+    paint.set_blend_mode(self.state.global_composite_operation);
+    if let Some(f) = &self.state.filter {
+      paint.set_image_filter(f);
+    }
+    // Without alpha, blending or filter the commands are replayed in place,
+    // drawing through the paint would isolate them in a layer
+    let in_place = self.state.filter.is_none()
+      && paint.get_alpha() == 255
+      && self.state.global_composite_operation == BlendMode::SourceOver;
+
+    // Extract state for shadow rendering to avoid borrow conflicts
+    let drop_shadow_paint = Self::drop_shadow_paint(&self.state, &paint);
+    let global_composite_operation = self.state.global_composite_operation;
+    let bounds = self.layer_bounds();
+    let shadow_offset_x = self.state.shadow_offset_x;
+    let shadow_offset_y = self.state.shadow_offset_y;
+    let shadow_blur = self.state.shadow_blur;
 
+    self.with_render_canvas(&paint, |canvas: &mut Canvas, paint| {
+      if let Some(drop_shadow_paint) = &drop_shadow_paint {
+        Self::render_shadow_canvas(
+          canvas,
+          drop_shadow_paint,
+          global_composite_operation,
+          bounds,
+          shadow_offset_x,
+          shadow_offset_y,
+          shadow_blur,
+          |shadow_canvas, shadow_paint| {
+            shadow_canvas.draw_picture(picture, matrix, shadow_paint);
+            Ok(())
+          },
+        )?;
+      }
+      if in_place {
+        canvas.save();
+        canvas.concat(matrix);
+        picture.playback(canvas);
+        canvas.restore();
+      } else {
+        canvas.draw_picture(picture, matrix, paint);
+      }
+      Ok(())
+    })
+  }
+
+  /// Run `draw` on the render canvas, after drawing it onto a shadow layer when a shadow is set.
+  fn render_text<F>(&mut self, paint: &Paint, draw: F) -> result::Result<(), SkError>
+  where
+    F: Fn(&mut Canvas, &Paint) -> result::Result<(), SkError>,
+  {
     // Extract all state values to avoid borrow conflicts with with_render_canvas
     let shadow_paint = Self::shadow_blur_paint(&self.state, paint);
     let global_composite_operation = self.state.global_composite_operation;
-    let width = self.width as f32;
-    let height = self.height as f32;
+    let bounds = self.layer_bounds();
     let shadow_offset_x = self.state.shadow_offset_x;
     let shadow_offset_y = self.state.shadow_offset_y;
     let shadow_blur = self.state.shadow_blur;
-    let font_weight = self.state.font_style.weight;
-    let font_stretch = self.state.font_stretch;
-    let font_stretch_percentage = font_stretch.to_width_percentage();
-    let font_style_style = self.state.font_style.style;
-    let font_size = self.state.font_style.size;
-    let font_family = self.state.font_style.family.clone();
-    let text_baseline = self.state.text_baseline;
-    let text_align = self.state.text_align;
-    let text_direction = self.state.text_direction;
-    let letter_spacing = self.state.letter_spacing;
-    let word_spacing = self.state.word_spacing;
-    let font_kerning = self.state.font_kerning;
-    let font_variant_caps = self.state.font_variant_caps;
-    let lang = self.state.lang.clone();
-    let text_rendering = self.state.text_rendering;
 
     self.with_render_canvas(paint, |canvas, paint| {
       if let Some(shadow_paint) = &shadow_paint {
@@ -1277,8 +1432,7 @@ impl Context {
           canvas,
           shadow_paint,
           global_composite_operation,
-          width,
-          height,
+          bounds,
           shadow_offset_x,
           shadow_offset_y,
           shadow_blur,
@@ -1289,36 +1443,47 @@ impl Context {
               shadow_offset_x,
               shadow_offset_y,
             )?;
-            shadow_canvas.draw_text(
-              text,
-              x,
-              y,
-              max_width,
-              width,
-              font_weight,
-              font_stretch as i32,
-              font_stretch_percentage,
-              font_style_style,
-              &font,
-              font_size,
-              &font_family,
-              text_baseline,
-              text_align,
-              text_direction,
-              letter_spacing,
-              word_spacing,
-              shadow_paint,
-              variations,
-              font_kerning,
-              font_variant_caps,
-              &lang,
-              text_rendering,
-            )?;
+            draw(shadow_canvas, shadow_paint)?;
             shadow_canvas.restore();
             Ok(())
           },
         )?;
       }
+      draw(canvas, paint)
+    })
+  }
+
+  fn draw_text(
+    &mut self,
+    text: &str,
+    x: f32,
+    y: f32,
+    max_width: f32,
+    paint: &Paint,
+    variations: &[crate::sk::FontVariation],
+  ) -> result::Result<(), SkError> {
+    let fonts = self.font_collection.clone();
+    let font = lock_fonts(fonts.as_deref())?;
+
+    // Extract all state values to avoid borrow conflicts with render_text
+    let width = self.width as f32;
+    let font_weight = self.state.font_style.weight;
+    let font_stretch = self.state.font_stretch;
+    let font_stretch_percentage = font_stretch.to_width_percentage();
+    let font_style_style = self.state.font_style.style;
+    let font_size = self.state.font_style.size;
+    let font_family = self.state.font_style.family.clone();
+    let text_baseline = self.state.text_baseline;
+    let text_align = self.state.text_align;
+    let text_direction = self.state.text_direction;
+    let letter_spacing = self.state.letter_spacing;
+    let word_spacing = self.state.word_spacing;
+    let font_kerning = self.state.font_kerning;
+    let font_variant_caps = self.state.font_variant_caps;
+    let lang = self.state.lang.clone();
+    let text_rendering = self.state.text_rendering;
+
+    self.render_text(paint, |canvas, paint| {
       canvas.draw_text(
         text,
         x,
@@ -1345,8 +1510,175 @@ impl Context {
         text_rendering,
       )?;
       Ok(())
-    })?;
-    Ok(())
+    })
+  }
+
+  fn draw_text_block(
+    &mut self,
+    text: &str,
+    x: f32,
+    y: f32,
+    block: &TextBlock,
+    paint: &Paint,
+  ) -> result::Result<(), SkError> {
+    let fonts = self.font_collection.clone();
+    let font = lock_fonts(fonts.as_deref())?;
+
+    let font_weight = self.state.font_style.weight;
+    let font_stretch = self.state.font_stretch;
+    let font_stretch_percentage = font_stretch.to_width_percentage();
+    let font_style_style = self.state.font_style.style;
+    let font_size = self.state.font_style.size;
+    let font_family = self.state.font_style.family.clone();
+    let text_baseline = self.state.text_baseline;
+    let text_direction = self.state.text_direction;
+    let letter_spacing = self.state.letter_spacing;
+    let word_spacing = self.state.word_spacing;
+    let variations = self.state.font_variations.clone();
+    let font_kerning = self.state.font_kerning;
+    let font_variant_caps = self.state.font_variant_caps;
+    let lang = self.state.lang.clone();
+    let text_rendering = self.state.text_rendering;
+
+    self.render_text(paint, |canvas, paint| {
+      canvas.draw_text_block(
+        text,
+        x,
+        y,
+        block,
+        &font,
+        font_size,
+        font_weight,
+        font_stretch as i32,
+        font_stretch_percentage,
+        font_style_style,
+        &font_family,
+        text_baseline,
+        text_direction,
+        letter_spacing,
+        word_spacing,
+        paint,
+        &variations,
+        font_kerning,
+        font_variant_caps,
+        &lang,
+        text_rendering,
+      )?;
+      Ok(())
+    })
+  }
+
+  fn create_text_blob(&mut self, text: &str) -> result::Result<(TextBlob, LineMetrics), SkError> {
+    let state = &self.state;
+    let fonts = self.font_collection.clone();
+    let font = lock_fonts(fonts.as_deref())?;
+    Ok(TextBlob::new(
+      text,
+      &font,
+      state.font_style.size,
+      state.font_style.weight,
+      state.font_stretch as i32,
+      state.font_stretch.to_width_percentage(),
+      state.font_style.style,
+      &state.font_style.family,
+      state.text_baseline,
+      state.text_align,
+      state.text_direction,
+      state.letter_spacing,
+      state.word_spacing,
+      &state.font_variations,
+      state.font_kerning,
+      state.font_variant_caps,
+      &state.lang,
+      state.text_rendering,
+    )?)
+  }
+
+  fn draw_text_blob(
+    &mut self,
+    text_blob: &TextBlob,
+    x: f32,
+    y: f32,
+  ) -> result::Result<(), SkError> {
+    let fill_paint = self.fill_paint()?;
+    self.render_text(&fill_paint, |canvas, paint| {
+      canvas.draw_text_blob(text_blob, x, y, paint);
+      Ok(())
+    })
+  }
+
+  fn get_text_block_metrics(
+    &mut self,
+    text: &str,
+    block: &TextBlock,
+  ) -> result::Result<TextBlockMetrics, SkError> {
+    if text.is_empty() {
+      return Ok(TextBlockMetrics::default());
+    }
+    let state = &self.state;
+    let fill_paint = self.fill_paint()?;
+    let fonts = self.font_collection.clone();
+    let font = lock_fonts(fonts.as_deref())?;
+    let metrics = self.surface.canvas.get_text_block_metrics(
+      text,
+      block,
+      &font,
+      state.font_style.size,
+      state.font_style.weight,
+      state.font_stretch as i32,
+      state.font_stretch.to_width_percentage(),
+      state.font_style.style,
+      &state.font_style.family,
+      state.text_direction,
+      state.letter_spacing,
+      state.word_spacing,
+      &fill_paint,
+      &state.font_variations,
+      state.font_kerning,
+      state.font_variant_caps,
+      &state.lang,
+      state.text_rendering,
+    )?;
+    Ok(TextBlockMetrics {
+      width: metrics.width as f64,
+      height: metrics.height as f64,
+      line_count: metrics.line_count,
+      did_exceed_max_lines: metrics.did_exceed_max_lines,
+    })
+  }
+
+  fn get_line_metrics_batch<S: AsRef<str>>(
+    &mut self,
+    texts: &[S],
+  ) -> result::Result<Vec<LineMetrics>, SkError> {
+    let state = &self.state;
+    let fill_paint = self.fill_paint()?;
+    let stretch = state.font_stretch;
+    let fonts = self.font_collection.clone();
+    // One lock of the font collection for the whole batch
+    let font = lock_fonts(fonts.as_deref())?;
+    let metrics = self.surface.canvas.get_line_metrics_batch(
+      texts,
+      &font,
+      state.font_style.size,
+      state.font_style.weight,
+      stretch as i32,
+      stretch.to_width_percentage(),
+      state.font_style.style,
+      &state.font_style.family,
+      state.text_baseline,
+      state.text_align,
+      state.text_direction,
+      state.letter_spacing,
+      state.word_spacing,
+      &fill_paint,
+      &state.font_variations,
+      state.font_kerning,
+      state.font_variant_caps,
+      &state.lang,
+      state.text_rendering,
+    )?;
+    Ok(metrics.into_iter().map(LineMetrics).collect())
   }
 
   fn get_line_metrics(&mut self, text: &str) -> result::Result<LineMetrics, SkError> {
@@ -1355,7 +1687,8 @@ impl Context {
     let weight = state.font_style.weight;
     let stretch = state.font_stretch;
     let slant = state.font_style.style;
-    let font = get_font()?;
+    let fonts = self.font_collection.clone();
+    let font = lock_fonts(fonts.as_deref())?;
     let line_metrics = LineMetrics(self.surface.canvas.get_line_metrics(
       text,
       &font,
@@ -1417,8 +1750,7 @@ impl Context {
     surface_canvas: &mut Canvas,
     paint: &Paint,
     blend_mode: BlendMode,
-    width: f32,
-    height: f32,
+    (x, y, width, height): (f32, f32, f32, f32),
     shadow_offset_x: f32,
     shadow_offset_y: f32,
     shadow_blur: f32,
@@ -1444,8 +1776,8 @@ impl Context {
         layer_paint.set_blend_mode(BlendMode::SourceOver);
         let mut layer = PictureRecorder::new();
         layer.begin_recording(
-          -shadow_expansion,
-          -shadow_expansion,
+          x - shadow_expansion,
+          y - shadow_expansion,
           expanded_width,
           expanded_height,
         );
@@ -1559,6 +1891,13 @@ impl CanvasRenderingContext2D {
     }
   }
 
+  /// Whether drawing is recorded and rendered when the pixels are needed, `False` for
+  /// canvases created with `{"deferred": False}` and for SVG contexts.
+  #[getter]
+  pub fn get_deferred(&self) -> bool {
+    self.context.is_deferred()
+  }
+
   #[getter(miterLimit)]
   pub fn get_miter_limit(&self) -> f32 {
     self.context.get_miter_limit()
@@ -1760,7 +2099,7 @@ impl CanvasRenderingContext2D {
 
   #[setter(letterSpacing)]
   pub fn set_letter_spacing(&mut self, spacing: String) -> PyResult<()> {
-    if let Some(size) = parse_css_size(&spacing) {
+    if let Some(size) = CSS_SIZE_CACHE.get_or_insert(&spacing, parse_css_size) {
       self.context.state.letter_spacing = size;
       self.context.state.letter_spacing_raw = spacing;
     }
@@ -1774,7 +2113,7 @@ impl CanvasRenderingContext2D {
 
   #[setter(wordSpacing)]
   pub fn set_word_spacing(&mut self, spacing: String) -> PyResult<()> {
-    if let Some(size) = parse_css_size(&spacing) {
+    if let Some(size) = CSS_SIZE_CACHE.get_or_insert(&spacing, parse_css_size) {
       self.context.state.word_spacing = size;
       self.context.state.word_spacing_raw = spacing;
     }
@@ -1922,6 +2261,21 @@ impl CanvasRenderingContext2D {
     self.context.set_lang(lang);
   }
 
+  /// Fonts used by the text methods, `None` for `GlobalFonts`.
+  #[getter(fontCollection)]
+  pub fn get_font_collection(&self) -> Option<PyFontCollection> {
+    self
+      .context
+      .font_collection
+      .clone()
+      .map(|inner| PyFontCollection { inner })
+  }
+
+  #[setter(fontCollection)]
+  pub fn set_font_collection(&mut self, collection: Option<PyRef<PyFontCollection>>) {
+    self.context.font_collection = collection.map(|collection| collection.inner.clone());
+  }
+
   #[pyo3(signature = (x, y, radius, startAngle, endAngle, anticlockwise=None))]
   pub fn arc(
     &mut self,
@@ -2219,6 +2573,36 @@ impl CanvasRenderingContext2D {
     d_width: Option<f64>,
     d_height: Option<f64>,
   ) -> PyResult<()> {
+    // SVG images replay their recorded picture as vectors at the destination transform
+    if let PyEither3::C(image) = &image
+      && image.complete
+      && let Some(svg) = &image.svg
+    {
+      let width = image.get_width() as f32;
+      let height = image.get_height() as f32;
+      let Some((sx, sy, s_width, s_height, dx, dy, d_width, d_height)) = resolve_draw_image_rects(
+        width, height, sx, sy, s_width, s_height, dx, dy, d_width, d_height,
+      ) else {
+        return Ok(());
+      };
+      if width <= 0.0 || height <= 0.0 {
+        return Ok(());
+      }
+      // The picture is recorded at the intrinsic size, the source rect is in image space
+      let scale_x = svg.width / width;
+      let scale_y = svg.height / height;
+      return self.context.draw_canvas(
+        &svg.picture,
+        sx * scale_x,
+        sy * scale_y,
+        s_width * scale_x,
+        s_height * scale_y,
+        dx,
+        dy,
+        d_width,
+        d_height,
+      );
+    }
     let bitmap = match &mut image {
       PyEither3::A(canvas) => {
         let mut ctx = canvas.ctx.borrow_mut(py);
@@ -2240,49 +2624,20 @@ impl CanvasRenderingContext2D {
       }
     };
     let bitmap_ref = bitmap.as_ref();
-    let (sx, sy, s_width, s_height, dx, dy, d_width, d_height) =
-      match (sx, sy, s_width, s_height, dx, dy, d_width, d_height) {
-        (Some(dx), Some(dy), None, None, None, None, None, None) => (
-          0.0,
-          0.0,
-          bitmap_ref.0.width as f32,
-          bitmap_ref.0.height as f32,
-          dx as f32,
-          dy as f32,
-          bitmap_ref.0.width as f32,
-          bitmap_ref.0.height as f32,
-        ),
-        (Some(dx), Some(dy), Some(d_width), Some(d_height), None, None, None, None) => (
-          0.0,
-          0.0,
-          bitmap_ref.0.width as f32,
-          bitmap_ref.0.height as f32,
-          dx as f32,
-          dy as f32,
-          d_width as f32,
-          d_height as f32,
-        ),
-        (
-          Some(sx),
-          Some(sy),
-          Some(s_width),
-          Some(s_height),
-          Some(dx),
-          Some(dy),
-          Some(d_width),
-          Some(d_height),
-        ) => (
-          sx as f32,
-          sy as f32,
-          s_width as f32,
-          s_height as f32,
-          dx as f32,
-          dy as f32,
-          d_width as f32,
-          d_height as f32,
-        ),
-        _ => return Ok(()),
-      };
+    let Some((sx, sy, s_width, s_height, dx, dy, d_width, d_height)) = resolve_draw_image_rects(
+      bitmap_ref.0.width as f32,
+      bitmap_ref.0.height as f32,
+      sx,
+      sy,
+      s_width,
+      s_height,
+      dx,
+      dy,
+      d_width,
+      d_height,
+    ) else {
+      return Ok(());
+    };
     self.context.draw_image(
       bitmap_ref, sx, sy, s_width, s_height, dx, dy, d_width, d_height,
     )?;
@@ -2562,18 +2917,38 @@ impl CanvasRenderingContext2D {
       });
     }
     let metrics = self.context.get_line_metrics(&text)?;
-    Ok(TextMetrics {
-      actual_bounding_box_ascent: metrics.0.ascent as f64,
-      actual_bounding_box_descent: metrics.0.descent as f64,
-      actual_bounding_box_left: metrics.0.left as f64,
-      actual_bounding_box_right: metrics.0.right as f64,
-      font_bounding_box_ascent: metrics.0.font_ascent as f64,
-      font_bounding_box_descent: metrics.0.font_descent as f64,
-      alphabetic_baseline: metrics.0.alphabetic_baseline as f64,
-      em_height_ascent: metrics.0.font_ascent as f64,
-      em_height_descent: metrics.0.font_descent as f64,
-      width: metrics.0.width as f64,
-    })
+    Ok(TextMetrics::from_line_metrics(&metrics))
+  }
+
+  /// Measure many strings with the current text state in one call.
+  ///
+  /// Returns a flat `array('d')` holding `len(fields)` values per string, in `fields` order.
+  #[pyo3(name = "measureTextBatch", signature = (strings, fields=None))]
+  pub fn measure_text_batch<'py>(
+    &mut self,
+    py: Python<'py>,
+    strings: Vec<PyBackedStr>,
+    fields: Option<Vec<String>>,
+  ) -> PyResult<Bound<'py, PyAny>> {
+    let fields = fields.unwrap_or_else(|| vec!["width".to_owned()]);
+    let getters = fields
+      .iter()
+      .map(|field| {
+        TextMetrics::field_getter(field)
+          .ok_or_else(|| PyValueError::new_err(format!("Unknown TextMetrics field: {field}")))
+      })
+      .collect::<PyResult<Vec<_>>>()?;
+    let metrics = self.context.get_line_metrics_batch(&strings)?;
+    let mut bytes = Vec::with_capacity(metrics.len() * getters.len() * size_of::<f64>());
+    for line_metrics in &metrics {
+      let text_metrics = TextMetrics::from_line_metrics(line_metrics);
+      for getter in &getters {
+        bytes.extend_from_slice(&getter(&text_metrics).to_ne_bytes());
+      }
+    }
+    py.import("array")?
+      .getattr("array")?
+      .call1(("d", PyBytes::new(py, &bytes)))
   }
 
   #[pyo3(name = "moveTo")]
@@ -2617,6 +2992,131 @@ impl CanvasRenderingContext2D {
     Ok(())
   }
 
+  /// Record the drawing calls that follow into a `Picture` instead of drawing them.
+  ///
+  /// `bounds` is `(x, y, width, height)`, the area the picture is expected to cover.
+  /// The recording starts from the identity transform without clip and keeps the other
+  /// styles; `endRecording` returns to the state the context had before.
+  #[pyo3(name = "beginRecording")]
+  pub fn begin_recording(&mut self, bounds: (f64, f64, f64, f64)) -> PyResult<()> {
+    let (x, y, width, height) = bounds;
+    if !(x.is_finite() && y.is_finite() && width.is_finite() && height.is_finite()) {
+      return Err(PyValueError::new_err("bounds must be finite numbers"));
+    }
+    self
+      .context
+      .begin_recording(x as f32, y as f32, width as f32, height as f32)
+      .map_err(|e| PyRuntimeError::new_err(format!("{e}")))
+  }
+
+  #[pyo3(name = "endRecording")]
+  pub fn end_recording(&mut self) -> PyResult<Picture> {
+    self
+      .context
+      .end_recording()
+      .map_err(|e| PyRuntimeError::new_err(format!("{e}")))
+  }
+
+  /// Replay a `Picture` at the current transform, with `matrix` applied first when given.
+  #[pyo3(name = "drawPicture", signature = (picture, matrix=None))]
+  pub fn draw_picture(
+    &mut self,
+    picture: PyRef<Picture>,
+    matrix: Option<PyEither<TransformObject, PyRef<DOMMatrix>>>,
+  ) -> PyResult<()> {
+    let matrix = match matrix {
+      Some(PyEither::A(transform)) => {
+        let ts = transform.into_context_transform();
+        Matrix::new(ts.a, ts.b, ts.c, ts.d, ts.e, ts.f)
+      }
+      Some(PyEither::B(transform)) => {
+        let ts = transform.xinto_context_transform();
+        Matrix::new(ts.a, ts.b, ts.c, ts.d, ts.e, ts.f)
+      }
+      None => Matrix::identity(),
+    };
+    self.context.draw_picture(&picture.inner, &matrix)?;
+    Ok(())
+  }
+
+  /// Shape `text` once with the current font, spacing, `textAlign` and `textBaseline`.
+  ///
+  /// The returned `TextBlob` is immutable and can be drawn with `drawTextBlob` any number of
+  /// times, on any context, without shaping again.
+  #[pyo3(name = "createTextBlob")]
+  pub fn create_text_blob(&mut self, text: &str) -> PyResult<PyTextBlob> {
+    let text = text.replace('\n', " ");
+    let (blob, metrics) = self.context.create_text_blob(&text)?;
+    Ok(PyTextBlob {
+      blob,
+      text,
+      metrics,
+    })
+  }
+
+  /// Outlines of `text` as `fillText(text, x, y)` would draw it, with the current font,
+  /// spacing, `textAlign` and `textBaseline`, in the same coordinates as `fillText`.
+  ///
+  /// Glyph outlines are cached per typeface and size, so repeated glyphs are not
+  /// extracted from the font again.
+  #[pyo3(name = "textToPath")]
+  pub fn text_to_path(&mut self, text: &str, x: f64, y: f64) -> PyResult<Path> {
+    let text = text.replace('\n', " ");
+    let (blob, _) = self.context.create_text_blob(&text)?;
+    Ok(Path {
+      inner: blob.to_path(x as f32, y as f32),
+    })
+  }
+
+  /// Draw a `TextBlob` at (x, y) with the current fill style, shadow and composite operation.
+  #[pyo3(name = "drawTextBlob")]
+  pub fn draw_text_blob(&mut self, blob: PyRef<PyTextBlob>, x: f64, y: f64) -> PyResult<()> {
+    if x.is_finite() && y.is_finite() {
+      self
+        .context
+        .draw_text_blob(&blob.blob, x as f32, y as f32)?;
+    }
+    Ok(())
+  }
+
+  /// Draw `text` as a block of lines, wrapped at `maxWidth` by Skia's line breaker.
+  ///
+  /// `x` is the alignment line (`align` defaults to `textAlign`) and `y` is placed by
+  /// `textBaseline`: `top`, `middle` and `bottom` refer to the whole block, the other values to
+  /// the baseline of the first line. Newlines start new lines.
+  #[pyo3(name = "fillTextBlock", signature = (text, x, y, options=None))]
+  pub fn fill_text_block(
+    &mut self,
+    text: &str,
+    x: f64,
+    y: f64,
+    options: Option<TextBlockOptions>,
+  ) -> PyResult<()> {
+    let block = options
+      .unwrap_or_default()
+      .into_text_block(self.context.state.text_align)?;
+    if text.is_empty() || !x.is_finite() || !y.is_finite() {
+      return Ok(());
+    }
+    self
+      .context
+      .fill_text_block(text, x as f32, y as f32, &block)?;
+    Ok(())
+  }
+
+  /// Measure `text` laid out as `fillTextBlock` would draw it.
+  #[pyo3(name = "measureTextBlock", signature = (text, options=None))]
+  pub fn measure_text_block(
+    &mut self,
+    text: &str,
+    options: Option<TextBlockOptions>,
+  ) -> PyResult<TextBlockMetrics> {
+    let block = options
+      .unwrap_or_default()
+      .into_text_block(self.context.state.text_align)?;
+    Ok(self.context.get_text_block_metrics(text, &block)?)
+  }
+
   #[pyo3(name = "stroke", signature = (path=None))]
   pub fn stroke(&mut self, path: Option<PyRefMut<Path>>) -> PyResult<()> {
     let mut path = path;
@@ -2725,6 +3225,8 @@ impl CanvasRenderingContext2D {
     dirtyWidth: Option<f64>,
     dirtyHeight: Option<f64>,
   ) {
+    // Pixels are written to the surface, draw the recorded operations underneath first
+    self.context.flush();
     if let Some(dirtyX) = dirtyX {
       let mut dirtyX = dirtyX as f32;
       let mut dirtyY = dirtyY.map(|d| d as f32).unwrap_or(0.0);
@@ -2882,6 +3384,99 @@ impl AsRef<Bitmap> for BitmapRef<'_> {
   }
 }
 
+/// Pre-shaped line of text, see `createTextBlob`.
+#[pyclass(name = "TextBlob", module = "canvas_pyr", frozen)]
+pub struct PyTextBlob {
+  blob: TextBlob,
+  text: String,
+  metrics: LineMetrics,
+}
+
+#[pymethods]
+impl PyTextBlob {
+  #[getter]
+  pub fn get_text(&self) -> &str {
+    &self.text
+  }
+
+  #[getter]
+  pub fn get_width(&self) -> f64 {
+    self.metrics.0.width as f64
+  }
+
+  /// Metrics of the text as `measureText` reports them with the state it was shaped with.
+  #[getter]
+  pub fn get_metrics(&self) -> TextMetrics {
+    TextMetrics::from_line_metrics(&self.metrics)
+  }
+}
+
+#[derive(Debug, Clone, Default)]
+pub struct TextBlockOptions {
+  pub max_width: Option<f64>,
+  pub line_height: Option<f64>,
+  pub max_lines: Option<u32>,
+  pub ellipsis: Option<String>,
+  pub align: Option<String>,
+}
+
+impl FromPyObject<'_, '_> for TextBlockOptions {
+  type Error = PyErr;
+
+  fn extract(obj: Borrowed<'_, '_, PyAny>) -> Result<Self, Self::Error> {
+    let dict = obj.cast::<pyo3::types::PyMapping>()?;
+    let mut options = Self::default();
+    if let Ok(value) = dict.get_item("maxWidth") {
+      options.max_width = value.extract()?;
+    }
+    if let Ok(value) = dict.get_item("lineHeight") {
+      options.line_height = value.extract()?;
+    }
+    if let Ok(value) = dict.get_item("maxLines") {
+      options.max_lines = value.extract()?;
+    }
+    if let Ok(value) = dict.get_item("ellipsis") {
+      options.ellipsis = value.extract()?;
+    }
+    if let Ok(value) = dict.get_item("align") {
+      options.align = value.extract()?;
+    }
+    Ok(options)
+  }
+}
+
+impl TextBlockOptions {
+  fn into_text_block(self, default_align: TextAlign) -> PyResult<TextBlock> {
+    let positive = |name: &str, value: Option<f64>| match value {
+      Some(v) if !(v.is_finite() && v > 0.0) => Err(PyValueError::new_err(format!(
+        "{name} must be a positive number"
+      ))),
+      _ => Ok(value.map(|v| v as f32)),
+    };
+    Ok(TextBlock {
+      max_width: positive("maxWidth", self.max_width)?,
+      line_height: positive("lineHeight", self.line_height)?,
+      max_lines: self.max_lines.filter(|n| *n > 0),
+      ellipsis: self.ellipsis,
+      align: match self.align {
+        Some(align) => align.parse()?,
+        None => default_align,
+      },
+    })
+  }
+}
+
+#[pyclass(rename_all = "camelCase", get_all, module = "canvas_pyr")]
+#[derive(Debug, Clone, Default)]
+pub struct TextBlockMetrics {
+  /// Width of the longest line
+  pub width: f64,
+  pub height: f64,
+  pub line_count: u32,
+  /// Whether `maxLines` cut the text short
+  pub did_exceed_max_lines: bool,
+}
+
 #[pyclass(rename_all = "camelCase", get_all, module = "canvas_pyr")]
 pub struct TextMetrics {
   pub actual_bounding_box_ascent: f64,
@@ -2896,6 +3491,41 @@ pub struct TextMetrics {
   pub width: f64,
 }
 
+impl TextMetrics {
+  fn from_line_metrics(metrics: &LineMetrics) -> Self {
+    Self {
+      actual_bounding_box_ascent: metrics.0.ascent as f64,
+      actual_bounding_box_descent: metrics.0.descent as f64,
+      actual_bounding_box_left: metrics.0.left as f64,
+      actual_bounding_box_right: metrics.0.right as f64,
+      font_bounding_box_ascent: metrics.0.font_ascent as f64,
+      font_bounding_box_descent: metrics.0.font_descent as f64,
+      alphabetic_baseline: metrics.0.alphabetic_baseline as f64,
+      em_height_ascent: metrics.0.font_ascent as f64,
+      em_height_descent: metrics.0.font_descent as f64,
+      width: metrics.0.width as f64,
+    }
+  }
+
+  /// Accessor for a field by its Python (camelCase) name.
+  fn field_getter(name: &str) -> Option<fn(&Self) -> f64> {
+    let getter: fn(&Self) -> f64 = match name {
+      "actualBoundingBoxAscent" => |m| m.actual_bounding_box_ascent,
+      "actualBoundingBoxDescent" => |m| m.actual_bounding_box_descent,
+      "actualBoundingBoxLeft" => |m| m.actual_bounding_box_left,
+      "actualBoundingBoxRight" => |m| m.actual_bounding_box_right,
+      "fontBoundingBoxAscent" => |m| m.font_bounding_box_ascent,
+      "fontBoundingBoxDescent" => |m| m.font_bounding_box_descent,
+      "alphabeticBaseline" => |m| m.alphabetic_baseline,
+      "emHeightAscent" => |m| m.em_height_ascent,
+      "emHeightDescent" => |m| m.em_height_descent,
+      "width" => |m| m.width,
+      _ => return None,
+    };
+    Some(getter)
+  }
+}
+
 #[pymethods]
 impl TextMetrics {
   #[pyo3(name = "to_dict")]
@@ -3049,6 +3679,65 @@ unsafe impl Sync for ContextOutputData {}
 //     }
 // }
 
+/// Resolve the `drawImage(image, dx, dy)`, `drawImage(image, dx, dy, dw, dh)` and
+/// `drawImage(image, sx, sy, sw, sh, dx, dy, dw, dh)` forms into
+/// `(sx, sy, sw, sh, dx, dy, dw, dh)`.
+fn resolve_draw_image_rects(
+  source_width: f32,
+  source_height: f32,
+  sx: Option<f64>,
+  sy: Option<f64>,
+  s_width: Option<f64>,
+  s_height: Option<f64>,
+  dx: Option<f64>,
+  dy: Option<f64>,
+  d_width: Option<f64>,
+  d_height: Option<f64>,
+) -> Option<(f32, f32, f32, f32, f32, f32, f32, f32)> {
+  match (sx, sy, s_width, s_height, dx, dy, d_width, d_height) {
+    (Some(dx), Some(dy), None, None, None, None, None, None) => Some((
+      0.0,
+      0.0,
+      source_width,
+      source_height,
+      dx as f32,
+      dy as f32,
+      source_width,
+      source_height,
+    )),
+    (Some(dx), Some(dy), Some(d_width), Some(d_height), None, None, None, None) => Some((
+      0.0,
+      0.0,
+      source_width,
+      source_height,
+      dx as f32,
+      dy as f32,
+      d_width as f32,
+      d_height as f32,
+    )),
+    (
+      Some(sx),
+      Some(sy),
+      Some(s_width),
+      Some(s_height),
+      Some(dx),
+      Some(dy),
+      Some(d_width),
+      Some(d_height),
+    ) => Some((
+      sx as f32,
+      sy as f32,
+      s_width as f32,
+      s_height as f32,
+      dx as f32,
+      dy as f32,
+      d_width as f32,
+      d_height as f32,
+    )),
+    _ => None,
+  }
+}
+
 fn parse_css_size(css_size: &str) -> Option<f32> {
   if css_size.ends_with('%') {
     return css_size
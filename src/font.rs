@@ -1,5 +1,7 @@
+use std::collections::HashMap;
+use std::convert::Infallible;
 use std::str::FromStr;
-use std::sync::OnceLock;
+use std::sync::{LazyLock, Mutex, OnceLock};
 
 use regex::Regex;
 
@@ -22,6 +24,60 @@ pub const MAX_FONT_WEIGHT: f32 = 1000.;
 /// The default font size.
 pub const FONT_MEDIUM_PX: f32 = 16.0;
 
+/// Distinct strings remembered by each [`ParseCache`] before it starts over.
+const PARSE_CACHE_CAPACITY: usize = 256;
+
+static FONT_CACHE: ParseCache<Font> = ParseCache::new();
+
+fn empty_entries<V>() -> Mutex<HashMap<String, V>> {
+  Mutex::new(HashMap::new())
+}
+
+/// Process-wide memo of parsed CSS values keyed by their source string.
+///
+/// Canvas code assigns the same few `font` / `letterSpacing` values over and
+/// over, so a repeated assignment is a hash lookup instead of a parse. The
+/// cache is dropped as a whole once it holds `PARSE_CACHE_CAPACITY` strings,
+/// which keeps generated values (e.g. animated sizes) from growing it forever.
+pub(crate) struct ParseCache<V> {
+  entries: LazyLock<Mutex<HashMap<String, V>>>,
+}
+
+impl<V: Clone> ParseCache<V> {
+  pub(crate) const fn new() -> Self {
+    Self {
+      entries: LazyLock::new(empty_entries::<V>),
+    }
+  }
+
+  /// Failed parses are not cached.
+  pub(crate) fn get_or_try_insert<E>(
+    &self,
+    key: &str,
+    parse: impl FnOnce(&str) -> Result<V, E>,
+  ) -> Result<V, E> {
+    if let Ok(entries) = self.entries.lock()
+      && let Some(value) = entries.get(key)
+    {
+      return Ok(value.clone());
+    }
+    let value = parse(key)?;
+    if let Ok(mut entries) = self.entries.lock() {
+      if entries.len() >= PARSE_CACHE_CAPACITY {
+        entries.clear();
+      }
+      entries.insert(key.to_owned(), value.clone());
+    }
+    Ok(value)
+  }
+
+  pub(crate) fn get_or_insert(&self, key: &str, parse: impl FnOnce(&str) -> V) -> V {
+    self
+      .get_or_try_insert(key, |key| Ok::<_, Infallible>(parse(key)))
+      .unwrap_or_else(|never| match never {})
+  }
+}
+
 #[derive(Debug, Clone, PartialEq)]
 pub struct Font {
   pub size: f32,
@@ -46,6 +102,11 @@ impl Default for Font {
 }
 
 impl Font {
+  /// [`Font::new`] memoized by the shorthand string.
+  pub fn parse_cached(font_rules: &str) -> Result<Font, SkError> {
+    FONT_CACHE.get_or_try_insert(font_rules, Font::new)
+  }
+
   pub fn new(font_rules: &str) -> Result<Font, SkError> {
     let font_regexp = FONT_REGEXP.get_or_init(init_font_regexp);
     let default_font = Font::default();
@@ -565,3 +626,20 @@ fn test_font_new() {
     assert_eq!(Font::new(rule).unwrap(), expect);
   }
 }
+
+#[test]
+fn test_font_parse_cached() {
+  let font = Font::parse_cached("bold 24px Iosevka Slab").unwrap();
+  assert_eq!(font, Font::new("bold 24px Iosevka Slab").unwrap());
+  assert_eq!(Font::parse_cached("bold 24px Iosevka Slab").unwrap(), font);
+  assert!(Font::parse_cached("Iosevka Slab").is_err());
+
+  let cache = ParseCache::new();
+  for i in 0..PARSE_CACHE_CAPACITY + 1 {
+    assert_eq!(
+      cache.get_or_insert(&format!("{i}px"), |s| s.len()),
+      format!("{i}px").len()
+    );
+  }
+  assert_eq!(cache.entries.lock().unwrap().len(), 1);
+}
@@ -0,0 +1,165 @@
+use std::sync::{Arc, Mutex, MutexGuard, PoisonError};
+
+use pyo3::exceptions::PyRuntimeError;
+use pyo3::prelude::*;
+
+use crate::error::SkError;
+use crate::global_fonts::{FontKey, PyFontStyleSet, PyFontStyles, get_font};
+use crate::sk::FontCollection as SkFontCollection;
+
+fn into_pyo3_error<E>(err: PoisonError<MutexGuard<'_, E>>) -> PyErr {
+  PyRuntimeError::new_err(format!("{err}"))
+}
+
+pub(crate) struct ScopedFonts {
+  fonts: Mutex<SkFontCollection>,
+  // Whether lookups continue in the global collection
+  fallback: bool,
+}
+
+/// Lock the font collection text is resolved from: `scoped`, or the global
+/// collection when it is `None`.
+///
+/// A scoped collection searches a snapshot of the global fonts, refreshed
+/// when they changed. The global collection is locked, always first, only
+/// while that is checked, so other threads can use it meanwhile.
+pub(crate) fn lock_fonts(
+  scoped: Option<&ScopedFonts>,
+) -> Result<MutexGuard<'_, SkFontCollection>, SkError> {
+  let Some(scoped) = scoped else {
+    return Ok(get_font()?);
+  };
+  if !scoped.fallback {
+    return Ok(scoped.fonts.lock()?);
+  }
+  let global = get_font()?;
+  let fonts = scoped.fonts.lock()?;
+  fonts.sync_fallback();
+  drop(global);
+  Ok(fonts)
+}
+
+/// A set of fonts that can be attached to a context with
+/// `ctx.fontCollection = collection`, instead of registering them in
+/// `GlobalFonts`.
+///
+/// Registering or removing fonts here neither takes the global lock nor
+/// clears the caches of other collections, and the fonts are released
+/// together with the collection. With `fallback=True` families that are not
+/// found here are looked up in `GlobalFonts`.
+#[pyclass(module = "canvas_pyr", name = "FontCollection", frozen, eq)]
+pub struct PyFontCollection {
+  pub(crate) inner: Arc<ScopedFonts>,
+}
+
+impl PartialEq for PyFontCollection {
+  fn eq(&self, other: &Self) -> bool {
+    Arc::ptr_eq(&self.inner, &other.inner)
+  }
+}
+
+impl PyFontCollection {
+  fn fonts(&self) -> PyResult<MutexGuard<'_, SkFontCollection>> {
+    self.inner.fonts.lock().map_err(into_pyo3_error)
+  }
+}
+
+#[pymethods]
+#[allow(non_snake_case)]
+impl PyFontCollection {
+  #[new]
+  #[pyo3(signature = (fallback=true))]
+  pub fn new(fallback: bool) -> PyResult<Self> {
+    let fonts = if fallback {
+      let global = get_font().map_err(into_pyo3_error)?;
+      SkFontCollection::new_scoped(Some(&global))
+    } else {
+      SkFontCollection::new_scoped(None)
+    };
+    Ok(Self {
+      inner: Arc::new(ScopedFonts {
+        fonts: Mutex::new(fonts),
+        fallback,
+      }),
+    })
+  }
+
+  #[getter]
+  pub fn get_fallback(&self) -> bool {
+    self.inner.fallback
+  }
+
+  #[pyo3(signature = (font, nameAlias=None))]
+  pub fn register(&self, font: &[u8], nameAlias: Option<String>) -> PyResult<Option<FontKey>> {
+    let maybe_name_alias = nameAlias.filter(|s| !s.is_empty());
+    Ok(
+      self
+        .fonts()?
+        .register(font, maybe_name_alias)
+        .map(|typeface_id| FontKey { typeface_id }),
+    )
+  }
+
+  #[pyo3(name = "registerFromPath", signature = (fontPath, nameAlias=None))]
+  pub fn register_from_path(
+    &self,
+    fontPath: String,
+    nameAlias: Option<String>,
+  ) -> PyResult<Option<FontKey>> {
+    let maybe_name_alias = nameAlias.filter(|s| !s.is_empty());
+    Ok(
+      self
+        .fonts()?
+        .register_from_path(fontPath.as_str(), maybe_name_alias)
+        .map(|typeface_id| FontKey { typeface_id }),
+    )
+  }
+
+  /// Whether `name` is registered in this collection, not counting the
+  /// global fallback.
+  pub fn has(&self, name: String) -> PyResult<bool> {
+    Ok(
+      self
+        .fonts()?
+        .get_families()
+        .iter()
+        .any(|f| f.family == name),
+    )
+  }
+
+  #[pyo3(name = "getFamilies")]
+  pub fn get_families(&self) -> PyResult<Vec<PyFontStyleSet>> {
+    let ret = self
+      .fonts()?
+      .get_families()
+      .into_iter()
+      .map(|f| PyFontStyleSet {
+        family: f.family,
+        styles: f
+          .styles
+          .into_iter()
+          .map(|s| PyFontStyles {
+            weight: s.weight,
+            width: s.width,
+            style: s.style,
+          })
+          .collect(),
+      })
+      .collect();
+    Ok(ret)
+  }
+
+  #[pyo3(name = "setAlias", signature = (fontName, alias))]
+  pub fn set_alias(&self, fontName: String, alias: String) -> PyResult<bool> {
+    Ok(self.fonts()?.set_alias(fontName.as_str(), alias.as_str()))
+  }
+
+  pub fn remove(&self, key: &FontKey) -> PyResult<bool> {
+    Ok(self.fonts()?.unregister(key.typeface_id))
+  }
+
+  #[pyo3(name = "removeAll")]
+  pub fn remove_all(&self) -> PyResult<u32> {
+    Ok(self.fonts()?.unregister_all() as u32)
+  }
+}
@@ -0,0 +1,132 @@
+use std::collections::{HashMap, HashSet};
+use std::env;
+use std::fs;
+use std::io;
+use std::path::{Path, PathBuf};
+use std::sync::{LazyLock, Mutex, PoisonError};
+use std::time::UNIX_EPOCH;
+
+use crate::sk::TypefaceInfo;
+
+const INDEX_FILE_NAME: &str = "font-index.json";
+// Bump when the layout of `FontIndex` or the meaning of its fields changes
+const INDEX_VERSION: u32 = 1;
+
+/// Directory holding the font index, `None` disables it. Defaults to
+/// `CANVAS_PYR_FONT_INDEX_DIR`, the only way to affect the scan at import.
+static FONT_INDEX_DIR: LazyLock<Mutex<Option<PathBuf>>> = LazyLock::new(|| {
+  Mutex::new(
+    env::var_os("CANVAS_PYR_FONT_INDEX_DIR")
+      .filter(|dir| !dir.is_empty())
+      .map(PathBuf::from),
+  )
+});
+
+pub(crate) fn index_dir() -> Option<PathBuf> {
+  FONT_INDEX_DIR
+    .lock()
+    .unwrap_or_else(PoisonError::into_inner)
+    .clone()
+}
+
+pub(crate) fn set_index_dir(dir: Option<PathBuf>) {
+  *FONT_INDEX_DIR
+    .lock()
+    .unwrap_or_else(PoisonError::into_inner) = dir;
+}
+
+/// Size and modification time, an entry is trusted only while both match.
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Serialize, Deserialize)]
+pub(crate) struct FileStamp {
+  len: u64,
+  modified_secs: u64,
+  modified_nanos: u32,
+}
+
+impl FileStamp {
+  pub(crate) fn of(path: &str) -> Option<Self> {
+    let metadata = fs::metadata(path).ok()?;
+    let modified = metadata.modified().ok()?.duration_since(UNIX_EPOCH).ok()?;
+    Some(Self {
+      len: metadata.len(),
+      modified_secs: modified.as_secs(),
+      modified_nanos: modified.subsec_nanos(),
+    })
+  }
+}
+
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub(crate) struct IndexedFont {
+  stamp: FileStamp,
+  // `None` for files that are not fonts, so they are not parsed again either
+  face: Option<TypefaceInfo>,
+}
+
+impl IndexedFont {
+  pub(crate) fn new(stamp: FileStamp, face: Option<TypefaceInfo>) -> Self {
+    Self { stamp, face }
+  }
+}
+
+/// Family and style of every font file seen by `loadFontsFromDir` and the
+/// system font scan, keyed by path. Files whose entry is still current are
+/// registered without being opened.
+#[derive(Debug, Default, Serialize, Deserialize)]
+pub(crate) struct FontIndex {
+  version: u32,
+  fonts: HashMap<String, IndexedFont>,
+  #[serde(skip)]
+  dirty: bool,
+}
+
+impl FontIndex {
+  /// A missing, unreadable or outdated index is an empty one.
+  pub(crate) fn load(dir: &Path) -> Self {
+    fs::read(dir.join(INDEX_FILE_NAME))
+      .ok()
+      .and_then(|bytes| serde_json::from_slice::<FontIndex>(&bytes).ok())
+      .filter(|index| index.version == INDEX_VERSION)
+      .unwrap_or_else(|| FontIndex {
+        version: INDEX_VERSION,
+        ..Default::default()
+      })
+  }
+
+  /// Written next to the index and renamed over it, concurrent readers never
+  /// see a partial file.
+  pub(crate) fn save(&self, dir: &Path) -> io::Result<()> {
+    if !self.dirty {
+      return Ok(());
+    }
+    fs::create_dir_all(dir)?;
+    let bytes = serde_json::to_vec(self).map_err(io::Error::other)?;
+    let tmp_path = dir.join(format!("{INDEX_FILE_NAME}.{}.tmp", std::process::id()));
+    fs::write(&tmp_path, bytes)?;
+    fs::rename(&tmp_path, dir.join(INDEX_FILE_NAME)).inspect_err(|_| {
+      let _ = fs::remove_file(&tmp_path);
+    })
+  }
+
+  /// `Some(face)` when `path` is indexed with the same stamp.
+  pub(crate) fn get(&self, path: &str, stamp: &FileStamp) -> Option<Option<&TypefaceInfo>> {
+    self
+      .fonts
+      .get(path)
+      .filter(|font| font.stamp == *stamp)
+      .map(|font| font.face.as_ref())
+  }
+
+  pub(crate) fn insert(&mut self, path: String, font: IndexedFont) {
+    self.fonts.insert(path, font);
+    self.dirty = true;
+  }
+
+  /// Forget files under `dir` that were not found by the latest scan of it.
+  pub(crate) fn retain_found(&mut self, dir: &str, found: &HashSet<&str>) {
+    let before = self.fonts.len();
+    self
+      .fonts
+      .retain(|path, _| !Path::new(path).starts_with(dir) || found.contains(path.as_str()));
+    self.dirty |= self.fonts.len() != before;
+  }
+}
@@ -1,10 +1,13 @@
 use std::env;
 use std::fs::read_dir;
 use std::path::{self, PathBuf};
-use std::sync::{LazyLock, LockResult, Mutex, MutexGuard, OnceLock, PoisonError};
+use std::sync::{Condvar, LazyLock, LockResult, Mutex, MutexGuard, OnceLock, PoisonError};
+use std::thread;
+use std::time::Duration;
 
 use pyo3::prelude::*;
 
+use crate::font_index::{self, FileStamp, FontIndex, IndexedFont};
 use crate::sk::*;
 
 #[cfg(target_os = "windows")]
@@ -16,13 +19,67 @@ const FONT_PATH: &str = "/usr/share/fonts/";
 #[cfg(target_os = "android")]
 const FONT_PATH: &str = "/system/fonts";
 
-static FONT_DIR: OnceLock<PyResult<u32>> = OnceLock::new();
+static FONT_DIR: OnceLock<Result<u32, String>> = OnceLock::new();
 
 pub(crate) static GLOBAL_FONT_COLLECTION: LazyLock<Mutex<FontCollection>> =
   LazyLock::new(|| Mutex::new(FontCollection::new()));
 
+static SYSTEM_FONT_SCAN: FontScan = FontScan {
+  done: Mutex::new(true),
+  finished: Condvar::new(),
+};
+
+/// Completion of the system font scan that `init_fonts` runs in the background.
+struct FontScan {
+  done: Mutex<bool>,
+  finished: Condvar,
+}
+
+impl FontScan {
+  fn done(&self) -> MutexGuard<'_, bool> {
+    self.done.lock().unwrap_or_else(PoisonError::into_inner)
+  }
+
+  fn start(&self) {
+    *self.done() = false;
+  }
+
+  fn finish(&self) {
+    *self.done() = true;
+    self.finished.notify_all();
+  }
+
+  fn is_done(&self) -> bool {
+    *self.done()
+  }
+
+  /// Returns whether the scan has finished, waiting at most `timeout`.
+  fn wait(&self, timeout: Option<Duration>) -> bool {
+    let done = self.done();
+    match timeout {
+      Some(timeout) => {
+        let (done, _) = self
+          .finished
+          .wait_timeout_while(done, timeout, |done| !*done)
+          .unwrap_or_else(PoisonError::into_inner);
+        *done
+      }
+      None => *self
+        .finished
+        .wait_while(done, |done| !*done)
+        .unwrap_or_else(PoisonError::into_inner),
+    }
+  }
+}
+
+/// Lock the global font collection once the system fonts are loaded, so
+/// lookups never see a partially scanned collection.
 #[inline]
 pub(crate) fn get_font<'a>() -> LockResult<MutexGuard<'a, FontCollection>> {
+  if !SYSTEM_FONT_SCAN.is_done() {
+    // Other threads keep running Python code while the scan finishes
+    Python::attach(|py| py.detach(|| SYSTEM_FONT_SCAN.wait(None)));
+  }
   GLOBAL_FONT_COLLECTION.lock()
 }
 
@@ -70,8 +127,14 @@ pub struct FontKey {
 pub mod global_fonts {
   use pyo3::{exceptions::PyRuntimeError, prelude::*};
 
+  use std::path::PathBuf;
+  use std::time::Duration;
+
+  use pyo3::exceptions::PyValueError;
+
   use super::{
-    FONT_DIR, FONT_PATH, FontKey, PyFontStyleSet, PyFontStyles, get_font, into_pyo3_error,
+    FONT_DIR, FONT_PATH, FontKey, PyFontStyleSet, PyFontStyles, SYSTEM_FONT_SCAN, get_font,
+    into_pyo3_error,
   };
 
   #[pyfunction]
@@ -88,6 +151,9 @@ pub mod global_fonts {
 
   /// Register a font from a file path.
   ///
+  /// The file is memory-mapped, not read, so processes using the same font
+  /// file share its pages through the page cache.
+  ///
   /// Fonts registered via path are deduplicated by the path string itself, not by file contents.
   /// This means:
   /// - Registering the same path multiple times returns the existing registration
@@ -163,15 +229,63 @@ pub mod global_fonts {
   pub fn load_system_fonts() -> PyResult<u32> {
     FONT_DIR
       .get_or_init(move || super::load_fonts_from_dir(FONT_PATH))
-      .as_ref()
-      .map(|s| *s)
+      .clone()
       .map_err(PyRuntimeError::new_err)
   }
 
+  /// Whether the system fonts scanned in the background since import are
+  /// all registered. Font lookups wait for the scan on their own.
+  #[pyfunction]
+  pub fn ready() -> bool {
+    SYSTEM_FONT_SCAN.is_done()
+  }
+
+  /// Block until the background system font scan finishes, or `timeout`
+  /// seconds pass. Returns `ready()`. Call it before forking worker
+  /// processes so they inherit a complete collection.
+  #[pyfunction]
+  #[pyo3(signature = (timeout=None))]
+  pub fn wait(py: Python<'_>, timeout: Option<f64>) -> PyResult<bool> {
+    let timeout = timeout
+      .map(Duration::try_from_secs_f64)
+      .transpose()
+      .map_err(|err| PyValueError::new_err(format!("Invalid timeout: {err}")))?;
+    Ok(py.detach(|| SYSTEM_FONT_SCAN.wait(timeout)))
+  }
+
+  /// Open the given families (all registered ones by default) now, so a
+  /// pre-fork server master can hand workers fonts that are already mapped
+  /// and parsed; the pages are shared copy-on-write instead of each worker
+  /// loading its own copy. Returns the number of typefaces opened.
+  #[pyfunction]
+  #[pyo3(name = "warmUp", signature = (families=None))]
+  pub fn warm_up(families: Option<Vec<String>>) -> PyResult<usize> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    font
+      .warm_up(families.as_deref())
+      .map_err(|err| PyValueError::new_err(err.to_string()))
+  }
+
+  /// Keep a persistent index of font file metadata in `dir` (or stop with
+  /// `None`). Indexed files that did not change since are registered by
+  /// `loadFontsFromDir` without being opened until their glyphs are needed.
+  /// The scan at import reads `CANVAS_PYR_FONT_INDEX_DIR` instead.
+  #[pyfunction]
+  #[pyo3(name = "setFontIndexDir")]
+  pub fn set_font_index_dir(dir: Option<PathBuf>) {
+    crate::font_index::set_index_dir(dir);
+  }
+
+  #[pyfunction]
+  #[pyo3(name = "getFontIndexDir")]
+  pub fn get_font_index_dir() -> Option<String> {
+    crate::font_index::index_dir().map(|dir| dir.to_string_lossy().into_owned())
+  }
+
   #[pyfunction]
   #[pyo3(name = "loadFontsFromDir")]
   pub fn load_fonts_from_dir(dir: String) -> PyResult<u32> {
-    super::load_fonts_from_dir(dir.as_str())
+    super::load_fonts_from_dir(dir.as_str()).map_err(PyRuntimeError::new_err)
   }
 
   #[pyfunction]
@@ -246,6 +360,121 @@ pub mod global_fonts {
     )
   }
 
+  /// Hit-rate statistics of the laid-out paragraph cache shared by
+  /// `fillText`, `strokeText` and `measureText`.
+  #[pyclass(get_all, skip_from_py_object)]
+  #[derive(Debug, Clone)]
+  pub struct ParagraphCacheStats {
+    pub capacity: usize,
+    pub count: usize,
+    pub hits: u64,
+    pub misses: u64,
+    pub evictions: u64,
+  }
+
+  #[pyfunction]
+  #[pyo3(name = "getParagraphCacheStats")]
+  pub fn get_paragraph_cache_stats() -> PyResult<ParagraphCacheStats> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    let stats = font.paragraph_cache_stats();
+    Ok(ParagraphCacheStats {
+      capacity: stats.capacity,
+      count: stats.count,
+      hits: stats.hits,
+      misses: stats.misses,
+      evictions: stats.evictions,
+    })
+  }
+
+  /// Set the maximum number of laid-out paragraphs kept for reuse.
+  /// `0` disables the cache. Least recently used entries are evicted first.
+  #[pyfunction]
+  #[pyo3(name = "setParagraphCacheCapacity")]
+  pub fn set_paragraph_cache_capacity(capacity: usize) -> PyResult<()> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    font.set_paragraph_cache_capacity(capacity);
+    Ok(())
+  }
+
+  /// Drop every cached paragraph and reset the statistics.
+  #[pyfunction]
+  #[pyo3(name = "clearParagraphCache")]
+  pub fn clear_paragraph_cache() -> PyResult<()> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    font.clear_paragraph_cache();
+    Ok(())
+  }
+
+  /// Statistics of the variable font instances kept for the coordinate sets
+  /// used by `fontVariationSettings` and `fontStretch`.
+  #[pyclass(get_all, skip_from_py_object)]
+  #[derive(Debug, Clone)]
+  pub struct VariationCacheStats {
+    pub capacity: usize,
+    pub count: usize,
+    pub hits: u64,
+    pub misses: u64,
+    pub evictions: u64,
+  }
+
+  #[pyfunction]
+  #[pyo3(name = "getVariationCacheStats")]
+  pub fn get_variation_cache_stats() -> PyResult<VariationCacheStats> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    let stats = font.variation_cache_stats();
+    Ok(VariationCacheStats {
+      capacity: stats.capacity,
+      count: stats.count,
+      hits: stats.hits,
+      misses: stats.misses,
+      evictions: stats.evictions,
+    })
+  }
+
+  /// Set how many distinct variation coordinate sets keep their instantiated
+  /// typefaces. Past the limit the least recently used set is released and
+  /// re-created on demand; `0` keeps none.
+  #[pyfunction]
+  #[pyo3(name = "setVariationCacheCapacity")]
+  pub fn set_variation_cache_capacity(capacity: usize) -> PyResult<()> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    font.set_variation_cache_capacity(capacity);
+    Ok(())
+  }
+
+  /// Whether single lines of plain ASCII text with default spacing, direction
+  /// and locale are shaped directly instead of through a full paragraph
+  /// layout. On by default, the metrics and pixels are the same either way.
+  /// Lines shaped either way are kept in the paragraph cache, which is
+  /// cleared when this changes.
+  #[pyfunction]
+  #[pyo3(name = "setTextFastPath")]
+  pub fn set_text_fast_path(enabled: bool) -> PyResult<()> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    font.set_simple_text_fast_path(enabled);
+    Ok(())
+  }
+
+  /// Families searched, in order, for characters the requested `font-family`
+  /// list cannot render, e.g. `["Noto Sans CJK SC", "Noto Color Emoji"]`.
+  /// The font picked for each character is cached until fonts change.
+  /// An empty list restores the default lookup.
+  #[pyfunction]
+  #[pyo3(name = "setFallbackFamilies")]
+  pub fn set_fallback_families(families: Vec<String>) -> PyResult<()> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    font
+      .set_fallback_families(&families)
+      .map_err(|err| pyo3::exceptions::PyValueError::new_err(err.to_string()))
+  }
+
+  #[pyfunction]
+  #[pyo3(name = "getFallbackFamilies")]
+  pub fn get_fallback_families() -> PyResult<Vec<String>> {
+    let font = get_font().map_err(into_pyo3_error)?;
+    Ok(font.fallback_families())
+  }
+
   #[pyfunction]
   #[pyo3(name = "hasVariations")]
   pub fn has_variations(familyName: String, weight: i32, width: i32, slant: i32) -> PyResult<bool> {
@@ -254,13 +483,37 @@ pub mod global_fonts {
   }
 }
 
-fn load_fonts_from_dir<P: AsRef<path::Path>>(dir: P) -> PyResult<u32> {
-  let mut count = 0u32;
+/// Errors are plain strings: the background scan logs them, and formatting a
+/// `PyErr` would need the GIL a font lookup may hold while waiting for it.
+fn load_fonts_from_dir<P: AsRef<path::Path>>(dir: P) -> Result<u32, String> {
+  let mut files = Vec::new();
+  collect_font_files(dir.as_ref(), true, &mut files);
+  let Some(index_dir) = font_index::index_dir() else {
+    return register_font_files(&files, None).map(|(count, _)| count);
+  };
+  let mut index = FontIndex::load(&index_dir);
+  let (count, new_fonts) = register_font_files(&files, Some(&index))?;
+  for (path, font) in new_fonts {
+    index.insert(path, font);
+  }
+  if let Some(dir) = dir.as_ref().to_str() {
+    let found = files.iter().map(|(path, _)| path.as_str()).collect();
+    index.retain_found(dir, &found);
+  }
+  if let Err(e) = index.save(&index_dir) {
+    eprintln!("Failed to save font index to {}: {e}", index_dir.display());
+  }
+  Ok(count)
+}
+
+/// Font files under `dir` in directory order, flagged when they sit directly
+/// in the top directory: only those are counted, as before.
+fn collect_font_files(dir: &path::Path, top_level: bool, files: &mut Vec<(String, bool)>) {
   if let Ok(dir) = read_dir(dir) {
     for f in dir.flatten() {
       if let Ok(meta) = f.metadata() {
         if meta.is_dir() {
-          load_fonts_from_dir(f.path())?;
+          collect_font_files(&f.path(), false, files);
         } else {
           let p = f.path();
           // The font file extensions are case-insensitive.
@@ -272,14 +525,8 @@ fn load_fonts_from_dir<P: AsRef<path::Path>>(dir: P) -> PyResult<u32> {
           match ext.as_deref() {
             Some("ttf") | Some("ttc") | Some("otf") | Some("pfb") | Some("woff2")
             | Some("woff") => {
-              if let Some(p) = p.into_os_string().to_str() {
-                let font_collection = get_font().map_err(into_pyo3_error)?;
-                if font_collection
-                  .register_from_path::<String>(p, None)
-                  .is_some()
-                {
-                  count += 1;
-                }
+              if let Ok(p) = p.into_os_string().into_string() {
+                files.push((p, top_level));
               }
             }
             _ => {}
@@ -288,7 +535,77 @@ fn load_fonts_from_dir<P: AsRef<path::Path>>(dir: P) -> PyResult<u32> {
       }
     }
   }
-  Ok(count)
+}
+
+/// Open a font file, through the index when there is one. Returns the index
+/// entry to add when the file had to be parsed.
+fn open_font_file(
+  path: &str,
+  index: Option<&FontIndex>,
+) -> (Option<Typeface>, Option<IndexedFont>) {
+  let Some((index, stamp)) = index.zip(FileStamp::of(path)) else {
+    return (Typeface::from_file(path), None);
+  };
+  if let Some(face) = index.get(path, &stamp) {
+    return (face.and_then(|info| Typeface::from_index(path, info)), None);
+  }
+  let typeface = Typeface::from_file(path);
+  let face = typeface.as_ref().map(Typeface::info);
+  (typeface, Some(IndexedFont::new(stamp, face)))
+}
+
+/// Parse the files on all cores, then register them in order under one lock.
+fn register_font_files(
+  files: &[(String, bool)],
+  index: Option<&FontIndex>,
+) -> Result<(u32, Vec<(String, IndexedFont)>), String> {
+  if files.is_empty() {
+    return Ok((0, vec![]));
+  }
+  let workers = num_cpus::get().clamp(1, files.len());
+  let parsed = thread::scope(|scope| {
+    let handles = files
+      .chunks(files.len().div_ceil(workers))
+      .map(|chunk| {
+        scope.spawn(move || {
+          chunk
+            .iter()
+            .map(|(path, counted)| {
+              let (typeface, indexed) = open_font_file(path, index);
+              (path, *counted, typeface, indexed)
+            })
+            .collect::<Vec<_>>()
+        })
+      })
+      .collect::<Vec<_>>();
+    handles
+      .into_iter()
+      .filter_map(|handle| handle.join().ok())
+      .collect::<Vec<_>>()
+  });
+  // Not `get_font`, this also runs on the background scan it waits for
+  let font_collection = GLOBAL_FONT_COLLECTION
+    .lock()
+    .map_err(|err| err.to_string())?;
+  let parsed = parsed.into_iter().flatten().collect::<Vec<_>>();
+  let (counted, fonts): (Vec<_>, Vec<_>) = parsed
+    .iter()
+    .filter_map(|(path, counted, typeface, _)| {
+      typeface
+        .as_ref()
+        .map(|typeface| (*counted, (path.as_str(), typeface)))
+    })
+    .unzip();
+  let count = counted
+    .into_iter()
+    .zip(font_collection.register_typefaces_from_paths(&fonts))
+    .filter(|(counted, typeface_id)| *counted && typeface_id.is_some())
+    .count() as u32;
+  let new_fonts = parsed
+    .into_iter()
+    .filter_map(|(path, _, _, indexed)| indexed.map(|indexed| (path.clone(), indexed)))
+    .collect();
+  Ok((count, new_fonts))
 }
 
 fn home_dir() -> Option<PathBuf> {
@@ -303,13 +620,46 @@ fn load_fonts_and_log<P: AsRef<path::Path>>(dir: P) {
   }
 }
 
-pub fn init_fonts() {
-  // Preload system fonts on startup to avoid latency on first use.
+pub fn init_fonts(m: &Bound<'_, PyModule>) -> PyResult<()> {
+  // Preload system fonts in the background so importing the module stays fast,
+  // font lookups wait for the scan (see `get_font`).
   // The GlobalFonts module provides a Python API to load additional fonts on demand.
   if env::var_os("DISABLE_SYSTEM_FONTS_LOAD").is_some() {
-    return;
+    return Ok(());
+  }
+
+  SYSTEM_FONT_SCAN.start();
+  let scan = || {
+    // A panic must not leave lookups waiting forever
+    let _ = std::panic::catch_unwind(load_system_font_dirs);
+    SYSTEM_FONT_SCAN.finish();
+  };
+  if thread::Builder::new()
+    .name("canvas_pyr-fonts".to_owned())
+    .spawn(scan)
+    .is_err()
+  {
+    scan();
+  }
+  wait_for_scan_before_fork(m)
+}
+
+/// Make `os.fork()` wait for the background font scan: a child forked in the
+/// middle of it would inherit a collection that never finishes loading.
+fn wait_for_scan_before_fork(m: &Bound<'_, PyModule>) -> PyResult<()> {
+  let os = m.py().import("os")?;
+  // Not available on Windows, which has no fork
+  if !os.hasattr("register_at_fork")? {
+    return Ok(());
   }
+  let wait = wrap_pyfunction!(global_fonts::wait, m)?;
+  let kwargs = pyo3::types::PyDict::new(m.py());
+  kwargs.set_item("before", wait)?;
+  os.call_method("register_at_fork", (), Some(&kwargs))?;
+  Ok(())
+}
 
+fn load_system_font_dirs() {
   if let Err(e) = global_fonts::load_system_fonts() {
     eprintln!("Failed to load system fonts: {e}");
   }
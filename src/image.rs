@@ -1,14 +1,17 @@
-use std::{borrow::Cow, str, str::FromStr};
+use std::{borrow::Cow, ops::Deref, slice, str, str::FromStr};
 
 use base64_simd::STANDARD;
+use pyo3::buffer::PyBuffer;
 use pyo3::exceptions::{PyRuntimeError, PyValueError};
 use pyo3::prelude::*;
-use pyo3::types::PyByteArray;
+use pyo3::pybacked::PyBackedBytes;
+use pyo3::types::{PyByteArray, PyString};
 
 use crate::avif::AvifImage;
 use crate::error::SkError;
 use crate::global_fonts::get_font;
-use crate::sk::{AlphaType, Bitmap, ColorSpace, ColorType};
+use crate::image_cache::{ImageCache, ImageCacheKey};
+use crate::sk::{AlphaType, Bitmap, ColorSpace, ColorType, SkPicture, SkiaDataRef};
 
 #[pyclass(unsendable, module = "canvas_pyr")]
 pub struct ImageData {
@@ -232,21 +235,140 @@ impl ImageData {
   }
 }
 
-#[derive(FromPyObject)]
+/// Image bytes borrowed from a Python object without copying them into Rust.
+///
+/// Only held while the image is decoded, so the exporting object can be closed
+/// or resized afterwards.
+pub enum ImageBuffer {
+  /// `bytes` are shared as is, `bytearray` is copied by `PyBackedBytes`
+  Bytes(PyBackedBytes),
+  /// Any other C-contiguous buffer-protocol object (memoryview, mmap, numpy arrays, ...)
+  View(PyBuffer<u8>),
+}
+
+impl Deref for ImageBuffer {
+  type Target = [u8];
+
+  fn deref(&self) -> &[u8] {
+    match self {
+      ImageBuffer::Bytes(bytes) => bytes,
+      ImageBuffer::View(view) => unsafe {
+        slice::from_raw_parts(view.buf_ptr() as *const u8, view.len_bytes())
+      },
+    }
+  }
+}
+
+impl FromPyObject<'_, '_> for ImageBuffer {
+  type Error = PyErr;
+
+  fn extract(obj: Borrowed<'_, '_, PyAny>) -> Result<Self, Self::Error> {
+    if let Ok(bytes) = obj.extract::<PyBackedBytes>() {
+      return Ok(ImageBuffer::Bytes(bytes));
+    }
+    let view = obj.extract::<PyBuffer<u8>>()?;
+    if !view.is_c_contiguous() {
+      return Err(PyValueError::new_err("Image buffer must be C-contiguous"));
+    }
+    Ok(ImageBuffer::View(view))
+  }
+}
+
 pub enum ImageSrcEnum {
-  Buffer(Vec<u8>),
+  Buffer(ImageBuffer),
   String(String),
 }
 
+impl FromPyObject<'_, '_> for ImageSrcEnum {
+  type Error = PyErr;
+
+  fn extract(obj: Borrowed<'_, '_, PyAny>) -> Result<Self, Self::Error> {
+    if obj.is_instance_of::<PyString>() {
+      return Ok(ImageSrcEnum::String(obj.extract()?));
+    }
+    // Keeps the ValueError of non-contiguous buffers
+    Ok(ImageSrcEnum::Buffer(obj.extract()?))
+  }
+}
+
+/// What `Image.src` reports. The loaded bytes themselves are released after
+/// decoding.
+pub(crate) enum ImageSrc {
+  Bytes,
+  String(String),
+}
+
+impl From<&ImageSrcEnum> for ImageSrc {
+  fn from(src: &ImageSrcEnum) -> Self {
+    match src {
+      ImageSrcEnum::Buffer(_) => ImageSrc::Bytes,
+      ImageSrcEnum::String(s) => ImageSrc::String(s.clone()),
+    }
+  }
+}
+
+impl ImageSrc {
+  fn as_str(&self) -> &str {
+    match self {
+      ImageSrc::Bytes => BYTES_SRC_REPR,
+      ImageSrc::String(s) => s,
+    }
+  }
+}
+
 impl AsRef<[u8]> for ImageSrcEnum {
   fn as_ref(&self) -> &[u8] {
     match self {
-      ImageSrcEnum::Buffer(buf) => buf.as_ref(),
+      ImageSrcEnum::Buffer(buf) => buf,
       ImageSrcEnum::String(s) => s.as_bytes(),
     }
   }
 }
 
+/// Options accepted by `Image.load`.
+#[derive(Default)]
+pub struct ImageLoadOptions {
+  /// Upper bound for the decoded width, `None` means unbounded.
+  pub max_width: Option<u32>,
+  /// Upper bound for the decoded height, `None` means unbounded.
+  pub max_height: Option<u32>,
+  /// Shared cache of decoded bitmaps.
+  pub cache: Option<Py<ImageCache>>,
+}
+
+impl ImageLoadOptions {
+  /// Bounding box for scaled decoding, 0 stands for an unbounded side.
+  fn max_size(&self) -> Option<(u32, u32)> {
+    if self.max_width.is_none() && self.max_height.is_none() {
+      return None;
+    }
+    Some((self.max_width.unwrap_or(0), self.max_height.unwrap_or(0)))
+  }
+}
+
+impl FromPyObject<'_, '_> for ImageLoadOptions {
+  type Error = PyErr;
+
+  fn extract(obj: Borrowed<'_, '_, PyAny>) -> Result<Self, Self::Error> {
+    let dict = obj.cast::<pyo3::types::PyMapping>()?;
+    let mut options = Self::default();
+    let positive = |name: &str, value: Option<i64>| match value {
+      Some(v) if v <= 0 => Err(PyValueError::new_err(format!("{name} must be positive"))),
+      _ => Ok(value.map(|v| v.min(u32::MAX as i64) as u32)),
+    };
+    if let Ok(value) = dict.get_item("maxWidth") {
+      options.max_width = positive("maxWidth", value.extract()?)?;
+    }
+    if let Ok(value) = dict.get_item("maxHeight") {
+      options.max_height = positive("maxHeight", value.extract()?)?;
+    }
+    if let Ok(value) = dict.get_item("cache") {
+      options.cache = value.extract()?;
+    }
+    Ok(options)
+  }
+}
+
 #[pyclass(rename_all = "camelCase", unsendable, module = "canvas_pyr")]
 pub struct Image {
   pub(crate) bitmap: Option<Bitmap>,
@@ -261,9 +383,9 @@ pub struct Image {
   pub(crate) need_regenerate_bitmap: bool,
   pub(crate) is_svg: bool,
   pub(crate) color_space: ColorSpace,
-  pub(crate) src: Option<ImageSrcEnum>,
-  // read data from file path
-  file_content: Option<Vec<u8>>,
+  pub(crate) src: Option<ImageSrc>,
+  // parsed SVG document, drawn as vectors
+  pub(crate) svg: Option<SvgImage>,
   // take ownership of avif image, let it be dropped when image is dropped
   _avif_image_ref: Option<AvifImage>,
 }
@@ -294,7 +416,7 @@ impl Image {
       is_svg: false,
       color_space,
       src: None,
-      file_content: None,
+      svg: None,
       _avif_image_ref: None,
     })
   }
@@ -368,16 +490,18 @@ impl Image {
   }
 
   #[getter]
-  pub fn get_src(&mut self) -> Option<&str> {
-    match self.src.as_mut() {
-      Some(ImageSrcEnum::Buffer(_)) => Some(BYTES_SRC_REPR),
-      Some(ImageSrcEnum::String(s)) => Some(s.as_str()),
-      None => None,
-    }
+  pub fn get_src(&self) -> Option<&str> {
+    self.src.as_ref().map(ImageSrc::as_str)
   }
 
-  pub fn load(&mut self, data: ImageSrcEnum) -> PyResult<()> {
-    let data = self.src.insert(data);
+  #[pyo3(signature = (data, options=None))]
+  pub fn load(&mut self, data: ImageSrcEnum, options: Option<ImageLoadOptions>) -> PyResult<()> {
+    let (max_size, cache) = match options {
+      Some(options) => (options.max_size(), options.cache),
+      None => (None, None),
+    };
+    self.src = Some(ImageSrc::from(&data));
+    let data = &data;
 
     // Check if src is empty (per HTML spec)
     // Also treat very small buffers as empty to avoid invalid/ambiguous image headers.
@@ -395,7 +519,7 @@ impl Image {
       self.natural_width = 0.0;
       self.natural_height = 0.0;
       self.bitmap = None;
-      self.file_content = None;
+      self.svg = None;
       self._avif_image_ref = None;
       self.complete = true;
       self.is_svg = false;
@@ -404,7 +528,7 @@ impl Image {
     }
 
     if let ImageSrcEnum::Buffer(buffer) = &data {
-      let buffer_data = buffer.as_slice();
+      let buffer_data: &[u8] = buffer;
       let length = buffer_data.len();
 
       // Check if it's SVG (imagesize doesn't support SVG)
@@ -439,20 +563,26 @@ impl Image {
         // For SVG
         if is_svg {
           let font = get_font().map_err(SkError::from)?;
-          if (self.width - -1.0).abs() > f64::EPSILON && (self.height - -1.0).abs() > f64::EPSILON {
-            if let Some(bitmap) = Bitmap::from_svg_data_with_custom_size(
-              buffer_data.as_ptr(),
-              length,
-              self.width as f32,
-              self.height as f32,
-              self.color_space,
-              &font,
-            ) {
+          let has_custom_size =
+            (self.width - -1.0).abs() > f64::EPSILON && (self.height - -1.0).abs() > f64::EPSILON;
+          match SkPicture::from_svg_data(buffer_data.as_ptr(), length, &font) {
+            Some(Ok((picture, width, height))) => {
+              self.set_svg(
+                SvgImage {
+                  picture,
+                  width,
+                  height,
+                },
+                has_custom_size,
+              );
+            }
+            None if !has_custom_size => {
+              // SVG has no dimensions - valid but empty, still fire onload
+              self.bitmap = None;
+              self.svg = None;
               self.is_svg = true;
-              self.natural_width = bitmap.0.width as f64;
-              self.natural_height = bitmap.0.height as f64;
-              self.bitmap = Some(bitmap);
-            } else {
+            }
+            _ => {
               // Invalid SVG - fire onerror synchronously
               // Clear prior image state to prevent stale data from being drawn
               // Reset width/height to auto (-1.0) so getters return 0 for broken image
@@ -462,46 +592,13 @@ impl Image {
               self.natural_width = 0.0;
               self.natural_height = 0.0;
               self.bitmap = None;
-              self.file_content = None;
+              self.svg = None;
               self._avif_image_ref = None;
               self.is_svg = false;
               self.need_regenerate_bitmap = false;
 
               return Err(PyValueError::new_err("Invalid SVG image"));
             }
-          } else {
-            // SVG without explicit dimensions - use default decode
-            match Bitmap::from_svg_data(buffer_data.as_ptr(), length, self.color_space, &font) {
-              Some(Ok(bitmap)) => {
-                self.is_svg = true;
-                self.natural_width = bitmap.0.width as f64;
-                self.natural_height = bitmap.0.height as f64;
-                self.width = bitmap.0.width as f64;
-                self.height = bitmap.0.height as f64;
-                self.bitmap = Some(bitmap);
-              }
-              Some(Err(_)) => {
-                // Invalid SVG - fire onerror synchronously
-                // Clear prior image state to prevent stale data from being drawn
-                // Reset width/height to auto (-1.0) so getters return 0 for broken image
-                self.complete = true;
-                self.width = -1.0;
-                self.height = -1.0;
-                self.natural_width = 0.0;
-                self.natural_height = 0.0;
-                self.bitmap = None;
-                self.file_content = None;
-                self._avif_image_ref = None;
-                self.is_svg = false;
-                self.need_regenerate_bitmap = false;
-
-                return Err(PyValueError::new_err("Invalid SVG image"));
-              }
-              None => {
-                // SVG has no dimensions - valid but empty, still fire onload
-                self.is_svg = true;
-              }
-            }
           }
 
           self.complete = true;
@@ -514,16 +611,16 @@ impl Image {
         // For not-SVG
         self.bitmap = None;
         self._avif_image_ref = None;
-        self.file_content = None;
+        self.svg = None;
         self.is_svg = false;
         self.need_regenerate_bitmap = false;
 
         let mut decoder = BitmapDecoder {
           width: self.width,
           height: self.height,
-          color_space: self.color_space,
-          file_content: None,
           original_url: None,
+          max_size,
+          cache,
         };
         let decoded = decoder.compute(data)?;
         return decoder.resolve(decoded, self);
@@ -536,16 +633,16 @@ impl Image {
         self.natural_height = 0.0;
         self.bitmap = None;
         self._avif_image_ref = None;
-        self.file_content = None;
+        self.svg = None;
         self.is_svg = false;
         self.need_regenerate_bitmap = false;
 
         let mut decoder = BitmapDecoder {
           width: self.width,
           height: self.height,
-          color_space: self.color_space,
-          file_content: None,
           original_url: None,
+          max_size,
+          cache,
         };
         let decoded = decoder.compute(data)?;
         return decoder.resolve(decoded, self);
@@ -562,7 +659,7 @@ impl Image {
       self.natural_width = 0.0;
       self.natural_height = 0.0;
       self.bitmap = None;
-      self.file_content = None;
+      self.svg = None;
       self._avif_image_ref = None;
       self.is_svg = false;
       self.need_regenerate_bitmap = false;
@@ -576,48 +673,126 @@ impl Image {
     let mut decoder = BitmapDecoder {
       width: self.width,
       height: self.height,
-      color_space: self.color_space,
-      file_content: None,
       original_url: None,
+      max_size,
+      cache,
     };
     let decoded = decoder.compute(data)?;
     decoder.resolve(decoded, self)
   }
+
+  /// Decode only a rectangle of a raster image (bytes or file path), so very large
+  /// sources can be read with memory proportional to the region.
+  #[pyo3(name = "loadRegion", signature = (source, x, y, width, height, scale=1.0))]
+  pub fn load_region(
+    &mut self,
+    source: ImageSrcEnum,
+    x: i32,
+    y: i32,
+    width: i32,
+    height: i32,
+    scale: f64,
+  ) -> PyResult<()> {
+    if width <= 0 || height <= 0 {
+      return Err(PyValueError::new_err(
+        "Region width and height must be positive",
+      ));
+    }
+    if !(scale > 0.0 && scale <= 1.0) {
+      return Err(PyValueError::new_err("Region scale must be in (0, 1]"));
+    }
+    let file_content;
+    let data: &[u8] = match &source {
+      ImageSrcEnum::Buffer(buffer) => buffer,
+      ImageSrcEnum::String(path) => {
+        file_content = SkiaDataRef::from_file(path)
+          .ok_or_else(|| PyRuntimeError::new_err(format!("Failed to read {path}")))?;
+        file_content.slice()
+      }
+    };
+    let bitmap = Bitmap::from_buffer_region(
+      data.as_ptr().cast_mut(),
+      data.len(),
+      x,
+      y,
+      width,
+      height,
+      scale as f32,
+    );
+
+    self.complete = true;
+    self.svg = None;
+    self._avif_image_ref = None;
+    self.is_svg = false;
+    self.need_regenerate_bitmap = false;
+    let Some(bitmap) = bitmap else {
+      self.width = -1.0;
+      self.height = -1.0;
+      self.natural_width = 0.0;
+      self.natural_height = 0.0;
+      self.bitmap = None;
+      self.src = None;
+      self.current_src = None;
+      return Err(PyValueError::new_err(
+        "Unsupported image type or region outside of the image",
+      ));
+    };
+    self.width = bitmap.0.width as f64;
+    self.height = bitmap.0.height as f64;
+    self.natural_width = self.width;
+    self.natural_height = self.height;
+    let src = ImageSrc::from(&source);
+    self.current_src = Some(src.as_str().to_owned());
+    self.src = Some(src);
+    self.bitmap = Some(bitmap);
+    Ok(())
+  }
 }
 
 impl Image {
+  /// Rasterize the SVG picture at the current size, for consumers that need
+  /// pixels (patterns). `drawImage` replays the picture itself.
   pub(crate) fn regenerate_bitmap_if_need(&mut self) -> PyResult<()> {
-    if !self.need_regenerate_bitmap || !self.is_svg || self.src.is_none() {
-      return Ok(());
-    }
-
-    if let Some(data) = self.file_content.as_deref() {
-      let font = get_font().map_err(SkError::from)?;
-      self.bitmap = Bitmap::from_svg_data_with_custom_size(
-        data.as_ptr(),
-        data.len(),
-        self.width as f32,
-        self.height as f32,
-        self.color_space,
-        &font,
-      );
-      self.need_regenerate_bitmap = false;
+    if !self.need_regenerate_bitmap || !self.is_svg {
       return Ok(());
     }
-    if let Some(data) = self.src.as_ref() {
-      let font = get_font().map_err(SkError::from)?;
-      self.bitmap = Bitmap::from_svg_data_with_custom_size(
-        data.as_ref().as_ptr(),
-        data.as_ref().len(),
-        self.width as f32,
-        self.height as f32,
+    if let Some(svg) = &self.svg {
+      self.bitmap = Bitmap::from_picture(
+        &svg.picture,
+        svg.width,
+        svg.height,
+        self.width as i32,
+        self.height as i32,
         self.color_space,
-        &font,
       );
-      self.need_regenerate_bitmap = false;
     }
+    self.need_regenerate_bitmap = false;
     Ok(())
   }
+
+  fn set_svg(&mut self, svg: SvgImage, has_custom_size: bool) {
+    if !has_custom_size {
+      self.width = svg.width as f64;
+      self.height = svg.height as f64;
+    }
+    self.width = self.width.trunc();
+    self.height = self.height.trunc();
+    self.natural_width = self.width;
+    self.natural_height = self.height;
+    self.is_svg = true;
+    self.bitmap = None;
+    self._avif_image_ref = None;
+    // The raster copy is only produced on demand
+    self.need_regenerate_bitmap = true;
+    self.svg = Some(svg);
+  }
+}
+
+/// SVG document recorded once as a picture at its intrinsic size.
+pub(crate) struct SvgImage {
+  pub(crate) picture: SkPicture,
+  pub(crate) width: f32,
+  pub(crate) height: f32,
 }
 
 fn is_svg_image(data: &[u8], length: usize) -> bool {
@@ -655,13 +830,12 @@ unsafe impl Send for DecodedBitmap {}
 
 struct BitmapInfo {
   data: Bitmap,
-  is_svg: bool,
-  #[allow(dead_code)]
   decoded_image: Option<AvifImage>,
 }
 
 enum DecodeStatus {
   Ok(BitmapInfo),
+  Svg(SvgImage),
   Empty,
   InvalidSvg,
   InvalidImage,
@@ -670,39 +844,121 @@ enum DecodeStatus {
 struct BitmapDecoder {
   width: f64,
   height: f64,
-  color_space: ColorSpace,
-  // data from file path
-  file_content: Option<Vec<u8>>,
   #[allow(dead_code)]
   // Preserve original HTTP URL for currentSrc when data is downloaded bytes
   original_url: Option<String>,
+  // (max_width, max_height) for scaled decoding of raster images, 0 = unbounded
+  max_size: Option<(u32, u32)>,
+  cache: Option<Py<ImageCache>>,
 }
 
 impl BitmapDecoder {
+  fn has_custom_size(&self) -> bool {
+    (self.width - -1.0).abs() > f64::EPSILON && (self.height - -1.0).abs() > f64::EPSILON
+  }
+
+  fn decode_raster(&self, data: &[u8]) -> DecodeStatus {
+    let bitmap = match self.max_size {
+      Some((max_width, max_height)) => Bitmap::from_buffer_with_max_size(
+        data.as_ptr().cast_mut(),
+        data.len(),
+        max_width,
+        max_height,
+      ),
+      None => Some(Bitmap::from_buffer(data.as_ptr().cast_mut(), data.len())),
+    };
+    match bitmap {
+      Some(bitmap) => DecodeStatus::Ok(BitmapInfo {
+        data: bitmap,
+        decoded_image: None,
+      }),
+      None => DecodeStatus::InvalidImage,
+    }
+  }
+
   fn compute(&mut self, image_src: &ImageSrcEnum) -> PyResult<DecodedBitmap> {
+    let cache_key = self
+      .cache
+      .as_ref()
+      .and_then(|_| ImageCacheKey::new(image_src, self.max_size));
+    let cached = match (&self.cache, &cache_key) {
+      (Some(cache), Some(key)) => cache.get().get(key, key.content(image_src)),
+      _ => None,
+    };
+    let bitmap = match cached {
+      Some(bitmap) => DecodeStatus::Ok(BitmapInfo {
+        data: bitmap,
+        decoded_image: None,
+      }),
+      None => {
+        let bitmap = self.decode(image_src)?;
+        // Only bitmaps decoded by Skia own their pixels and can be shared
+        if let (Some(cache), Some(key), DecodeStatus::Ok(b)) = (&self.cache, cache_key, &bitmap)
+          && b.decoded_image.is_none()
+        {
+          let content = key.content(image_src);
+          cache.get().insert(key, content, &b.data);
+        }
+        bitmap
+      }
+    };
+
+    let mut width = self.width;
+    let mut height = self.height;
+    match &bitmap {
+      DecodeStatus::Ok(b) => {
+        if (self.width - -1.0).abs() < f64::EPSILON
+          || (self.width - b.data.0.width as f64).abs() > f64::EPSILON
+        {
+          width = b.data.0.width as f64;
+        }
+        if (self.height - -1.0).abs() < f64::EPSILON
+          || (self.height - b.data.0.height as f64).abs() > f64::EPSILON
+        {
+          height = b.data.0.height as f64;
+        }
+      }
+      DecodeStatus::Svg(svg) => {
+        if !self.has_custom_size() {
+          width = svg.width as f64;
+          height = svg.height as f64;
+        }
+        width = width.trunc();
+        height = height.trunc();
+      }
+      _ => {}
+    }
+    Ok(DecodedBitmap {
+      bitmap,
+      width,
+      height,
+    })
+  }
+
+  fn decode(&mut self, image_src: &ImageSrcEnum) -> PyResult<DecodeStatus> {
+    let mut file_content: Option<SkiaDataRef> = None;
     let data_ref = match image_src {
-      ImageSrcEnum::Buffer(data) => Cow::Borrowed(data.as_ref()),
+      ImageSrcEnum::Buffer(data) => Cow::Borrowed(&data[..]),
       ImageSrcEnum::String(path_or_svg) => {
         if path_or_svg.starts_with("data:") {
           Cow::Borrowed(path_or_svg.as_bytes())
         } else {
-          match std::fs::read(path_or_svg) {
-            Ok(file_content) => {
-              self.file_content = Some(file_content);
-              Cow::Borrowed(self.file_content.as_ref().unwrap().as_ref())
-            }
-            Err(io_err) => {
-              return Err(PyRuntimeError::new_err(format!(
-                "Failed to read {path_or_svg}: {io_err}"
-              )));
-            }
+          match SkiaDataRef::from_file(path_or_svg) {
+            Some(mapped) => Cow::Borrowed(file_content.insert(mapped).slice()),
+            // Mapping fails for empty and unreadable files, read them to report the io error
+            None => match std::fs::read(path_or_svg) {
+              Ok(file_content) => Cow::Owned(file_content),
+              Err(io_err) => {
+                return Err(PyRuntimeError::new_err(format!(
+                  "Failed to read {path_or_svg}: {io_err}"
+                )));
+              }
+            },
           }
         }
       }
     };
     let length = data_ref.len();
-    let mut width = self.width;
-    let mut height = self.height;
     let bitmap = if data_ref.as_ref().starts_with(b"data:") {
       let data_str = str::from_utf8(&data_ref)
         .map_err(|e| PyValueError::new_err(format!("Decode data url failed {e}")))?;
@@ -712,11 +968,7 @@ impl BitmapDecoder {
           .map_err(|e| PyValueError::new_err(format!("Decode data url failed {e}")))?;
         if let Some(kind) = infer::get(&image_binary) {
           if kind.matcher_type() == infer::MatcherType::Image {
-            DecodeStatus::Ok(BitmapInfo {
-              data: Bitmap::from_buffer(image_binary.as_ptr().cast_mut(), image_binary.len()),
-              is_svg: false,
-              decoded_image: None,
-            })
+            self.decode_raster(&image_binary)
           } else {
             DecodeStatus::InvalidImage
           }
@@ -742,7 +994,6 @@ impl BitmapDecoder {
       );
       DecodeStatus::Ok(BitmapInfo {
         data: bitmap,
-        is_svg: false,
         decoded_image: Some(avif_image),
       })
     } else if if let Some(kind) = infer::get(&data_ref) {
@@ -751,66 +1002,23 @@ impl BitmapDecoder {
       false
     } {
       // Other image formats detected by infer (PNG, JPEG, GIF, WebP, etc.)
-      DecodeStatus::Ok(BitmapInfo {
-        data: Bitmap::from_buffer(data_ref.as_ptr().cast_mut(), length),
-        is_svg: false,
-        decoded_image: None,
-      })
+      self.decode_raster(&data_ref)
     } else if is_svg_image(&data_ref, length) {
       let font = get_font().map_err(SkError::from)?;
-      if (self.width - -1.0).abs() > f64::EPSILON && (self.height - -1.0).abs() > f64::EPSILON {
-        if let Some(bitmap) = Bitmap::from_svg_data_with_custom_size(
-          data_ref.as_ptr(),
-          length,
-          self.width as f32,
-          self.height as f32,
-          self.color_space,
-          &font,
-        ) {
-          DecodeStatus::Ok(BitmapInfo {
-            data: bitmap,
-            is_svg: true,
-            decoded_image: None,
-          })
-        } else {
-          DecodeStatus::InvalidSvg
-        }
-      } else if let Some(bitmap) =
-        Bitmap::from_svg_data(data_ref.as_ptr(), length, self.color_space, &font)
-      {
-        if let Ok(bitmap) = bitmap {
-          DecodeStatus::Ok(BitmapInfo {
-            data: bitmap,
-            is_svg: true,
-            decoded_image: None,
-          })
-        } else {
-          DecodeStatus::InvalidSvg
-        }
-      } else {
-        DecodeStatus::Empty
+      match SkPicture::from_svg_data(data_ref.as_ptr(), length, &font) {
+        Some(Ok((picture, width, height))) => DecodeStatus::Svg(SvgImage {
+          picture,
+          width,
+          height,
+        }),
+        // Without an intrinsic size there is nothing to scale to the requested one
+        None if !self.has_custom_size() => DecodeStatus::Empty,
+        _ => DecodeStatus::InvalidSvg,
       }
     } else {
       DecodeStatus::InvalidImage
     };
-
-    if let DecodeStatus::Ok(ref b) = bitmap {
-      if (self.width - -1.0).abs() < f64::EPSILON
-        || (self.width - b.data.0.width as f64).abs() > f64::EPSILON
-      {
-        width = b.data.0.width as f64;
-      }
-      if (self.height - -1.0).abs() < f64::EPSILON
-        || (self.height - b.data.0.height as f64).abs() > f64::EPSILON
-      {
-        height = b.data.0.height as f64;
-      }
-    }
-    Ok(DecodedBitmap {
-      bitmap,
-      width,
-      height,
-    })
+    Ok(bitmap)
   }
 
   fn resolve(&mut self, output: DecodedBitmap, self_mut: &mut Image) -> PyResult<()> {
@@ -821,26 +1029,31 @@ impl BitmapDecoder {
 
     match output.bitmap {
       DecodeStatus::Ok(bitmap) => {
-        // SUCCESS PATH: set dimensions, bitmap, currentSrc, file_content
+        // SUCCESS PATH: set dimensions, bitmap, currentSrc
         self_mut.width = output.width;
         self_mut.height = output.height;
         self_mut.natural_width = output.width;
         self_mut.natural_height = output.height;
 
-        if let Some(data) = self.file_content.take() {
-          self_mut.file_content = Some(data);
-        }
-
         // Update current_src based on what was actually loaded
-        self_mut.current_src = match &self_mut.src {
-          Some(ImageSrcEnum::Buffer(_)) => Some(BYTES_SRC_REPR.to_string()),
-          Some(ImageSrcEnum::String(s)) => Some(s.clone()),
-          None => None,
-        };
-        self_mut.is_svg = bitmap.is_svg;
+        self_mut.current_src = self_mut.src.as_ref().map(|src| src.as_str().to_owned());
+        self_mut.is_svg = false;
+        self_mut.svg = None;
         self_mut.bitmap = Some(bitmap.data);
         self_mut._avif_image_ref = bitmap.decoded_image;
       }
+      DecodeStatus::Svg(svg) => {
+        self_mut.width = output.width;
+        self_mut.height = output.height;
+        self_mut.natural_width = output.width;
+        self_mut.natural_height = output.height;
+        self_mut.current_src = self_mut.src.as_ref().map(|src| src.as_str().to_owned());
+        self_mut.is_svg = true;
+        self_mut._avif_image_ref = None;
+        // The raster copy is only produced on demand
+        self_mut.need_regenerate_bitmap = true;
+        self_mut.svg = Some(svg);
+      }
       DecodeStatus::Empty => {}
       DecodeStatus::InvalidSvg => {
         // ERROR PATH: clear state like reject() does
@@ -849,7 +1062,7 @@ impl BitmapDecoder {
         self_mut.height = -1.0;
         self_mut.natural_width = 0.0;
         self_mut.natural_height = 0.0;
-        self_mut.file_content = None;
+        self_mut.svg = None;
         self_mut._avif_image_ref = None;
         self_mut.is_svg = false;
         self_mut.need_regenerate_bitmap = false;
@@ -862,7 +1075,7 @@ impl BitmapDecoder {
         self_mut.height = -1.0;
         self_mut.natural_width = 0.0;
         self_mut.natural_height = 0.0;
-        self_mut.file_content = None;
+        self_mut.svg = None;
         self_mut._avif_image_ref = None;
         self_mut.is_svg = false;
         self_mut.need_regenerate_bitmap = false;
@@ -0,0 +1,253 @@
+use std::collections::{BTreeMap, HashMap};
+use std::hash::{DefaultHasher, Hash, Hasher};
+use std::path::PathBuf;
+use std::sync::{Mutex, MutexGuard, PoisonError};
+use std::time::SystemTime;
+
+use pyo3::exceptions::PyRuntimeError;
+use pyo3::prelude::*;
+
+use crate::image::ImageSrcEnum;
+use crate::sk::Bitmap;
+
+const DEFAULT_MAX_BYTES: usize = 128 * 1024 * 1024;
+
+fn into_pyo3_error<E>(err: PoisonError<MutexGuard<'_, E>>) -> PyErr {
+  PyRuntimeError::new_err(format!("{err}"))
+}
+
+#[derive(Clone, Debug, PartialEq, Eq, Hash)]
+enum Source {
+  // file path, invalidated when the file changes on disk
+  File {
+    path: PathBuf,
+    len: u64,
+    modified: Option<SystemTime>,
+  },
+  // in-memory bytes and data URLs, compared in full on lookup (see `Entry::content`)
+  Content {
+    len: usize,
+    hash: u64,
+  },
+}
+
+#[derive(Clone, Debug, PartialEq, Eq, Hash)]
+pub(crate) struct ImageCacheKey {
+  source: Source,
+  // decode-at-size box, the same source decoded at another size is another entry
+  max_size: Option<(u32, u32)>,
+}
+
+impl ImageCacheKey {
+  pub(crate) fn new(src: &ImageSrcEnum, max_size: Option<(u32, u32)>) -> Option<Self> {
+    let source = match src {
+      ImageSrcEnum::String(path) if !path.starts_with("data:") => {
+        let metadata = std::fs::metadata(path).ok()?;
+        Source::File {
+          path: PathBuf::from(path),
+          len: metadata.len(),
+          modified: metadata.modified().ok(),
+        }
+      }
+      _ => {
+        let content = src.as_ref();
+        let mut hasher = DefaultHasher::new();
+        content.hash(&mut hasher);
+        Source::Content {
+          len: content.len(),
+          hash: hasher.finish(),
+        }
+      }
+    };
+    Some(Self { source, max_size })
+  }
+
+  /// The bytes an entry for this key must hold, `None` for files.
+  pub(crate) fn content<'a>(&self, src: &'a ImageSrcEnum) -> Option<&'a [u8]> {
+    match self.source {
+      Source::File { .. } => None,
+      Source::Content { .. } => Some(src.as_ref()),
+    }
+  }
+}
+
+struct Entry {
+  bitmap: Bitmap,
+  // Source bytes of a `Source::Content` key, a hit requires them to be equal so
+  // sources colliding on the hash never share a bitmap
+  content: Option<Box<[u8]>>,
+  // decoded pixels plus the `content` copy, what `max_bytes` bounds
+  bytes: usize,
+  tick: u64,
+}
+
+#[derive(Default)]
+struct ImageCacheInner {
+  max_bytes: usize,
+  total_bytes: usize,
+  entries: HashMap<ImageCacheKey, Entry>,
+  // last use tick -> key, the first item is the least recently used one
+  lru: BTreeMap<u64, ImageCacheKey>,
+  tick: u64,
+  hits: u64,
+  misses: u64,
+  evictions: u64,
+}
+
+impl ImageCacheInner {
+  fn get(&mut self, key: &ImageCacheKey, content: Option<&[u8]>) -> Option<Bitmap> {
+    self.tick += 1;
+    let Some(entry) = self
+      .entries
+      .get_mut(key)
+      .filter(|entry| entry.content.as_deref() == content)
+    else {
+      self.misses += 1;
+      return None;
+    };
+    self.lru.remove(&entry.tick);
+    entry.tick = self.tick;
+    self.lru.insert(self.tick, key.clone());
+    self.hits += 1;
+    Some(entry.bitmap.share())
+  }
+
+  fn insert(&mut self, key: ImageCacheKey, content: Option<&[u8]>, bitmap: &Bitmap) {
+    let bytes = bitmap.byte_size() + content.map_or(0, <[u8]>::len);
+    if bytes > self.max_bytes {
+      return;
+    }
+    self.remove(&key);
+    self.tick += 1;
+    self.total_bytes += bytes;
+    self.lru.insert(self.tick, key.clone());
+    self.entries.insert(
+      key,
+      Entry {
+        bitmap: bitmap.share(),
+        content: content.map(Box::from),
+        bytes,
+        tick: self.tick,
+      },
+    );
+    self.evict_to(self.max_bytes);
+  }
+
+  fn remove(&mut self, key: &ImageCacheKey) -> bool {
+    if let Some(entry) = self.entries.remove(key) {
+      self.lru.remove(&entry.tick);
+      self.total_bytes -= entry.bytes;
+      return true;
+    }
+    false
+  }
+
+  fn evict_to(&mut self, max_bytes: usize) {
+    while self.total_bytes > max_bytes {
+      let Some((_, key)) = self.lru.pop_first() else {
+        break;
+      };
+      if let Some(entry) = self.entries.remove(&key) {
+        self.total_bytes -= entry.bytes;
+        self.evictions += 1;
+      }
+    }
+  }
+}
+
+/// Process-wide cache of decoded raster images.
+///
+/// Pass it to `Image.load(src, {"cache": cache})`; images loaded from the same
+/// file (path + size + mtime) or equal bytes share one decoded bitmap.
+/// Entries are evicted least-recently-used first once `maxBytes` is exceeded,
+/// counting the decoded pixels and the copy of the encoded bytes kept for
+/// in-memory sources.
+#[pyclass(module = "canvas_pyr", frozen)]
+pub struct ImageCache {
+  inner: Mutex<ImageCacheInner>,
+}
+
+impl ImageCache {
+  pub(crate) fn get(&self, key: &ImageCacheKey, content: Option<&[u8]>) -> Option<Bitmap> {
+    self.inner.lock().ok()?.get(key, content)
+  }
+
+  pub(crate) fn insert(&self, key: ImageCacheKey, content: Option<&[u8]>, bitmap: &Bitmap) {
+    if let Ok(mut inner) = self.inner.lock() {
+      inner.insert(key, content, bitmap);
+    }
+  }
+}
+
+#[pymethods]
+#[allow(non_snake_case)]
+impl ImageCache {
+  #[new]
+  #[pyo3(signature = (maxBytes=DEFAULT_MAX_BYTES))]
+  pub fn new(maxBytes: usize) -> Self {
+    Self {
+      inner: Mutex::new(ImageCacheInner {
+        max_bytes: maxBytes,
+        ..Default::default()
+      }),
+    }
+  }
+
+  #[getter(maxBytes)]
+  pub fn get_max_bytes(&self) -> PyResult<usize> {
+    Ok(self.inner.lock().map_err(into_pyo3_error)?.max_bytes)
+  }
+
+  #[setter(maxBytes)]
+  pub fn set_max_bytes(&self, max_bytes: usize) -> PyResult<()> {
+    let mut inner = self.inner.lock().map_err(into_pyo3_error)?;
+    inner.max_bytes = max_bytes;
+    inner.evict_to(max_bytes);
+    Ok(())
+  }
+
+  /// Bytes currently held by the cache, decoded pixels and encoded copies.
+  #[getter(totalBytes)]
+  pub fn get_total_bytes(&self) -> PyResult<usize> {
+    Ok(self.inner.lock().map_err(into_pyo3_error)?.total_bytes)
+  }
+
+  #[getter]
+  pub fn get_count(&self) -> PyResult<usize> {
+    Ok(self.inner.lock().map_err(into_pyo3_error)?.entries.len())
+  }
+
+  #[getter]
+  pub fn get_hits(&self) -> PyResult<u64> {
+    Ok(self.inner.lock().map_err(into_pyo3_error)?.hits)
+  }
+
+  #[getter]
+  pub fn get_misses(&self) -> PyResult<u64> {
+    Ok(self.inner.lock().map_err(into_pyo3_error)?.misses)
+  }
+
+  #[getter]
+  pub fn get_evictions(&self) -> PyResult<u64> {
+    Ok(self.inner.lock().map_err(into_pyo3_error)?.evictions)
+  }
+
+  /// Drop every entry. Images already loaded keep their pixels.
+  pub fn clear(&self) -> PyResult<()> {
+    let mut inner = self.inner.lock().map_err(into_pyo3_error)?;
+    inner.entries.clear();
+    inner.lru.clear();
+    inner.total_bytes = 0;
+    Ok(())
+  }
+
+  /// Reset the hit / miss / eviction counters.
+  #[pyo3(name = "resetStats")]
+  pub fn reset_stats(&self) -> PyResult<()> {
+    let mut inner = self.inner.lock().map_err(into_pyo3_error)?;
+    inner.hits = 0;
+    inner.misses = 0;
+    inner.evictions = 0;
+    Ok(())
+  }
+}
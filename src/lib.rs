@@ -6,7 +6,12 @@
 #[macro_use]
 extern crate serde_derive;
 
-use std::{ffi::CString, mem, slice, str::FromStr};
+use std::{
+  ffi::CString,
+  mem, slice,
+  str::FromStr,
+  sync::atomic::{AtomicU64, Ordering},
+};
 
 use pyo3::{
   exceptions::{PyRuntimeError, PyValueError},
@@ -18,6 +23,7 @@ use ctx::{
   CanvasRenderingContext2D, Context, ContextData, ContextOutputData, SvgExportFlag, encode_surface,
 };
 use font::{FONT_REGEXP, init_font_regexp};
+use picture::Picture;
 use sk::{ColorSpace, SkiaDataRef, SurfaceRef};
 
 use avif::AvifConfig;
@@ -34,14 +40,18 @@ mod ctx;
 mod error;
 mod filter;
 mod font;
+mod font_collection;
+mod font_index;
 mod gif;
 pub mod global_fonts;
 mod gradient;
 mod image;
+mod image_cache;
 pub mod lottie;
 mod page_recorder;
 pub mod path;
 mod pattern;
+mod picture;
 pub mod picture_recorder;
 #[allow(dead_code)]
 mod sk;
@@ -120,6 +130,24 @@ impl FromPyObject<'_, '_> for CanvasRenderingContext2DAttributes {
   }
 }
 
+#[derive(Clone, Debug, Default)]
+pub struct CanvasOptions {
+  pub deferred: Option<bool>,
+}
+
+impl FromPyObject<'_, '_> for CanvasOptions {
+  type Error = PyErr;
+
+  fn extract(obj: Borrowed<'_, '_, PyAny>) -> Result<Self, Self::Error> {
+    let dict = obj.cast::<pyo3::types::PyMapping>()?;
+    let mut options = Self::default();
+    if let Ok(value) = dict.get_item("deferred") {
+      options.deferred = value.extract()?;
+    }
+    Ok(options)
+  }
+}
+
 #[pyclass(module = "canvas_pyr", name = "Canvas", weakref)]
 pub struct CanvasElement {
   pub(crate) width: u32,
@@ -129,21 +157,36 @@ pub struct CanvasElement {
 }
 
 impl CanvasElement {
-  fn create_context(py: Python, width: u32, height: u32) -> PyResult<CanvasRenderingContext2D> {
+  fn create_context(
+    py: Python,
+    width: u32,
+    height: u32,
+    deferred: bool,
+  ) -> PyResult<CanvasRenderingContext2D> {
     let default_style = PyString::intern(py, "#000000").into_any().unbind();
+    let context = Context::new(width, height, ColorSpace::default())?;
     let ctx = CanvasRenderingContext2D {
-      context: Context::new(width, height, ColorSpace::default())?,
+      context: if deferred {
+        context
+      } else {
+        context.into_immediate()
+      },
       fill_style_hidden: default_style.clone_ref(py),
       stroke_style_hidden: default_style.clone_ref(py),
       canvas: None,
     };
     Ok(ctx)
   }
-  fn new_inner<'py>(py: Python<'py>, width: i32, height: i32) -> PyResult<Bound<'py, PyAny>> {
+  fn new_inner<'py>(
+    py: Python<'py>,
+    width: i32,
+    height: i32,
+    deferred: bool,
+  ) -> PyResult<Bound<'py, PyAny>> {
     // Default fallback of canvas on browser and skia-canvas is 350x150
     let width = (if width <= 0 { DEFAULT_WIDTH } else { width }) as u32;
     let height = (if height <= 0 { DEFAULT_HEIGHT } else { height }) as u32;
-    let ctx = Self::create_context(py, width, height)?;
+    let ctx = Self::create_context(py, width, height, deferred)?;
     // CanvasRenderingContext2D need share between Rust and Python,
     // so we need to create it in Python and get the handle here
     let py_ctx = Py::new(py, ctx)?;
@@ -241,10 +284,14 @@ impl CanvasElement {
     let width = (if width <= 0 { DEFAULT_WIDTH } else { width }) as u32;
     self.width = width;
     let height = self.height;
-    let _ = mem::replace(
-      &mut self.ctx.borrow_mut(py).context,
-      Context::new(width, height, ColorSpace::default())?,
-    );
+    let mut ctx = self.ctx.borrow_mut(py);
+    let mut context = Context::new(width, height, ColorSpace::default())?;
+    if !ctx.context.is_deferred() {
+      context = context.into_immediate();
+    }
+    let old = mem::replace(&mut ctx.context, context);
+    // Resizing resets the drawing state, not the fonts attached to the context
+    ctx.context.font_collection = old.font_collection;
     Ok(())
   }
 
@@ -258,10 +305,13 @@ impl CanvasElement {
     let height = (if height <= 0 { DEFAULT_HEIGHT } else { height }) as u32;
     self.height = height;
     let width = self.width;
-    let _ = mem::replace(
-      &mut self.ctx.borrow_mut(py).context,
-      Context::new(width, height, ColorSpace::default())?,
-    );
+    let mut ctx = self.ctx.borrow_mut(py);
+    let mut context = Context::new(width, height, ColorSpace::default())?;
+    if !ctx.context.is_deferred() {
+      context = context.into_immediate();
+    }
+    let old = mem::replace(&mut ctx.context, context);
+    ctx.context.font_collection = old.font_collection;
     Ok(())
   }
 
@@ -270,6 +320,17 @@ impl CanvasElement {
     self.height
   }
 
+  /// Pictures kept by the deferred recorder, for tests
+  #[getter(_layerCount)]
+  pub fn get_layer_count(&self, py: Python) -> usize {
+    let ctx = self.ctx.borrow(py);
+    ctx
+      .context
+      .page_recorder
+      .as_ref()
+      .map_or(0, |recorder| recorder.borrow().layer_count())
+  }
+
   #[pyo3(name = "getContext")]
   #[pyo3(signature = (context_type, attrs=None))]
   pub fn get_context(
@@ -351,6 +412,30 @@ impl CanvasElement {
     let ctx2d = &self.ctx.borrow(py).context;
     ctx2d.surface.save_png(&path);
   }
+
+  /// Everything drawn on the canvas so far as a `Picture`, kept as drawing commands.
+  /// A canvas created with `{"deferred": False}` has no commands, its pixels are used.
+  /// With `embedFonts` the picture serializes the fonts it uses with their data.
+  #[pyo3(name = "toPicture", signature = (embedFonts=false))]
+  #[allow(non_snake_case)]
+  pub fn to_picture(&mut self, py: Python, embedFonts: bool) -> PyResult<Picture> {
+    let mut ctx = self.ctx.borrow_mut(py);
+    let (width, height) = (self.width as f32, self.height as f32);
+    let mut picture = if !ctx.context.is_deferred() {
+      Picture::from_surface(&ctx.context.surface, width, height)?
+    } else {
+      match ctx.context.get_picture() {
+        Some(inner) => Picture {
+          inner,
+          bounds: (0.0, 0.0, width, height),
+          embed_fonts: false,
+        },
+        None => Picture::empty(width, height)?,
+      }
+    };
+    picture.embed_fonts = embedFonts;
+    Ok(picture)
+  }
 }
 
 fn get_data_ref(
@@ -810,10 +895,81 @@ impl Drop for PDFDocument {
   }
 }
 
+// Skia keeps no purge counter of its own, count the purges requested from Python.
+static FONT_CACHE_PURGE_COUNT: AtomicU64 = AtomicU64::new(0);
+
 #[pyfunction]
 #[pyo3(name = "clearAllCache")]
 pub fn clear_all_cache() {
   unsafe { sk::ffi::skiac_clear_all_cache() };
+  FONT_CACHE_PURGE_COUNT.fetch_add(1, Ordering::Relaxed);
+}
+
+/// Usage of Skia's process-wide glyph cache.
+///
+/// `count` is the number of cached strikes (a typeface at a given size and
+/// transform), each holding the glyphs rendered with it. `purgeCount` counts
+/// the explicit purges, `clearAllCache()` and `purgeFontCache()` calls, not
+/// the strikes Skia evicts on its own to stay within the limits.
+#[pyclass(
+  rename_all = "camelCase",
+  get_all,
+  skip_from_py_object,
+  module = "canvas_pyr"
+)]
+#[derive(Debug, Clone)]
+pub struct FontCacheStats {
+  pub used_bytes: usize,
+  pub limit_bytes: usize,
+  pub count: i32,
+  pub count_limit: i32,
+  pub purge_count: u64,
+}
+
+/// Set the byte budget of the glyph cache and return the previous one.
+#[pyfunction]
+#[pyo3(name = "setFontCacheLimit")]
+pub fn set_font_cache_limit(bytes: usize) -> usize {
+  unsafe { sk::ffi::skiac_set_font_cache_limit(bytes) }
+}
+
+/// Set the maximum number of strikes in the glyph cache and return the previous one.
+#[pyfunction]
+#[pyo3(name = "setFontCacheCountLimit")]
+pub fn set_font_cache_count_limit(count: i32) -> PyResult<i32> {
+  if count < 0 {
+    return Err(PyValueError::new_err("count must not be negative"));
+  }
+  Ok(unsafe { sk::ffi::skiac_set_font_cache_count_limit(count) })
+}
+
+#[pyfunction]
+#[pyo3(name = "getFontCacheStats")]
+pub fn get_font_cache_stats() -> FontCacheStats {
+  let mut stats = sk::ffi::skiac_font_cache_stats::default();
+  unsafe { sk::ffi::skiac_get_font_cache_stats(&mut stats) };
+  FontCacheStats {
+    used_bytes: stats.used_bytes,
+    limit_bytes: stats.limit_bytes,
+    count: stats.count,
+    count_limit: stats.count_limit,
+    purge_count: FONT_CACHE_PURGE_COUNT.load(Ordering::Relaxed),
+  }
+}
+
+/// Drop the cached glyphs only, decoded images and other resources are kept.
+#[pyfunction]
+#[pyo3(name = "purgeFontCache")]
+pub fn purge_font_cache() {
+  unsafe { sk::ffi::skiac_purge_font_cache() };
+  FONT_CACHE_PURGE_COUNT.fetch_add(1, Ordering::Relaxed);
+}
+
+/// Drop Skia's resource cache (decoded images, cached paths), the glyph cache is kept.
+#[pyfunction]
+#[pyo3(name = "purgeResourceCache")]
+pub fn purge_resource_cache() {
+  unsafe { sk::ffi::skiac_purge_resource_cache() };
 }
 
 /// A Python canvas library powered by Skia, with bindings implemented in Rust.
@@ -825,17 +981,26 @@ mod canvas_pyr {
   #[pymodule_export]
   use super::{CanvasElement, PDFDocument, SVGCanvas};
 
+  #[pymodule_export]
+  use super::{
+    FontCacheStats, clear_all_cache, get_font_cache_stats, purge_font_cache, purge_resource_cache,
+    set_font_cache_count_limit, set_font_cache_limit,
+  };
+
   use super::{FONT_REGEXP, init_font_regexp};
 
   #[pymodule_export]
   use super::{
     a_geometry::{DOMMatrix, DOMPoint, DOMRect},
     avif::ChromaSubsampling,
-    ctx::{CanvasRenderingContext2D, SvgExportFlag},
+    ctx::{CanvasRenderingContext2D, PyTextBlob, SvgExportFlag},
+    font_collection::PyFontCollection,
     gif::{GifDisposal, GifEncoder},
     global_fonts::global_fonts,
     image::{Image, ImageData},
+    image_cache::ImageCache,
     path::{FillType, Path, PathOp, StrokeCap, StrokeJoin},
+    picture::Picture,
     svg::convert_svg_text_to_path,
   };
 
@@ -844,21 +1009,26 @@ mod canvas_pyr {
     // Arbitrary code to run at the module initialization
     // pre init font regexp
     FONT_REGEXP.get_or_init(init_font_regexp);
-    crate::global_fonts::init_fonts();
+    crate::global_fonts::init_fonts(_m)?;
     Ok(())
   }
 
+  /// The third argument is either an `SvgExportFlag`, for an SVG canvas, or options for a
+  /// raster canvas: `{"deferred": False}` draws straight to the pixels instead of recording.
   #[pyfunction]
   #[pyo3(name = "createCanvas", signature = (width, height, svgExportFlag=None))]
   fn create_canvas(
     py: Python<'_>,
     width: i32,
     height: i32,
-    svgExportFlag: Option<SvgExportFlag>,
+    svgExportFlag: Option<PyEither<SvgExportFlag, CanvasOptions>>,
   ) -> PyResult<Bound<'_, PyAny>> {
     match svgExportFlag {
-      Some(flag) => SVGCanvas::new_inner(py, width, height, flag),
-      None => CanvasElement::new_inner(py, width, height),
+      Some(PyEither::A(flag)) => SVGCanvas::new_inner(py, width, height, flag),
+      Some(PyEither::B(options)) => {
+        CanvasElement::new_inner(py, width, height, options.deferred.unwrap_or(true))
+      }
+      None => CanvasElement::new_inner(py, width, height, true),
     }
   }
 }
@@ -1,104 +1,35 @@
 use crate::picture_recorder::PictureRecorder;
-use crate::sk::{Canvas, ColorSpace, Matrix, Path as SkPath, SkPicture, Surface};
+use crate::sk::{Canvas, ColorSpace, FilterQuality, Matrix, Path as SkPath, SkPicture, Surface};
 
-/// Persistent surface for caching intermediate rendering results.
-/// Based on skia-canvas's RecordingSurface pattern.
-/// This enables incremental rendering by maintaining a surface that accumulates
-/// rendered content between getImageData calls.
-pub struct RecordingSurface {
-  surface: Option<Surface>,
-  depth: usize, // How many layers have been rendered to surface
-  width: u32,
-  height: u32,
-  color_space: ColorSpace,
-}
-
-impl RecordingSurface {
-  pub fn new() -> Self {
-    RecordingSurface {
-      surface: None,
-      depth: 0,
-      width: 0,
-      height: 0,
-      color_space: ColorSpace::Srgb,
-    }
-  }
-
-  /// Check if the surface needs to be recreated
-  fn is_stale(&self, width: u32, height: u32, color_space: ColorSpace) -> bool {
-    self.surface.is_none()
-      || self.width != width
-      || self.height != height
-      || self.color_space != color_space
-  }
-
-  /// Update the surface with new layers from the page recorder.
-  /// Only renders layers that haven't been rendered yet.
-  /// Returns a reference to the surface canvas for pixel reading.
-  pub fn update(
-    &mut self,
-    layers: &[SkPicture],
-    width: u32,
-    height: u32,
-    color_space: ColorSpace,
-  ) -> Option<&Surface> {
-    // Check if we need to recreate the surface
-    if self.is_stale(width, height, color_space) {
-      self.surface = Surface::new_rgba_premultiplied(width, height, color_space);
-      self.width = width;
-      self.height = height;
-      self.color_space = color_space;
-      self.depth = 0;
-
-      // Clear the new surface
-      if let Some(ref mut surface) = self.surface {
-        surface.canvas.clear();
-      }
-    }
-
-    let layer_count = layers.len();
-
-    // Render only new layers
-    if let Some(ref mut surface) = self.surface
-      && self.depth < layer_count
-    {
-      for layer in layers.iter().skip(self.depth) {
-        layer.playback(&surface.canvas);
-      }
-      self.depth = layer_count;
-    }
-
-    self.surface.as_ref()
-  }
-
-  /// Reset the recording surface (on canvas resize or clear)
-  pub fn reset(&mut self) {
-    self.surface = None;
-    self.depth = 0;
-    self.width = 0;
-    self.height = 0;
-  }
-}
+/// Layers kept as separate pictures before the rendered ones are flattened
+const MAX_LAYERS: usize = 64;
+/// Approximate size of the recorded commands before the rendered layers are flattened
+const MAX_LAYER_BYTES: usize = 32 * 1024 * 1024;
+/// Pending layers a small pixel read replays on its own, past this it flushes
+pub(crate) const MAX_CULLED_READ_LAYERS: usize = 16;
 
-/// Layer-based deferred rendering recorder (based on skia-canvas)
-/// with integrated bitmap caching for incremental rendering.
+/// Layer-based deferred rendering recorder (based on skia-canvas).
+/// Layers are replayed incrementally onto the context surface, which also
+/// serves pixel reads.
 pub struct PageRecorder {
   current: PictureRecorder, // Active recording
   layers: Vec<SkPicture>,   // Accumulated finalized layers
   width: f32,
   height: f32,
-  changed: bool,                       // Dirty flag for lazy layer promotion
-  depth: usize, // Tracks how many layers have been rendered to external surface
+  // Of the context surface, the flattened layers are rendered in it
+  color_space: ColorSpace,
+  changed: bool,                     // Dirty flag for lazy layer promotion
+  depth: usize, // Tracks how many layers have been rendered to the context surface
   cached_picture: Option<SkPicture>, // Cached composite picture for get_picture()
   layers_at_cache: usize, // Layer count when cached_picture was created
-  recording_surface: RecordingSurface, // Persistent surface for incremental rendering
   current_transform: Option<Matrix>, // Transform to restore after layer promotion
   current_clip: Option<SkPath>, // Clip path to restore after layer promotion
   save_count: usize, // Track save stack depth to restore after layer promotion
+  layer_bytes: usize, // Approximate size of the commands recorded in `layers`
 }
 
 impl PageRecorder {
-  pub fn new(width: f32, height: f32) -> Self {
+  pub fn new(width: f32, height: f32, color_space: ColorSpace) -> Self {
     let mut recorder = PictureRecorder::new();
     recorder.begin_recording(0.0, 0.0, width, height);
 
@@ -107,14 +38,15 @@ impl PageRecorder {
       layers: Vec::new(),
       width,
       height,
+      color_space,
       changed: false,
       depth: 0,
       cached_picture: None,
       layers_at_cache: 0,
-      recording_surface: RecordingSurface::new(),
       current_transform: None,
       current_clip: None,
       save_count: 0,
+      layer_bytes: 0,
     }
   }
 
@@ -124,9 +56,13 @@ impl PageRecorder {
       // Finalize the current recording as a picture
       match self.current.finish_recording_as_picture() {
         Some(picture) => {
+          self.layer_bytes += picture.approximate_bytes_used();
           self.layers.push(picture);
           // Invalidate cached picture since layers changed
           self.cached_picture = None;
+          if self.layers.len() > MAX_LAYERS || self.layer_bytes > MAX_LAYER_BYTES {
+            self.compact_layers();
+          }
         }
         None => {
           // This can happen if the recording was empty or if there was an error
@@ -160,6 +96,82 @@ impl PageRecorder {
     }
   }
 
+  /// Keep a canvas that is drawn and read in a loop to a bounded number of
+  /// pictures: the layers already rendered by `playback_to` (all of them if
+  /// none was) are flattened into their raster snapshot, and when that leaves
+  /// too many, the pending ones are merged into a single picture.
+  fn compact_layers(&mut self) {
+    self.flatten_rendered_layers();
+    if self.layers.len() > MAX_LAYERS {
+      self.merge_pending_layers();
+    }
+    self.layer_bytes = self
+      .layers
+      .iter()
+      .map(SkPicture::approximate_bytes_used)
+      .sum();
+    self.cached_picture = None;
+    self.layers_at_cache = 0;
+  }
+
+  /// Replace the rendered layers with one layer drawing their raster snapshot
+  fn flatten_rendered_layers(&mut self) {
+    let count = if self.depth > 0 {
+      self.depth
+    } else {
+      self.layers.len()
+    };
+    if count < 2 {
+      return;
+    }
+    let Some(mut surface) =
+      Surface::new_rgba_premultiplied(self.width as u32, self.height as u32, self.color_space)
+    else {
+      return;
+    };
+    surface.canvas.clear();
+    for layer in &self.layers[..count] {
+      layer.playback(&surface.canvas);
+    }
+    let Some(snapshot) = surface.make_image_snapshot() else {
+      return;
+    };
+    let mut recorder = PictureRecorder::new();
+    recorder.begin_recording(0.0, 0.0, self.width, self.height);
+    if let Some(canvas) = recorder.get_recording_canvas() {
+      snapshot.draw(canvas, 0.0, 0.0, FilterQuality::None);
+    }
+    let Some(base) = recorder.finish_recording_as_picture() else {
+      return;
+    };
+
+    self.layers.splice(..count, [base]);
+    // The target of `playback_to` already shows the merged layers
+    if self.depth > 0 {
+      self.depth = 1;
+    }
+  }
+
+  /// Replace the layers `playback_to` has not replayed yet with one picture
+  /// recording all of them. They can't be rasterized: the target still has to
+  /// replay them on top of what it shows.
+  fn merge_pending_layers(&mut self) {
+    if self.layers.len() - self.depth < 2 {
+      return;
+    }
+    let mut recorder = PictureRecorder::new();
+    recorder.begin_recording(0.0, 0.0, self.width, self.height);
+    if let Some(canvas) = recorder.get_recording_canvas() {
+      for layer in &self.layers[self.depth..] {
+        layer.playback(canvas);
+      }
+    }
+    let Some(merged) = recorder.finish_recording_as_picture() else {
+      return;
+    };
+    self.layers.splice(self.depth.., [merged]);
+  }
+
   /// Set the current transform to restore after layer promotion
   pub fn set_transform(&mut self, transform: &Matrix) {
     self.current_transform = Some(transform.clone());
@@ -225,9 +237,21 @@ impl PageRecorder {
     }
   }
 
+  /// Number of recorded layers, the current recording excluded
+  pub fn layer_count(&self) -> usize {
+    self.layers.len()
+  }
+
+  /// Layers not yet replayed by `playback_to`, including the current recording.
+  pub fn pending_layers(&mut self) -> &[SkPicture] {
+    self.promote_layer();
+    &self.layers[self.depth..]
+  }
+
   /// Reset recorder (on canvas resize or explicit clear)
   pub fn reset(&mut self, width: f32, height: f32) {
     self.layers.clear();
+    self.layer_bytes = 0;
     self.width = width;
     self.height = height;
     self.current.begin_recording(0.0, 0.0, width, height);
@@ -241,8 +265,6 @@ impl PageRecorder {
     self.depth = 0;
     self.cached_picture = None;
     self.layers_at_cache = 0;
-    // Reset the recording surface
-    self.recording_surface.reset();
     // Reset transform and clip state
     self.current_transform = None;
     self.current_clip = None;
@@ -250,32 +272,6 @@ impl PageRecorder {
     self.save_count = 0;
   }
 
-  /// Get pixels using the persistent RecordingSurface.
-  /// This enables incremental rendering - only new layers are rendered.
-  /// Returns pixel data for the requested region.
-  pub fn get_pixels(
-    &mut self,
-    x: u32,
-    y: u32,
-    width: u32,
-    height: u32,
-    color_space: ColorSpace,
-  ) -> Option<Vec<u8>> {
-    self.promote_layer();
-
-    // Use the recording surface for incremental rendering
-    let canvas_width = self.width as u32;
-    let canvas_height = self.height as u32;
-
-    let surface =
-      self
-        .recording_surface
-        .update(&self.layers, canvas_width, canvas_height, color_space)?;
-
-    // Read pixels from the surface
-    surface.read_pixels(x, y, width, height, color_space)
-  }
-
   /// Get recording canvas for direct access (needed for SVG/PDF direct mode)
   pub fn get_recording_canvas(&mut self) -> Option<&mut Canvas> {
     self.changed = true;
@@ -109,11 +109,15 @@ impl CanvasPattern {
     let mut inner_surface = None;
     let mut is_canvas = false;
     let bitmap = match input {
-      PyEither4::A(mut image) => image
-        .bitmap
-        .as_mut()
-        .map(|b| b.0.bitmap)
-        .ok_or_else(|| PyValueError::new_err("Image is not completed."))?,
+      PyEither4::A(mut image) => {
+        // SVG images are drawn as pictures, patterns need their raster copy
+        image.regenerate_bitmap_if_need()?;
+        image
+          .bitmap
+          .as_mut()
+          .map(|b| b.0.bitmap)
+          .ok_or_else(|| PyValueError::new_err("Image is not completed."))?
+      }
       PyEither4::B(image_data) => {
         let image_data_size = image_data.width * image_data.height * 4;
         let bitmap = Bitmap::from_image_data(
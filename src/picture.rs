@@ -0,0 +1,143 @@
+use pyo3::exceptions::{PyRuntimeError, PyValueError};
+use pyo3::prelude::*;
+use pyo3::types::PyBytes;
+
+use crate::font_collection::{PyFontCollection, lock_fonts};
+use crate::picture_recorder::PictureRecorder;
+use crate::sk::{FilterQuality, SkPicture, Surface};
+use crate::state::Context2dRenderingState;
+
+/// Drawing redirected into a picture by `beginRecording`, together with the
+/// context state to return to at `endRecording`.
+pub(crate) struct PictureRecording {
+  pub(crate) recorder: PictureRecorder,
+  pub(crate) bounds: (f32, f32, f32, f32),
+  pub(crate) state: Context2dRenderingState,
+  pub(crate) states: Vec<Context2dRenderingState>,
+}
+
+/// Drawing commands recorded by `ctx.beginRecording` / `ctx.endRecording`.
+///
+/// A picture is immutable and can be replayed with `drawPicture` any number of
+/// times, on any context, without calling back into Python for each command.
+#[pyclass(module = "canvas_pyr", frozen)]
+pub struct Picture {
+  pub(crate) inner: SkPicture,
+  pub(crate) bounds: (f32, f32, f32, f32),
+  // Whether `serialize` and pickling embed the fonts by default
+  pub(crate) embed_fonts: bool,
+}
+
+impl Picture {
+  /// A picture without any command, covering `width` x `height`.
+  pub(crate) fn empty(width: f32, height: f32) -> PyResult<Self> {
+    let mut recorder = PictureRecorder::new();
+    recorder.begin_recording(0.0, 0.0, width, height);
+    let inner = recorder
+      .finish_recording_as_picture()
+      .ok_or_else(|| PyRuntimeError::new_err("Finish picture recording failed"))?;
+    Ok(Self {
+      inner,
+      bounds: (0.0, 0.0, width, height),
+      embed_fonts: false,
+    })
+  }
+
+  /// A picture drawing the current pixels of `surface`, for canvases that
+  /// render without recording.
+  pub(crate) fn from_surface(surface: &Surface, width: f32, height: f32) -> PyResult<Self> {
+    let snapshot = surface
+      .make_image_snapshot()
+      .ok_or_else(|| PyRuntimeError::new_err("Make image snapshot failed"))?;
+    let mut recorder = PictureRecorder::new();
+    recorder.begin_recording(0.0, 0.0, width, height);
+    if let Some(canvas) = recorder.get_recording_canvas() {
+      snapshot.draw(canvas, 0.0, 0.0, FilterQuality::None);
+    }
+    let inner = recorder
+      .finish_recording_as_picture()
+      .ok_or_else(|| PyRuntimeError::new_err("Finish picture recording failed"))?;
+    Ok(Self {
+      inner,
+      bounds: (0.0, 0.0, width, height),
+      embed_fonts: false,
+    })
+  }
+}
+
+#[pymethods]
+impl Picture {
+  #[getter]
+  pub fn get_x(&self) -> f64 {
+    self.bounds.0 as f64
+  }
+
+  #[getter]
+  pub fn get_y(&self) -> f64 {
+    self.bounds.1 as f64
+  }
+
+  #[getter]
+  pub fn get_width(&self) -> f64 {
+    self.bounds.2 as f64
+  }
+
+  #[getter]
+  pub fn get_height(&self) -> f64 {
+    self.bounds.3 as f64
+  }
+
+  /// Serialize to Skia's SKP format.
+  ///
+  /// Images are embedded with their original encoded bytes, or as PNG. Fonts
+  /// are referenced by family and style and looked up again when the picture
+  /// is read, unless `embedFonts` is true: then their whole data is written,
+  /// for processes that do not have the same fonts. `None` uses the choice
+  /// made when the picture was created.
+  #[pyo3(signature = (embedFonts=None))]
+  #[allow(non_snake_case)]
+  pub fn serialize<'py>(
+    &self,
+    py: Python<'py>,
+    embedFonts: Option<bool>,
+  ) -> PyResult<Bound<'py, PyBytes>> {
+    let data = self
+      .inner
+      .serialize(embedFonts.unwrap_or(self.embed_fonts))
+      .ok_or_else(|| PyRuntimeError::new_err("Serialize picture failed"))?;
+    Ok(PyBytes::new(py, data.slice()))
+  }
+
+  /// Read a picture written by `serialize`.
+  ///
+  /// Referenced fonts are looked up in `fontCollection`, with its fallback to
+  /// `GlobalFonts` if enabled, or in `GlobalFonts` when it is `None`.
+  #[staticmethod]
+  #[pyo3(signature = (data, fontCollection=None))]
+  #[allow(non_snake_case)]
+  pub fn deserialize(
+    data: &[u8],
+    fontCollection: Option<PyRef<PyFontCollection>>,
+  ) -> PyResult<Self> {
+    let fonts = lock_fonts(
+      fontCollection
+        .as_deref()
+        .map(|collection| &*collection.inner),
+    )?;
+    let inner = SkPicture::deserialize(data, &fonts)
+      .ok_or_else(|| PyValueError::new_err("Invalid picture data"))?;
+    let bounds = inner.cull_rect();
+    Ok(Self {
+      inner,
+      bounds,
+      embed_fonts: false,
+    })
+  }
+
+  pub fn __reduce__<'py>(
+    slf: &Bound<'py, Self>,
+  ) -> PyResult<(Bound<'py, PyAny>, (Bound<'py, PyBytes>,))> {
+    let deserialize = slf.get_type().getattr("deserialize")?;
+    Ok((deserialize, (slf.get().serialize(slf.py(), None)?,)))
+  }
+}
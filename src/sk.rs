@@ -115,6 +115,14 @@ pub mod ffi {
     pub is_canvas: bool,
   }
 
+  #[repr(C)]
+  #[derive(Copy, Clone, Debug)]
+  pub struct skiac_svg_picture {
+    pub picture: *mut skiac_picture,
+    pub width: f32,
+    pub height: f32,
+  }
+
   #[repr(C)]
   #[derive(Copy, Clone, Debug)]
   pub struct skiac_sk_string {
@@ -175,6 +183,63 @@ pub mod ffi {
     _unused: [u8; 0],
   }
 
+  #[repr(C)]
+  #[derive(Copy, Clone, Debug)]
+  pub struct skiac_text_block {
+    pub max_width: f32,
+    pub line_height: f32,
+    pub max_lines: u32,
+    pub ellipsis: *const c_char,
+    pub align: i32,
+  }
+
+  #[repr(C)]
+  #[derive(Copy, Clone, Default, Debug)]
+  pub struct skiac_text_block_metrics {
+    pub width: f32,
+    pub height: f32,
+    pub line_count: u32,
+    pub did_exceed_max_lines: bool,
+  }
+
+  #[repr(C)]
+  #[derive(Copy, Clone, Default, Debug)]
+  pub struct skiac_typeface_info {
+    pub weight: i32,
+    pub width: i32,
+    pub slant: i32,
+    pub fixed_pitch: bool,
+  }
+
+  #[repr(C)]
+  #[derive(Copy, Clone, Default, Debug)]
+  pub struct skiac_font_cache_stats {
+    pub used_bytes: usize,
+    pub limit_bytes: usize,
+    pub count: i32,
+    pub count_limit: i32,
+  }
+
+  #[repr(C)]
+  #[derive(Copy, Clone, Default, Debug)]
+  pub struct skiac_paragraph_cache_stats {
+    pub capacity: usize,
+    pub count: usize,
+    pub hits: u64,
+    pub misses: u64,
+    pub evictions: u64,
+  }
+
+  #[repr(C)]
+  #[derive(Copy, Clone, Default, Debug)]
+  pub struct skiac_variation_cache_stats {
+    pub capacity: usize,
+    pub count: usize,
+    pub hits: u64,
+    pub misses: u64,
+    pub evictions: u64,
+  }
+
   #[repr(C)]
   #[derive(Copy, Clone, Default, Debug)]
   pub struct skiac_line_metrics {
@@ -239,6 +304,12 @@ pub mod ffi {
     _unused: [u8; 0],
   }
 
+  #[repr(C)]
+  #[derive(Debug, Clone, Copy)]
+  pub struct skiac_text_blob {
+    _unused: [u8; 0],
+  }
+
   #[repr(C)]
   #[derive(Debug, Clone, Copy)]
   pub struct skiac_drawable {
@@ -401,6 +472,16 @@ pub mod ffi {
 
     pub fn skiac_clear_all_cache();
 
+    pub fn skiac_set_font_cache_limit(bytes: usize) -> usize;
+
+    pub fn skiac_set_font_cache_count_limit(count: i32) -> i32;
+
+    pub fn skiac_get_font_cache_stats(c_stats: *mut skiac_font_cache_stats);
+
+    pub fn skiac_purge_font_cache();
+
+    pub fn skiac_purge_resource_cache();
+
     pub fn skiac_surface_create_rgba_premultiplied(
       width: i32,
       height: i32,
@@ -449,6 +530,18 @@ pub mod ffi {
       color_space: u8,
     ) -> bool;
 
+    pub fn skiac_surface_read_pixels_rect_with_pictures(
+      surface: *mut skiac_surface,
+      pictures: *mut *mut skiac_picture,
+      count: usize,
+      data: *mut u8,
+      x: i32,
+      y: i32,
+      w: i32,
+      h: i32,
+      color_space: u8,
+    ) -> bool;
+
     pub fn skiac_surface_png_data(surface: *mut skiac_surface, data: *mut skiac_sk_data);
 
     pub fn skiac_surface_encode_data(
@@ -584,6 +677,74 @@ pub mod ffi {
       text_rendering: i32,
     );
 
+    pub fn skiac_canvas_get_text_block_metrics_or_draw_text(
+      text: *const c_char,
+      text_len: usize,
+      x: f32,
+      y: f32,
+      block: *const skiac_text_block,
+      font_collection: *mut skiac_font_collection,
+      font_size: f32,
+      weight: i32,
+      stretch: i32,
+      stretch_width: f32,
+      slant: i32,
+      font_family: *const c_char,
+      baseline: i32,
+      direction: i32,
+      letter_spacing: f32,
+      word_spacing: f32,
+      paint: *mut skiac_paint,
+      canvas: *mut skiac_canvas,
+      metrics: *mut skiac_text_block_metrics,
+      variations: *const skiac_font_variation,
+      variations_count: i32,
+      kerning: i32,
+      variant_caps: i32,
+      lang: *const c_char,
+      text_rendering: i32,
+    );
+
+    pub fn skiac_text_blob_make(
+      text: *const c_char,
+      text_len: usize,
+      font_collection: *mut skiac_font_collection,
+      font_size: f32,
+      weight: i32,
+      stretch: i32,
+      stretch_width: f32,
+      slant: i32,
+      font_family: *const c_char,
+      baseline: i32,
+      align: i32,
+      direction: i32,
+      letter_spacing: f32,
+      word_spacing: f32,
+      variations: *const skiac_font_variation,
+      variations_count: i32,
+      kerning: i32,
+      variant_caps: i32,
+      lang: *const c_char,
+      text_rendering: i32,
+      line_metrics: *mut skiac_line_metrics,
+    ) -> *mut skiac_text_blob;
+
+    pub fn skiac_text_blob_destroy(c_text_blob: *mut skiac_text_blob);
+
+    pub fn skiac_text_blob_to_path(
+      text_blob: *mut skiac_text_blob,
+      x: f32,
+      y: f32,
+    ) -> *mut skiac_path;
+
+    pub fn skiac_canvas_draw_text_blob(
+      canvas: *mut skiac_canvas,
+      text_blob: *mut skiac_text_blob,
+      x: f32,
+      y: f32,
+      paint: *mut skiac_paint,
+    );
+
     pub fn skiac_canvas_reset_transform(canvas: *mut skiac_canvas);
 
     pub fn skiac_canvas_clip_rect(canvas: *mut skiac_canvas, x: f32, y: f32, w: f32, h: f32);
@@ -992,17 +1153,45 @@ pub mod ffi {
       filter_quality: i32,
     );
 
+    pub fn skiac_sk_data_from_file(path: *const c_char, c_data: *mut skiac_sk_data) -> bool;
+
     pub fn skiac_sk_data_destroy(c_data: *mut skiac_data);
 
     pub fn skiac_bitmap_make_from_buffer(ptr: *mut u8, size: usize, info: *mut skiac_bitmap_info);
 
-    pub fn skiac_bitmap_make_from_svg(
-      data: *const u8,
+    pub fn skiac_bitmap_make_from_buffer_with_max_size(
+      ptr: *mut u8,
       size: usize,
-      width: f32,
-      height: f32,
+      max_width: i32,
+      max_height: i32,
       info: *mut skiac_bitmap_info,
+    );
+
+    pub fn skiac_bitmap_make_from_buffer_region(
+      ptr: *mut u8,
+      size: usize,
+      x: i32,
+      y: i32,
+      width: i32,
+      height: i32,
+      scale: f32,
+      info: *mut skiac_bitmap_info,
+    ) -> bool;
+
+    pub fn skiac_svg_picture_make(
+      data: *const u8,
+      size: usize,
       font_collection: *mut skiac_font_collection,
+      svg_picture: *mut skiac_svg_picture,
+    ) -> bool;
+
+    pub fn skiac_bitmap_make_from_picture(
+      picture: *mut skiac_picture,
+      picture_width: f32,
+      picture_height: f32,
+      width: i32,
+      height: i32,
+      info: *mut skiac_bitmap_info,
       cs: u8,
     ) -> bool;
 
@@ -1030,17 +1219,43 @@ pub mod ffi {
       ts: skiac_transform,
     ) -> *mut skiac_shader;
 
+    pub fn skiac_bitmap_share(c_bitmap: *mut skiac_bitmap) -> *mut skiac_bitmap;
+
+    pub fn skiac_bitmap_get_byte_size(c_bitmap: *mut skiac_bitmap) -> usize;
+
     pub fn skiac_bitmap_destroy(c_bitmap: *mut skiac_bitmap);
     pub fn skiac_picture_ref(c_picture: *mut skiac_picture);
     pub fn skiac_picture_destroy(c_picture: *mut skiac_picture);
     pub fn skiac_picture_playback(c_picture: *mut skiac_picture, c_canvas: *mut skiac_canvas);
 
+    pub fn skiac_picture_approximate_bytes_used(c_picture: *mut skiac_picture) -> usize;
+
+    pub fn skiac_picture_get_cull_rect(c_picture: *mut skiac_picture, c_rect: *mut skiac_rect);
+
+    pub fn skiac_picture_serialize(
+      c_picture: *mut skiac_picture,
+      embed_fonts: bool,
+      data: *mut skiac_sk_data,
+    );
+
+    pub fn skiac_picture_deserialize(
+      data: *const u8,
+      length: usize,
+      c_collection: *mut skiac_font_collection,
+    ) -> *mut skiac_picture;
+
     // SkString
     pub fn skiac_delete_sk_string(c_sk_string: *mut skiac_sk_string);
 
     // FontCollection
     pub fn skiac_font_collection_create() -> *mut skiac_font_collection;
 
+    pub fn skiac_font_collection_create_scoped(
+      fallback: *mut skiac_font_collection,
+    ) -> *mut skiac_font_collection;
+
+    pub fn skiac_font_collection_sync_fallback(c_font_collection: *mut skiac_font_collection);
+
     pub fn skiac_font_collection_get_default_fonts_count(
       c_font_collection: *mut skiac_font_collection,
     ) -> u32;
@@ -1066,6 +1281,30 @@ pub mod ffi {
       maybe_name_alias: *const c_char,
     ) -> u32;
 
+    pub fn skiac_typeface_make_from_file(font_path: *const c_char) -> *mut skiac_typeface;
+
+    pub fn skiac_typeface_destroy(c_typeface: *mut skiac_typeface);
+
+    pub fn skiac_typeface_get_info(
+      c_typeface: *mut skiac_typeface,
+      family: *mut SkiaString,
+      c_info: *mut skiac_typeface_info,
+    );
+
+    pub fn skiac_typeface_make_from_index(
+      font_path: *const c_char,
+      family: *const c_char,
+      c_info: *const skiac_typeface_info,
+    ) -> *mut skiac_typeface;
+
+    pub fn skiac_font_collection_register_typefaces_from_paths(
+      c_font_collection: *mut skiac_font_collection,
+      font_paths: *const *const c_char,
+      c_typefaces: *const *mut skiac_typeface,
+      count: usize,
+      typeface_ids: *mut u32,
+    );
+
     pub fn skiac_font_collection_unregister(
       c_font_collection: *mut skiac_font_collection,
       typeface_id: u32,
@@ -1089,6 +1328,56 @@ pub mod ffi {
 
     pub fn skiac_font_collection_destroy(c_font_collection: *mut skiac_font_collection);
 
+    pub fn skiac_font_collection_get_paragraph_cache_stats(
+      c_font_collection: *mut skiac_font_collection,
+      c_stats: *mut skiac_paragraph_cache_stats,
+    );
+
+    pub fn skiac_font_collection_set_paragraph_cache_capacity(
+      c_font_collection: *mut skiac_font_collection,
+      capacity: usize,
+    );
+
+    pub fn skiac_font_collection_clear_paragraph_cache(
+      c_font_collection: *mut skiac_font_collection,
+    );
+
+    pub fn skiac_font_collection_set_simple_text_fast_path(
+      c_font_collection: *mut skiac_font_collection,
+      enabled: bool,
+    );
+
+    pub fn skiac_font_collection_warm_up(
+      c_font_collection: *mut skiac_font_collection,
+      families: *const *const c_char,
+      count: usize,
+    ) -> usize;
+
+    pub fn skiac_font_collection_get_variation_cache_stats(
+      c_font_collection: *mut skiac_font_collection,
+      c_stats: *mut skiac_variation_cache_stats,
+    );
+
+    pub fn skiac_font_collection_set_variation_cache_capacity(
+      c_font_collection: *mut skiac_font_collection,
+      capacity: usize,
+    );
+
+    pub fn skiac_font_collection_set_fallback_families(
+      c_font_collection: *mut skiac_font_collection,
+      families: *const *const c_char,
+      count: usize,
+    );
+
+    pub fn skiac_font_collection_get_fallback_families_count(
+      c_font_collection: *mut skiac_font_collection,
+    ) -> usize;
+
+    pub fn skiac_font_collection_get_fallback_family(
+      c_font_collection: *mut skiac_font_collection,
+      index: usize,
+    ) -> *const c_char;
+
     // Variable Fonts
     pub fn skiac_typeface_get_variation_design_position(
       c_font_collection: *mut skiac_font_collection,
@@ -2164,6 +2453,36 @@ impl Surface {
     if status { Some(result) } else { None }
   }
 
+  /// Read a rectangle of the surface as it would look after replaying
+  /// `pictures`, without changing the surface. Only the commands that
+  /// intersect the rectangle are replayed.
+  pub fn read_pixels_with_pictures(
+    &self,
+    pictures: &[SkPicture],
+    x: u32,
+    y: u32,
+    width: u32,
+    height: u32,
+    color_space: ColorSpace,
+  ) -> Option<Vec<u8>> {
+    let mut c_pictures: Vec<*mut ffi::skiac_picture> = pictures.iter().map(|p| p.0).collect();
+    let mut result = vec![0; (width * height * 4) as usize];
+    let status = unsafe {
+      ffi::skiac_surface_read_pixels_rect_with_pictures(
+        self.ptr,
+        c_pictures.as_mut_ptr(),
+        c_pictures.len(),
+        result.as_mut_ptr(),
+        x as i32,
+        y as i32,
+        width as i32,
+        height as i32,
+        color_space as u8,
+      )
+    };
+    if status { Some(result) } else { None }
+  }
+
   pub fn data<'env>(&'env self) -> Option<SurfaceData<'env>> {
     unsafe {
       let mut data = ffi::skiac_surface_data {
@@ -2420,6 +2739,23 @@ impl Deref for SurfaceDataMut<'_> {
 pub struct SkiaDataRef(pub(crate) ffi::skiac_sk_data);
 
 impl SkiaDataRef {
+  /// Map a file into memory (read it where mapping is not supported).
+  pub fn from_file(path: &str) -> Option<Self> {
+    let c_path = CString::new(path).ok()?;
+    let mut data = ffi::skiac_sk_data {
+      ptr: ptr::null_mut(),
+      size: 0,
+      data: ptr::null_mut(),
+    };
+    unsafe {
+      if ffi::skiac_sk_data_from_file(c_path.as_ptr(), &mut data) {
+        Some(SkiaDataRef(data))
+      } else {
+        None
+      }
+    }
+  }
+
   pub fn slice(&self) -> &'static [u8] {
     unsafe { slice::from_raw_parts(self.0.ptr, self.0.size) }
   }
@@ -2719,42 +3055,220 @@ impl Canvas {
     Ok(line_metrics)
   }
 
-  pub fn draw_surface(
-    &mut self,
-    surface: &Surface,
-    left: f32,
-    top: f32,
-    alpha: u8,
-    blend_mode: BlendMode,
-    filter_quality: FilterQuality,
-  ) {
-    unsafe {
-      ffi::skiac_canvas_draw_surface(
-        self.0,
-        surface.ptr,
-        left,
-        top,
-        alpha,
-        blend_mode as i32,
-        filter_quality as i32,
-      );
-    }
-  }
-
-  pub fn draw_surface_rect(
+  pub fn draw_text_block(
     &mut self,
-    surface: &Surface,
-    sx: f32,
-    sy: f32,
-    sw: f32,
-    sh: f32,
-    dx: f32,
-    dy: f32,
-    dw: f32,
-    dh: f32,
-    filter_quality: FilterQuality,
-  ) {
-    unsafe {
+    text: &str,
+    x: f32,
+    y: f32,
+    block: &TextBlock,
+    font_collection: &FontCollection,
+    font_size: f32,
+    weight: u32,
+    stretch: i32,
+    stretch_width: f32,
+    slant: FontStyle,
+    font_family: &str,
+    baseline: TextBaseline,
+    direction: TextDirection,
+    letter_spacing: f32,
+    word_spacing: f32,
+    paint: &Paint,
+    variations: &[FontVariation],
+    kerning: FontKerning,
+    variant_caps: FontVariantCaps,
+    lang: &str,
+    text_rendering: TextRendering,
+  ) -> Result<(), NulError> {
+    text_block(
+      self.0,
+      text,
+      x,
+      y,
+      block,
+      font_collection,
+      font_size,
+      weight,
+      stretch,
+      stretch_width,
+      slant,
+      font_family,
+      baseline,
+      direction,
+      letter_spacing,
+      word_spacing,
+      paint,
+      variations,
+      kerning,
+      variant_caps,
+      lang,
+      text_rendering,
+    )?;
+    Ok(())
+  }
+
+  pub fn get_text_block_metrics(
+    &self,
+    text: &str,
+    block: &TextBlock,
+    font_collection: &FontCollection,
+    font_size: f32,
+    weight: u32,
+    stretch: i32,
+    stretch_width: f32,
+    slant: FontStyle,
+    font_family: &str,
+    direction: TextDirection,
+    letter_spacing: f32,
+    word_spacing: f32,
+    paint: &Paint,
+    variations: &[FontVariation],
+    kerning: FontKerning,
+    variant_caps: FontVariantCaps,
+    lang: &str,
+    text_rendering: TextRendering,
+  ) -> Result<ffi::skiac_text_block_metrics, NulError> {
+    text_block(
+      ptr::null_mut(),
+      text,
+      0.0,
+      0.0,
+      block,
+      font_collection,
+      font_size,
+      weight,
+      stretch,
+      stretch_width,
+      slant,
+      font_family,
+      TextBaseline::Top,
+      direction,
+      letter_spacing,
+      word_spacing,
+      paint,
+      variations,
+      kerning,
+      variant_caps,
+      lang,
+      text_rendering,
+    )
+  }
+
+  pub fn draw_text_blob(&mut self, text_blob: &TextBlob, x: f32, y: f32, paint: &Paint) {
+    unsafe { ffi::skiac_canvas_draw_text_blob(self.0, text_blob.0, x, y, paint.0) }
+  }
+
+  /// Measure several strings with one style. The family and lang strings are converted once, and
+  /// empty strings measure as zero without reaching Skia.
+  pub fn get_line_metrics_batch<S: AsRef<str>>(
+    &self,
+    texts: &[S],
+    font_collection: &FontCollection,
+    font_size: f32,
+    weight: u32,
+    stretch: i32,
+    stretch_width: f32,
+    slant: FontStyle,
+    font_family: &str,
+    baseline: TextBaseline,
+    align: TextAlign,
+    direction: TextDirection,
+    letter_spacing: f32,
+    word_spacing: f32,
+    paint: &Paint,
+    variations: &[FontVariation],
+    kerning: FontKerning,
+    variant_caps: FontVariantCaps,
+    lang: &str,
+    text_rendering: TextRendering,
+  ) -> Result<Vec<ffi::skiac_line_metrics>, NulError> {
+    let c_font_family = std::ffi::CString::new(font_family)?;
+    let c_lang = if lang.is_empty() || lang == "inherit" {
+      None
+    } else {
+      Some(std::ffi::CString::new(lang)?)
+    };
+
+    let mut result = Vec::with_capacity(texts.len());
+    for text in texts {
+      let text = text.as_ref();
+      let mut line_metrics = ffi::skiac_line_metrics::default();
+      if text.is_empty() {
+        result.push(line_metrics);
+        continue;
+      }
+      let c_text = std::ffi::CString::new(text)?;
+      unsafe {
+        ffi::skiac_canvas_get_line_metrics_or_draw_text(
+          c_text.as_ptr(),
+          text.len(),
+          0.0,
+          0.0,
+          0.0,
+          0.0,
+          font_collection.0,
+          font_size,
+          weight as i32,
+          stretch,
+          stretch_width,
+          slant as i32,
+          c_font_family.as_ptr(),
+          baseline as i32,
+          align as i32,
+          direction.as_sk_direction(),
+          letter_spacing,
+          word_spacing,
+          paint.0,
+          ptr::null_mut(),
+          &mut line_metrics,
+          variations.as_ptr() as *const ffi::skiac_font_variation,
+          variations.len() as i32,
+          kerning as i32,
+          variant_caps as i32,
+          c_lang.as_ref().map_or(ptr::null(), |s| s.as_ptr()),
+          text_rendering as i32,
+        );
+      }
+      result.push(line_metrics);
+    }
+    Ok(result)
+  }
+
+  pub fn draw_surface(
+    &mut self,
+    surface: &Surface,
+    left: f32,
+    top: f32,
+    alpha: u8,
+    blend_mode: BlendMode,
+    filter_quality: FilterQuality,
+  ) {
+    unsafe {
+      ffi::skiac_canvas_draw_surface(
+        self.0,
+        surface.ptr,
+        left,
+        top,
+        alpha,
+        blend_mode as i32,
+        filter_quality as i32,
+      );
+    }
+  }
+
+  pub fn draw_surface_rect(
+    &mut self,
+    surface: &Surface,
+    sx: f32,
+    sy: f32,
+    sw: f32,
+    sh: f32,
+    dx: f32,
+    dy: f32,
+    dw: f32,
+    dh: f32,
+    filter_quality: FilterQuality,
+  ) {
+    unsafe {
       ffi::skiac_canvas_draw_surface_rect(
         self.0,
         surface.ptr,
@@ -4072,12 +4586,14 @@ impl Bitmap {
     }
   }
 
-  pub fn from_svg_data(
-    data: *const u8,
+  /// Decode so that the result fits in `max_width` x `max_height` (0 means
+  /// unbounded), using the codec's native scaled decoding where possible.
+  pub fn from_buffer_with_max_size(
+    ptr: *mut u8,
     size: usize,
-    color_space: ColorSpace,
-    fc: &FontCollection,
-  ) -> Option<Result<Self, crate::error::SkError>> {
+    max_width: u32,
+    max_height: u32,
+  ) -> Option<Self> {
     let mut bitmap_info = ffi::skiac_bitmap_info {
       bitmap: ptr::null_mut(),
       width: 0,
@@ -4085,34 +4601,30 @@ impl Bitmap {
       is_canvas: false,
     };
     unsafe {
-      let is_valid = ffi::skiac_bitmap_make_from_svg(
-        data,
+      ffi::skiac_bitmap_make_from_buffer_with_max_size(
+        ptr,
         size,
-        -1.0,
-        -1.0,
+        max_width as i32,
+        max_height as i32,
         &mut bitmap_info,
-        fc.0,
-        color_space as u8,
       );
-
-      if !is_valid {
-        return Some(Err(crate::error::SkError::InvalidSvg));
-      }
-
       if bitmap_info.bitmap.is_null() {
         return None;
       }
-      Some(Ok(Bitmap(bitmap_info)))
+      Some(Bitmap(bitmap_info))
     }
   }
 
-  pub fn from_svg_data_with_custom_size(
-    data: *const u8,
+  /// Decode only the `width` x `height` rectangle at (`x`, `y`), scaled by
+  /// `scale` (0 < scale <= 1).
+  pub fn from_buffer_region(
+    ptr: *mut u8,
     size: usize,
-    width: f32,
-    height: f32,
-    color_space: ColorSpace,
-    fc: &FontCollection,
+    x: i32,
+    y: i32,
+    width: i32,
+    height: i32,
+    scale: f32,
   ) -> Option<Self> {
     let mut bitmap_info = ffi::skiac_bitmap_info {
       bitmap: ptr::null_mut(),
@@ -4121,17 +4633,48 @@ impl Bitmap {
       is_canvas: false,
     };
     unsafe {
-      ffi::skiac_bitmap_make_from_svg(
-        data,
+      if !ffi::skiac_bitmap_make_from_buffer_region(
+        ptr,
         size,
+        x,
+        y,
         width,
         height,
+        scale,
         &mut bitmap_info,
-        fc.0,
-        color_space as u8,
-      );
+      ) {
+        return None;
+      }
+      Some(Bitmap(bitmap_info))
+    }
+  }
 
-      if bitmap_info.bitmap.is_null() {
+  /// Rasterize `picture`, recorded at `picture_width` x `picture_height`,
+  /// stretched to `width` x `height`.
+  pub fn from_picture(
+    picture: &SkPicture,
+    picture_width: f32,
+    picture_height: f32,
+    width: i32,
+    height: i32,
+    color_space: ColorSpace,
+  ) -> Option<Self> {
+    let mut bitmap_info = ffi::skiac_bitmap_info {
+      bitmap: ptr::null_mut(),
+      width: 0,
+      height: 0,
+      is_canvas: false,
+    };
+    unsafe {
+      if !ffi::skiac_bitmap_make_from_picture(
+        picture.0,
+        picture_width,
+        picture_height,
+        width,
+        height,
+        &mut bitmap_info,
+        color_space as u8,
+      ) {
         return None;
       }
       Some(Bitmap(bitmap_info))
@@ -4165,6 +4708,24 @@ impl Bitmap {
       is_canvas: false,
     })
   }
+
+  /// Create another handle to the same immutable pixels, without copying them.
+  ///
+  /// Only valid for bitmaps that own their pixel memory (decoded by Skia),
+  /// not for the ones built with `from_image_data`.
+  pub fn share(&self) -> Self {
+    let bitmap = unsafe { ffi::skiac_bitmap_share(self.0.bitmap) };
+    Bitmap(ffi::skiac_bitmap_info {
+      bitmap,
+      width: self.0.width,
+      height: self.0.height,
+      is_canvas: false,
+    })
+  }
+
+  pub fn byte_size(&self) -> usize {
+    unsafe { ffi::skiac_bitmap_get_byte_size(self.0.bitmap) }
+  }
 }
 
 impl Drop for Bitmap {
@@ -4238,6 +4799,249 @@ impl Drop for SkiaString {
 #[derive(Debug, Clone)]
 pub struct LineMetrics(pub ffi::skiac_line_metrics);
 
+/// A font file parsed outside of any font collection, see
+/// [`FontCollection::register_typefaces_from_paths`].
+#[derive(Debug)]
+pub struct Typeface(*mut ffi::skiac_typeface);
+
+// Typefaces are immutable and reference counted atomically
+unsafe impl Send for Typeface {}
+unsafe impl Sync for Typeface {}
+
+/// What a font index records about a font file to register it unopened.
+#[derive(Debug, Clone, PartialEq, Eq, Serialize, Deserialize)]
+pub struct TypefaceInfo {
+  pub family: String,
+  pub weight: i32,
+  pub width: i32,
+  pub slant: i32,
+  pub fixed_pitch: bool,
+}
+
+impl Typeface {
+  /// Parse a font file, safe to call from several threads at once.
+  pub fn from_file(font_path: &str) -> Option<Self> {
+    let font_path = CString::new(font_path).ok()?;
+    let typeface = unsafe { ffi::skiac_typeface_make_from_file(font_path.as_ptr()) };
+    if typeface.is_null() {
+      None
+    } else {
+      Some(Self(typeface))
+    }
+  }
+
+  /// A typeface for `font_path` built from indexed metadata, the file is only
+  /// opened when glyphs are first needed.
+  pub fn from_index(font_path: &str, info: &TypefaceInfo) -> Option<Self> {
+    let font_path = CString::new(font_path).ok()?;
+    let family = CString::new(info.family.as_str()).ok()?;
+    let c_info = ffi::skiac_typeface_info {
+      weight: info.weight,
+      width: info.width,
+      slant: info.slant,
+      fixed_pitch: info.fixed_pitch,
+    };
+    let typeface =
+      unsafe { ffi::skiac_typeface_make_from_index(font_path.as_ptr(), family.as_ptr(), &c_info) };
+    if typeface.is_null() {
+      None
+    } else {
+      Some(Self(typeface))
+    }
+  }
+
+  pub fn info(&self) -> TypefaceInfo {
+    let mut family = SkiaString {
+      ptr: ptr::null_mut(),
+      length: 0,
+      sk_string: ptr::null_mut(),
+    };
+    let mut c_info = ffi::skiac_typeface_info::default();
+    unsafe { ffi::skiac_typeface_get_info(self.0, &mut family, &mut c_info) };
+    let family = unsafe { CStr::from_ptr(family.ptr) }
+      .to_string_lossy()
+      .into_owned();
+    TypefaceInfo {
+      family,
+      weight: c_info.weight,
+      width: c_info.width,
+      slant: c_info.slant,
+      fixed_pitch: c_info.fixed_pitch,
+    }
+  }
+}
+
+impl Drop for Typeface {
+  fn drop(&mut self) {
+    unsafe { ffi::skiac_typeface_destroy(self.0) }
+  }
+}
+
+/// Glyph runs of one line of text, shaped once and drawn any number of times.
+#[derive(Debug)]
+pub struct TextBlob(*mut ffi::skiac_text_blob);
+
+// Immutable after creation
+unsafe impl Send for TextBlob {}
+unsafe impl Sync for TextBlob {}
+
+impl Drop for TextBlob {
+  fn drop(&mut self) {
+    unsafe { ffi::skiac_text_blob_destroy(self.0) }
+  }
+}
+
+impl TextBlob {
+  /// Shape `text` as `fillText` would at (0, 0), with textAlign and textBaseline applied.
+  pub fn new(
+    text: &str,
+    font_collection: &FontCollection,
+    font_size: f32,
+    weight: u32,
+    stretch: i32,
+    stretch_width: f32,
+    slant: FontStyle,
+    font_family: &str,
+    baseline: TextBaseline,
+    align: TextAlign,
+    direction: TextDirection,
+    letter_spacing: f32,
+    word_spacing: f32,
+    variations: &[FontVariation],
+    kerning: FontKerning,
+    variant_caps: FontVariantCaps,
+    lang: &str,
+    text_rendering: TextRendering,
+  ) -> Result<(Self, LineMetrics), NulError> {
+    let c_text = std::ffi::CString::new(text)?;
+    let c_font_family = std::ffi::CString::new(font_family)?;
+    let c_lang = if lang.is_empty() || lang == "inherit" {
+      None
+    } else {
+      Some(std::ffi::CString::new(lang)?)
+    };
+    let mut line_metrics = ffi::skiac_line_metrics::default();
+    let text_blob = unsafe {
+      ffi::skiac_text_blob_make(
+        c_text.as_ptr(),
+        text.len(),
+        font_collection.0,
+        font_size,
+        weight as i32,
+        stretch,
+        stretch_width,
+        slant as i32,
+        c_font_family.as_ptr(),
+        baseline as i32,
+        align as i32,
+        direction.as_sk_direction(),
+        letter_spacing,
+        word_spacing,
+        variations.as_ptr() as *const ffi::skiac_font_variation,
+        variations.len() as i32,
+        kerning as i32,
+        variant_caps as i32,
+        c_lang.as_ref().map_or(ptr::null(), |s| s.as_ptr()),
+        text_rendering as i32,
+        &mut line_metrics,
+      )
+    };
+    Ok((TextBlob(text_blob), LineMetrics(line_metrics)))
+  }
+
+  /// Outlines of the glyphs, placed as `drawTextBlob` at (x, y) would draw them.
+  pub fn to_path(&self, x: f32, y: f32) -> Path {
+    Path(unsafe { ffi::skiac_text_blob_to_path(self.0, x, y) })
+  }
+}
+
+/// Wrapping and alignment options of `fillTextBlock` / `measureTextBlock`.
+#[derive(Debug, Clone, Default)]
+pub struct TextBlock {
+  pub max_width: Option<f32>,
+  pub line_height: Option<f32>,
+  pub max_lines: Option<u32>,
+  pub ellipsis: Option<String>,
+  pub align: TextAlign,
+}
+
+// Draws onto `canvas`, or only measures when it is null
+fn text_block(
+  canvas: *mut ffi::skiac_canvas,
+  text: &str,
+  x: f32,
+  y: f32,
+  block: &TextBlock,
+  font_collection: &FontCollection,
+  font_size: f32,
+  weight: u32,
+  stretch: i32,
+  stretch_width: f32,
+  slant: FontStyle,
+  font_family: &str,
+  baseline: TextBaseline,
+  direction: TextDirection,
+  letter_spacing: f32,
+  word_spacing: f32,
+  paint: &Paint,
+  variations: &[FontVariation],
+  kerning: FontKerning,
+  variant_caps: FontVariantCaps,
+  lang: &str,
+  text_rendering: TextRendering,
+) -> Result<ffi::skiac_text_block_metrics, NulError> {
+  let c_text = std::ffi::CString::new(text)?;
+  let c_font_family = std::ffi::CString::new(font_family)?;
+  let c_lang = if lang.is_empty() || lang == "inherit" {
+    None
+  } else {
+    Some(std::ffi::CString::new(lang)?)
+  };
+  let c_ellipsis = block
+    .ellipsis
+    .as_deref()
+    .map(std::ffi::CString::new)
+    .transpose()?;
+  let c_block = ffi::skiac_text_block {
+    max_width: block.max_width.unwrap_or(0.0),
+    line_height: block.line_height.unwrap_or(0.0),
+    max_lines: block.max_lines.unwrap_or(0),
+    ellipsis: c_ellipsis.as_ref().map_or(ptr::null(), |s| s.as_ptr()),
+    align: block.align as i32,
+  };
+  let mut metrics = ffi::skiac_text_block_metrics::default();
+  unsafe {
+    ffi::skiac_canvas_get_text_block_metrics_or_draw_text(
+      c_text.as_ptr(),
+      text.len(),
+      x,
+      y,
+      &c_block,
+      font_collection.0,
+      font_size,
+      weight as i32,
+      stretch,
+      stretch_width,
+      slant as i32,
+      c_font_family.as_ptr(),
+      baseline as i32,
+      direction.as_sk_direction(),
+      letter_spacing,
+      word_spacing,
+      paint.0,
+      canvas,
+      &mut metrics,
+      variations.as_ptr() as *const ffi::skiac_font_variation,
+      variations.len() as i32,
+      kerning as i32,
+      variant_caps as i32,
+      c_lang.as_ref().map_or(ptr::null(), |s| s.as_ptr()),
+      text_rendering as i32,
+    );
+  }
+  Ok(metrics)
+}
+
 #[derive(Debug)]
 pub struct FontCollection(pub *mut ffi::skiac_font_collection);
 
@@ -4252,6 +5056,17 @@ impl FontCollection {
     }
   }
 
+  /// An empty collection whose lookups continue in `fallback`, which must
+  /// outlive it. Call `sync_fallback` with `fallback` locked before each use.
+  pub fn new_scoped(fallback: Option<&FontCollection>) -> FontCollection {
+    let fallback = fallback.map_or(ptr::null_mut(), |fallback| fallback.0);
+    FontCollection(unsafe { ffi::skiac_font_collection_create_scoped(fallback) })
+  }
+
+  pub fn sync_fallback(&self) {
+    unsafe { ffi::skiac_font_collection_sync_fallback(self.0) }
+  }
+
   pub fn get_families(&self) -> Vec<FontStyleSet> {
     let mut names = Vec::new();
 
@@ -4329,6 +5144,45 @@ impl FontCollection {
     result
   }
 
+  /// Like [`FontCollection::register_from_path`] with the files already
+  /// parsed, invalidating the lookup caches once for the whole batch. Returns
+  /// the typeface id of each font, `None` where registering failed.
+  pub fn register_typefaces_from_paths(&self, fonts: &[(&str, &Typeface)]) -> Vec<Option<u32>> {
+    let mut font_paths = Vec::with_capacity(fonts.len());
+    let mut typefaces = Vec::with_capacity(fonts.len());
+    for (font_path, typeface) in fonts {
+      match CString::new(*font_path) {
+        Ok(font_path) => {
+          font_paths.push(font_path);
+          typefaces.push(typeface.0);
+        }
+        // Skipped, a null typeface is not registered
+        Err(_) => {
+          font_paths.push(CString::default());
+          typefaces.push(ptr::null_mut());
+        }
+      }
+    }
+    let path_ptrs = font_paths
+      .iter()
+      .map(|font_path| font_path.as_ptr())
+      .collect::<Vec<_>>();
+    let mut typeface_ids = vec![0u32; fonts.len()];
+    unsafe {
+      ffi::skiac_font_collection_register_typefaces_from_paths(
+        self.0,
+        path_ptrs.as_ptr(),
+        typefaces.as_ptr(),
+        fonts.len(),
+        typeface_ids.as_mut_ptr(),
+      )
+    };
+    typeface_ids
+      .into_iter()
+      .map(|typeface_id| (typeface_id > 0).then_some(typeface_id))
+      .collect()
+  }
+
   pub fn register_from_path<S: AsRef<str>>(
     &self,
     font_path: &str,
@@ -4383,6 +5237,76 @@ impl FontCollection {
     unsafe { ffi::skiac_font_collection_set_alias(self.0, family.as_ptr(), alias_name.as_ptr()) }
   }
 
+  pub fn paragraph_cache_stats(&self) -> ffi::skiac_paragraph_cache_stats {
+    let mut stats = ffi::skiac_paragraph_cache_stats::default();
+    unsafe { ffi::skiac_font_collection_get_paragraph_cache_stats(self.0, &mut stats) };
+    stats
+  }
+
+  pub fn set_paragraph_cache_capacity(&self, capacity: usize) {
+    unsafe { ffi::skiac_font_collection_set_paragraph_cache_capacity(self.0, capacity) }
+  }
+
+  pub fn clear_paragraph_cache(&self) {
+    unsafe { ffi::skiac_font_collection_clear_paragraph_cache(self.0) }
+  }
+
+  pub fn set_simple_text_fast_path(&self, enabled: bool) {
+    unsafe { ffi::skiac_font_collection_set_simple_text_fast_path(self.0, enabled) }
+  }
+
+  /// Open the typefaces of `families` (every registered family when `None`),
+  /// returns how many could be opened.
+  pub fn warm_up<S: AsRef<str>>(&self, families: Option<&[S]>) -> Result<usize, NulError> {
+    let Some(families) = families else {
+      return Ok(unsafe { ffi::skiac_font_collection_warm_up(self.0, ptr::null(), 0) });
+    };
+    let families = families
+      .iter()
+      .map(|family| CString::new(family.as_ref()))
+      .collect::<Result<Vec<_>, _>>()?;
+    let ptrs = families
+      .iter()
+      .map(|family| family.as_ptr())
+      .collect::<Vec<_>>();
+    Ok(unsafe { ffi::skiac_font_collection_warm_up(self.0, ptrs.as_ptr(), ptrs.len()) })
+  }
+
+  pub fn variation_cache_stats(&self) -> ffi::skiac_variation_cache_stats {
+    let mut stats = ffi::skiac_variation_cache_stats::default();
+    unsafe { ffi::skiac_font_collection_get_variation_cache_stats(self.0, &mut stats) };
+    stats
+  }
+
+  pub fn set_variation_cache_capacity(&self, capacity: usize) {
+    unsafe { ffi::skiac_font_collection_set_variation_cache_capacity(self.0, capacity) }
+  }
+
+  pub fn set_fallback_families<S: AsRef<str>>(&self, families: &[S]) -> Result<(), NulError> {
+    let families = families
+      .iter()
+      .map(|family| CString::new(family.as_ref()))
+      .collect::<Result<Vec<_>, _>>()?;
+    let ptrs = families
+      .iter()
+      .map(|family| family.as_ptr())
+      .collect::<Vec<_>>();
+    unsafe { ffi::skiac_font_collection_set_fallback_families(self.0, ptrs.as_ptr(), ptrs.len()) };
+    Ok(())
+  }
+
+  pub fn fallback_families(&self) -> Vec<String> {
+    let count = unsafe { ffi::skiac_font_collection_get_fallback_families_count(self.0) };
+    (0..count)
+      .map(|index| {
+        let family = unsafe { ffi::skiac_font_collection_get_fallback_family(self.0, index) };
+        unsafe { CStr::from_ptr(family) }
+          .to_string_lossy()
+          .into_owned()
+      })
+      .collect()
+  }
+
   pub fn get_variation_axes(
     &self,
     family_name: &str,
@@ -4491,6 +5415,10 @@ impl Drop for SkWMemoryStream {
 #[derive(Debug)]
 pub struct SkPicture(*mut ffi::skiac_picture);
 
+// Safety: SkPicture is reference-counted and immutable once recorded
+unsafe impl Send for SkPicture {}
+unsafe impl Sync for SkPicture {}
+
 impl Drop for SkPicture {
   fn drop(&mut self) {
     if !self.0.is_null() {
@@ -4515,6 +5443,33 @@ impl Clone for SkPicture {
 }
 
 impl SkPicture {
+  /// Parse an SVG document and record it as a picture, together with its
+  /// intrinsic size. `None` means a valid document without any size.
+  pub fn from_svg_data(
+    data: *const u8,
+    size: usize,
+    fc: &FontCollection,
+  ) -> Option<Result<(Self, f32, f32), crate::error::SkError>> {
+    let mut svg_picture = ffi::skiac_svg_picture {
+      picture: ptr::null_mut(),
+      width: 0.0,
+      height: 0.0,
+    };
+    unsafe {
+      if !ffi::skiac_svg_picture_make(data, size, fc.0, &mut svg_picture) {
+        return Some(Err(crate::error::SkError::InvalidSvg));
+      }
+    }
+    if svg_picture.picture.is_null() {
+      return None;
+    }
+    Some(Ok((
+      SkPicture(svg_picture.picture),
+      svg_picture.width,
+      svg_picture.height,
+    )))
+  }
+
   /// Direct playback of picture commands to canvas.
   /// This is faster than draw_picture() as it doesn't wrap in save/restore
   /// or create temporary layers for matrix/paint.
@@ -4524,6 +5479,60 @@ impl SkPicture {
       ffi::skiac_picture_playback(self.0, canvas.0);
     }
   }
+
+  /// Memory used by the recorded commands, not counting referenced images.
+  #[inline]
+  pub fn approximate_bytes_used(&self) -> usize {
+    unsafe { ffi::skiac_picture_approximate_bytes_used(self.0) }
+  }
+
+  /// The bounds the picture was recorded with, as `(x, y, width, height)`.
+  pub fn cull_rect(&self) -> (f32, f32, f32, f32) {
+    let mut rect = ffi::skiac_rect {
+      left: 0.0,
+      top: 0.0,
+      right: 0.0,
+      bottom: 0.0,
+    };
+    unsafe {
+      ffi::skiac_picture_get_cull_rect(self.0, &mut rect);
+    }
+    (
+      rect.left,
+      rect.top,
+      rect.right - rect.left,
+      rect.bottom - rect.top,
+    )
+  }
+
+  /// Serialize to Skia's SKP format, with images embedded. Fonts are
+  /// referenced by family and style unless `embed_fonts`.
+  pub fn serialize(&self, embed_fonts: bool) -> Option<SkiaDataRef> {
+    let mut data = ffi::skiac_sk_data {
+      ptr: ptr::null_mut(),
+      size: 0,
+      data: ptr::null_mut(),
+    };
+    unsafe {
+      ffi::skiac_picture_serialize(self.0, embed_fonts, &mut data);
+    }
+    if data.ptr.is_null() {
+      None
+    } else {
+      Some(SkiaDataRef(data))
+    }
+  }
+
+  /// Read a picture written by `serialize`, fonts that were not embedded are
+  /// resolved in `fc`.
+  pub fn deserialize(data: &[u8], fc: &FontCollection) -> Option<Self> {
+    let picture = unsafe { ffi::skiac_picture_deserialize(data.as_ptr(), data.len(), fc.0) };
+    if picture.is_null() {
+      None
+    } else {
+      Some(SkPicture(picture))
+    }
+  }
 }
 
 /// SkImage wrapper for cached bitmap snapshots.
@@ -0,0 +1,109 @@
+"""Compare deferred (recording) and immediate canvases on a few workloads.
+
+    python ztest/benchmark_deferred.py [--size 512] [--repeats 5] [name ...]
+
+Deferred canvases record drawing and render it when the pixels are needed,
+which wins when many calls are followed by a single encode. Immediate
+canvases (`createCanvas(w, h, {"deferred": False})`) render every call right
+away and avoid the recording overhead when pixels are read after every few
+calls.
+"""
+
+import math
+import statistics
+import sys
+import time
+from typing import Callable, Dict
+
+import canvas_pyr
+
+workloads: Dict[str, Callable[[canvas_pyr.Canvas, int], None]] = {}
+
+
+def workload(func: Callable[[canvas_pyr.Canvas, int], None]):
+    workloads[func.__name__] = func
+    return func
+
+
+def _circle(ctx: canvas_pyr.CanvasRenderingContext2D, i: int, size: int) -> None:
+    ctx.fillStyle = f"rgba({i % 256}, 100, 200, 0.6)"
+    ctx.beginPath()
+    ctx.arc((i * 37) % size, (i * 91) % size, 12, 0, 2 * math.pi)
+    ctx.fill()
+
+
+@workload
+def draw_then_encode(canvas: canvas_pyr.Canvas, size: int) -> None:
+    """Many draws, one PNG encode at the end."""
+    ctx = canvas.getContext("2d")
+    for i in range(2000):
+        _circle(ctx, i, size)
+    canvas.encode("png")
+
+
+@workload
+def read_after_each_draw(canvas: canvas_pyr.Canvas, size: int) -> None:
+    """A full getImageData after every few draws, e.g. for hit testing."""
+    ctx = canvas.getContext("2d")
+    for i in range(200):
+        _circle(ctx, i, size)
+        if i % 4 == 0:
+            ctx.getImageData(0, 0, size, size)
+
+
+@workload
+def put_image_data_loop(canvas: canvas_pyr.Canvas, size: int) -> None:
+    """Pixel manipulation: read, write back, draw on top."""
+    ctx = canvas.getContext("2d")
+    for i in range(50):
+        image_data = ctx.getImageData(0, 0, size, size)
+        ctx.putImageData(image_data, 0, 0)
+        _circle(ctx, i, size)
+
+
+@workload
+def encode_frames(canvas: canvas_pyr.Canvas, size: int) -> None:
+    """An animation: a few draws, then a raw frame, repeatedly."""
+    ctx = canvas.getContext("2d")
+    for frame in range(30):
+        ctx.clearRect(0, 0, size, size)
+        for i in range(20):
+            _circle(ctx, frame * 20 + i, size)
+        canvas.data()
+
+
+def measure(name: str, deferred: bool, size: int, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        canvas = canvas_pyr.createCanvas(size, size, {"deferred": deferred})
+        start = time.perf_counter()
+        workloads[name](canvas, size)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare deferred and immediate canvases.")
+    parser.add_argument("names", nargs="*", help="Workloads to run, all by default.")
+    parser.add_argument("--size", type=int, default=512, help="Canvas width and height.")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per workload and mode.")
+    args = parser.parse_args()
+
+    names = args.names or list(workloads)
+    unknown = [name for name in names if name not in workloads]
+    if unknown:
+        print(f"Unknown workloads {unknown}. Available workloads: {list(workloads)}")
+        sys.exit(1)
+
+    print(f"{'workload':<24}{'deferred ms':>14}{'immediate ms':>14}  faster")
+    for name in names:
+        deferred = measure(name, True, args.size, args.repeats)
+        immediate = measure(name, False, args.size, args.repeats)
+        faster = "deferred" if deferred < immediate else "immediate"
+        print(f"{name:<24}{deferred * 1000:>14.2f}{immediate * 1000:>14.2f}  {faster}")
+
+
+if __name__ == "__main__":
+    main()
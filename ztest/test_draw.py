@@ -2,6 +2,7 @@ import base64
 import math
 import os
 import pathlib
+import pickle
 import sys
 import unittest
 from io import BytesIO
@@ -966,6 +967,175 @@ class DrawTestCase(BaseTestCase):
         ctx.drawCanvas(sourceCanvas, 250, 0)
         self._snapshot("drawCanvas-preserves-source-clip-after-read")
 
+    def test_layer_compaction_keeps_content(self):
+        def draw(ctx, i):
+            ctx.fillStyle = f"rgba({i % 256}, 0, {255 - i % 256}, 0.5)"
+            ctx.fillRect(i % 90, (i * 7) % 90, 10, 10)
+
+        expected_canvas = canvas_pyr.createCanvas(100, 100)
+        expected_ctx = expected_canvas.getContext("2d")
+        for i in range(300):
+            draw(expected_ctx, i)
+        expected = expected_ctx.getImageData(0, 0, 100, 100).data
+
+        # every read promotes the drawing since the previous one to a new layer
+        source = canvas_pyr.createCanvas(100, 100)
+        ctx = source.getContext("2d")
+        for i in range(300):
+            draw(ctx, i)
+            if i % 2:
+                source.data()
+            else:
+                ctx.getImageData(0, 0, 1, 1)
+        self.assertEqual(ctx.getImageData(0, 0, 100, 100).data, expected)
+        self.assertEqual(source.data(), expected_canvas.data())
+
+        target = canvas_pyr.createCanvas(100, 100).getContext("2d")
+        target.drawCanvas(source, 0, 0)
+        self.assertEqual(target.getImageData(0, 0, 100, 100).data, expected)
+
+        # after a single read, drawCanvas promotes layers that are never rendered
+        source = canvas_pyr.createCanvas(100, 100)
+        ctx = source.getContext("2d")
+        draw(ctx, 0)
+        source.data()
+        for i in range(1, 300):
+            draw(ctx, i)
+            target.drawCanvas(source, 0, 0)
+            self.assertLessEqual(source._layerCount, 65)
+        self.assertEqual(ctx.getImageData(0, 0, 100, 100).data, expected)
+        target.clearRect(0, 0, 100, 100)
+        target.drawCanvas(source, 0, 0)
+        self.assertEqual(target.getImageData(0, 0, 100, 100).data, expected)
+
+    def test_draw_picture_matches_direct_drawing(self):
+        def stamp(ctx):
+            ctx.fillStyle = "#c00"
+            ctx.fillRect(0, 0, 20, 20)
+            ctx.save()
+            ctx.translate(10, 10)
+            ctx.beginPath()
+            ctx.arc(0, 0, 8, 0, math.pi * 2)
+            ctx.fillStyle = "#06c"
+            ctx.fill()
+            ctx.restore()
+
+        def render(draw):
+            canvas = canvas_pyr.createCanvas(120, 60)
+            ctx = canvas.getContext("2d")
+            ctx.translate(5, 5)
+            draw(ctx)
+            return ctx.getImageData(0, 0, 120, 60).data
+
+        def direct(ctx):
+            for x in range(0, 100, 25):
+                ctx.save()
+                ctx.translate(x, 10)
+                stamp(ctx)
+                ctx.restore()
+
+        def replay(ctx):
+            ctx.fillStyle = "#0f0"
+            ctx.beginRecording((0, 0, 20, 20))
+            stamp(ctx)
+            picture = ctx.endRecording()
+            self.assertEqual(
+                (picture.x, picture.y, picture.width, picture.height), (0, 0, 20, 20)
+            )
+            # the state from before the recording is back
+            self.assertEqual(ctx.fillStyle, "#00ff00")
+            self.assertEqual(ctx.getTransform().e, 5)
+            for x in range(0, 100, 25):
+                ctx.drawPicture(picture, {"a": 1, "b": 0, "c": 0, "d": 1, "e": x, "f": 10})
+
+        self.assertEqual(render(replay), render(direct))
+
+    def test_draw_picture_recording_layers_cover_bounds(self):
+        def stamp(ctx, x, y):
+            # Both the blend mode and the shadow are drawn through a layer
+            ctx.globalCompositeOperation = "copy"
+            ctx.shadowColor = "#f00"
+            ctx.shadowOffsetX = 5
+            ctx.shadowOffsetY = 5
+            ctx.fillStyle = "#00f"
+            ctx.fillRect(x, y, 20, 20)
+
+        direct = canvas_pyr.createCanvas(40, 40).getContext("2d")
+        stamp(direct, 10, 10)
+
+        # Recorded far outside the canvas it is recorded on
+        ctx = canvas_pyr.createCanvas(20, 20).getContext("2d")
+        ctx.beginRecording((100, 100, 40, 40))
+        stamp(ctx, 110, 110)
+        picture = ctx.endRecording()
+        replay = canvas_pyr.createCanvas(40, 40).getContext("2d")
+        replay.drawPicture(picture, {"a": 1, "b": 0, "c": 0, "d": 1, "e": -100, "f": -100})
+
+        expected = direct.getImageData(0, 0, 40, 40).data
+        self.assertEqual(replay.getImageData(0, 0, 40, 40).data, expected)
+
+    def test_draw_picture_recording_errors(self):
+        ctx = self.ctx
+        with self.assertRaises(RuntimeError):
+            ctx.endRecording()
+        ctx.beginRecording((0, 0, 10, 10))
+        with self.assertRaises(RuntimeError):
+            ctx.beginRecording((0, 0, 10, 10))
+        ctx.fillRect(0, 0, 10, 10)
+        picture = ctx.endRecording()
+        # nothing was drawn on the canvas while recording
+        self.assertFalse(any(ctx.getImageData(0, 0, 10, 10).data))
+        other = canvas_pyr.createCanvas(10, 10).getContext("2d")
+        other.drawPicture(picture)
+        self.assertEqual(other.getImageData(0, 0, 1, 1).data[3], 255)
+
+    def test_picture_serialize_round_trip(self):
+        source = canvas_pyr.createCanvas(200, 100)
+        ctx = source.getContext("2d")
+        image = canvas_pyr.Image()
+        image.load(str(self._test_path("javascript.png")))
+        ctx.drawImage(image, 0, 0, 50, 50)
+        ctx.font = "20px Iosevka Slab"
+        ctx.fillText("SKP", 60, 40)
+        expected = ctx.getImageData(0, 0, 200, 100).data
+
+        picture = source.toPicture()
+        self.assertEqual((picture.width, picture.height), (200, 100))
+        data = picture.serialize()
+        # Fonts are referenced unless asked for, they are resolved again here
+        embedded = picture.serialize(embedFonts=True)
+        self.assertGreater(len(embedded), len(data))
+        self.assertEqual(source.toPicture(embedFonts=True).serialize(), embedded)
+        for copy in (
+            canvas_pyr.Picture.deserialize(data),
+            canvas_pyr.Picture.deserialize(embedded),
+            pickle.loads(pickle.dumps(picture)),
+        ):
+            self.assertEqual((copy.width, copy.height), (200, 100))
+            target = canvas_pyr.createCanvas(200, 100).getContext("2d")
+            target.drawPicture(copy)
+            self.assertEqual(target.getImageData(0, 0, 200, 100).data, expected)
+
+        with self.assertRaises(ValueError):
+            canvas_pyr.Picture.deserialize(b"not a picture")
+
+    def test_picture_deserialize_with_font_collection(self):
+        collection = canvas_pyr.FontCollection(fallback=False)
+        oswald = self._test_path("fonts", "Oswald.ttf")
+        self.assertIsNotNone(collection.registerFromPath(str(oswald), "Picture Oswald"))
+        source = canvas_pyr.createCanvas(200, 60)
+        ctx = source.getContext("2d")
+        ctx.fontCollection = collection
+        ctx.font = "32px Picture Oswald"
+        ctx.fillText("Scoped", 10, 40)
+        expected = ctx.getImageData(0, 0, 200, 60).data
+
+        data = source.toPicture().serialize()
+        copy = canvas_pyr.Picture.deserialize(data, fontCollection=collection)
+        target = canvas_pyr.createCanvas(200, 60).getContext("2d")
+        target.drawPicture(copy)
+        self.assertEqual(target.getImageData(0, 0, 200, 60).data, expected)
+
     def test_ellipse(self):
         ctx = self.ctx
         # Draw the ellipse
@@ -1078,6 +1248,76 @@ class DrawTestCase(BaseTestCase):
         ctx.putImageData(imageData, 150, 10)
         self._snapshot("getImageData")
 
+    def test_get_image_data_sees_put_image_data(self):
+        ctx = self.ctx
+        ctx.fillStyle = "#f00"
+        ctx.fillRect(0, 0, 20, 20)
+        blue = canvas_pyr.ImageData(bytes([0, 0, 255, 255] * 100), 10, 10)
+        ctx.putImageData(blue, 0, 0)
+        self.assertEqual(list(ctx.getImageData(0, 0, 1, 1).data), [0, 0, 255, 255])
+        self.assertEqual(list(ctx.getImageData(15, 15, 1, 1).data), [255, 0, 0, 255])
+        # drawing recorded after the write still lands on top of it
+        ctx.fillStyle = "#0f0"
+        ctx.fillRect(0, 0, 5, 5)
+        self.assertEqual(list(ctx.getImageData(0, 0, 1, 1).data), [0, 255, 0, 255])
+
+    def test_get_image_data_small_region_matches_full_render(self):
+        def draw(ctx):
+            ctx.fillStyle = "#123456"
+            ctx.fillRect(0, 0, 512, 512)
+            for i in range(50):
+                ctx.fillStyle = f"rgba({i * 5}, 100, 200, 0.6)"
+                ctx.beginPath()
+                ctx.arc((i * 37) % 512, (i * 91) % 512, 20, 0, 2 * math.pi)
+                ctx.fill()
+
+        def draw_more(ctx):
+            ctx.fillStyle = "#f00"
+            ctx.fillRect(240, 240, 16, 16)
+
+        regions = [(0, 0, 32, 32), (250, 250, 32, 32), (500, 480, 12, 32), (100, 37, 1, 1)]
+        reference_canvas = canvas_pyr.createCanvas(512, 512)
+        reference = reference_canvas.getContext("2d")
+
+        # small reads render the region alone and leave the drawing pending
+        draw(self.ctx)
+        draw(reference)
+        reference_canvas.data()
+        for region in regions:
+            self.assertEqual(self.ctx.getImageData(*region).data, reference.getImageData(*region).data)
+
+        draw_more(self.ctx)
+        draw_more(reference)
+        reference_canvas.data()
+        for region in regions:
+            self.assertEqual(self.ctx.getImageData(*region).data, reference.getImageData(*region).data)
+        self.assertEqual(self.canvas.data(), reference_canvas.data())
+
+    def test_immediate_canvas_matches_deferred(self):
+        def draw(ctx):
+            ctx.fillStyle = "#123456"
+            ctx.fillRect(0, 0, 128, 128)
+            ctx.shadowColor = "rgba(0, 0, 0, 0.5)"
+            ctx.shadowBlur = 4
+            for i in range(20):
+                ctx.fillStyle = f"rgba({i * 12}, 100, 200, 0.6)"
+                ctx.beginPath()
+                ctx.arc((i * 37) % 128, (i * 91) % 128, 10, 0, 2 * math.pi)
+                ctx.fill()
+            ctx.clearRect(10, 10, 20, 20)
+
+        canvas = canvas_pyr.createCanvas(128, 128, {"deferred": False})
+        ctx = canvas.getContext("2d")
+        self.assertFalse(ctx.deferred)
+        self.assertTrue(self.ctx.deferred)
+        draw(ctx)
+        draw(self.ctx)
+        self.assertEqual(ctx.getImageData(0, 0, 128, 128).data, self.ctx.getImageData(0, 0, 128, 128).data)
+
+        canvas.width = 64
+        self.assertFalse(canvas.getContext("2d").deferred)
+        self.assertEqual(canvas_pyr.createCanvas(8, 8, {}).getContext("2d").deferred, True)
+
     def test_is_point_in_path(self):
         ctx = self.ctx
 
@@ -1,5 +1,8 @@
+import os
 import platform
+import subprocess
 import sys
+import unittest
 from pathlib import Path
 
 import canvas_pyr
@@ -474,3 +477,66 @@ class GlobalFontsTestCase(BaseTestCase):
 
         # Clean up
         canvas_pyr.GlobalFonts.remove(font_key_b)  # type: ignore
+
+    def test_system_font_scan_ready(self):
+        self.assertTrue(canvas_pyr.GlobalFonts.wait())
+        self.assertTrue(canvas_pyr.GlobalFonts.ready())
+        self.assertTrue(canvas_pyr.GlobalFonts.wait(timeout=0))
+        with self.assertRaises(ValueError):
+            canvas_pyr.GlobalFonts.wait(timeout=-1)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork is not available")
+    def test_fork_during_system_font_scan(self):
+        # the child is forked right after import, while the scan may still run
+        script = (
+            "import os, canvas_pyr\n"
+            "pid = os.fork()\n"
+            "if pid == 0:\n"
+            "    canvas_pyr.GlobalFonts.getFamilies()\n"
+            "    os._exit(0)\n"
+            "_, status = os.waitpid(pid, 0)\n"
+            "raise SystemExit(os.waitstatus_to_exitcode(status))\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "DISABLE_SYSTEM_FONTS_LOAD"}
+        subprocess.run([sys.executable, "-c", script], env=env, check=True, timeout=120)
+
+    def test_warm_up(self):
+        fonts = canvas_pyr.GlobalFonts
+        fonts.registerFromPath(self._test_path("fonts", "iosevka-slab-regular.ttf"), "WarmUpSlab")
+        self.assertEqual(fonts.warmUp(["WarmUpSlab"]), 1)
+        self.assertEqual(fonts.warmUp(["NoSuchFamilyForWarmUp"]), 0)
+        self.assertGreaterEqual(fonts.warmUp(), 1)
+
+    def test_font_index(self):
+        import shutil
+        import tempfile
+
+        fonts = canvas_pyr.GlobalFonts
+        fonts_dir = self._test_path("fonts-dir")
+        with tempfile.TemporaryDirectory() as index_dir:
+            try:
+                fonts.setFontIndexDir(index_dir)
+                self.assertEqual(fonts.getFontIndexDir(), index_dir)
+                # Index a private copy so the files can be changed
+                copy_dir = Path(index_dir) / "fonts"
+                shutil.copytree(fonts_dir, copy_dir)
+                fonts.removeAll()
+                self.assertEqual(fonts.loadFontsFromDir(str(copy_dir)), 3)
+                self.assertTrue((Path(index_dir) / "font-index.json").exists())
+                families = {f.family for f in fonts.getFamilies()}
+
+                # Registered from the index, the result is the same
+                fonts.removeAll()
+                self.assertEqual(fonts.loadFontsFromDir(str(copy_dir)), 3)
+                self.assertEqual({f.family for f in fonts.getFamilies()}, families)
+
+                canvas = canvas_pyr.createCanvas(200, 50)
+                ctx = canvas.getContext("2d")
+                family = sorted(families)[0]
+                ctx.font = f"24px {family}"
+                ctx.fillText("Indexed", 10, 35)
+                self.assertTrue(any(ctx.getImageData(0, 0, 200, 50).data[3::4]))
+            finally:
+                fonts.setFontIndexDir(None)
+                fonts.removeAll()
+        self.assertIsNone(fonts.getFontIndexDir())
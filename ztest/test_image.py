@@ -43,6 +43,31 @@ class ImageTestCase(BaseTestCase):
         self.assertEqual(img.src, "<bytes>")
         self.assertEqual(img.complete, True)
 
+    def test_load_image_from_buffer_objects(self):
+        image_data = load_image_file()
+        for data in (bytearray(image_data), memoryview(image_data)):
+            img = canvas_pyr.Image()
+            img.load(data)
+            self.assertEqual(img.width, 300)
+            self.assertEqual(img.height, 320)
+            self.assertEqual(img.src, "<bytes>")
+
+    def test_load_image_should_release_buffer_after_decoding(self):
+        data = bytearray(load_image_file())
+        view = memoryview(data)
+        img = canvas_pyr.Image()
+        img.load(view)
+        view.release()
+        # resizing fails with BufferError while an export is still alive
+        data.extend(b"\0")
+        self.assertEqual(img.width, 300)
+        self.assertEqual(img.src, "<bytes>")
+
+    def test_load_image_from_non_contiguous_buffer_should_throw_error(self):
+        img = canvas_pyr.Image()
+        with self.assertRaises(ValueError):
+            img.load(memoryview(load_image_file())[::2])
+
     def test_alt_state_should_be_ok(self):
         img = canvas_pyr.Image()
         self.assertEqual(img.alt, "")
@@ -57,6 +82,117 @@ class ImageTestCase(BaseTestCase):
         self.assertEqual(img.width, 450)
         self.assertEqual(img.height, 600)
 
+    def test_load_with_max_size_should_decode_scaled(self):
+        img = canvas_pyr.Image()
+        img.load(load_image_file(), {"maxWidth": 150})
+        self.assertEqual(img.width, 150)
+        self.assertEqual(img.height, 160)
+        self.assertEqual(img.naturalWidth, 150)
+        self.assertEqual(img.naturalHeight, 160)
+
+    def test_load_with_max_size_should_keep_aspect_ratio_and_not_upscale(self):
+        img = canvas_pyr.Image()
+        img.load(load_image_file(), {"maxWidth": 1000, "maxHeight": 80})
+        self.assertEqual(img.width, 75)
+        self.assertEqual(img.height, 80)
+
+        img.load(load_image_file(), {"maxWidth": 1000, "maxHeight": 1000})
+        self.assertEqual(img.width, 300)
+        self.assertEqual(img.height, 320)
+
+    def test_load_with_max_size_should_reject_non_positive_sizes(self):
+        img = canvas_pyr.Image()
+        with self.assertRaises(ValueError):
+            img.load(load_image_file(), {"maxWidth": 0})
+        with self.assertRaises(ValueError):
+            img.load(load_image_file(), {"maxWidth": 100, "maxHeight": -1})
+
+    def test_load_with_max_size_should_respect_exif_orientation(self):
+        image_data = self._test_path("fixtures", "with-exif.jpg").read_bytes()
+        img = canvas_pyr.Image()
+        img.load(image_data, {"maxWidth": 225})
+        self.assertEqual(img.width, 225)
+        self.assertEqual(img.height, 300)
+
+    def test_load_region_should_decode_only_the_region(self):
+        img = canvas_pyr.Image()
+        img.loadRegion(load_image_file(), 100, 120, 50, 40)
+        self.assertEqual(img.width, 50)
+        self.assertEqual(img.height, 40)
+        self.assertEqual(img.src, "<bytes>")
+
+        img.loadRegion(str(upstream_dir / "example" / "simple.png"), 200, 200, 500, 500, 0.5)
+        self.assertEqual(img.width, 50)
+        self.assertEqual(img.height, 60)
+
+        self.ctx.drawImage(img, 0, 0)
+
+    def test_load_region_should_match_full_decode(self):
+        full = canvas_pyr.Image()
+        full.load(load_image_file())
+        region = canvas_pyr.Image()
+        region.loadRegion(load_image_file(), 100, 120, 50, 40)
+
+        canvas = canvas_pyr.createCanvas(50, 40)
+        ctx = canvas.getContext("2d")
+        ctx.drawImage(full, 100, 120, 50, 40, 0, 0, 50, 40)
+        expected = ctx.getImageData(0, 0, 50, 40).data
+        ctx.clearRect(0, 0, 50, 40)
+        ctx.drawImage(region, 0, 0)
+        self.assertEqual(ctx.getImageData(0, 0, 50, 40).data, expected)
+
+    def test_load_region_invalid_arguments_should_throw_error(self):
+        img = canvas_pyr.Image()
+        with self.assertRaises(ValueError):
+            img.loadRegion(load_image_file(), 0, 0, 0, 10)
+        with self.assertRaises(ValueError):
+            img.loadRegion(load_image_file(), 0, 0, 10, 10, 2)
+        img.loadRegion(load_image_file(), 0, 0, 10, 10)
+        self.assertEqual(img.src, "<bytes>")
+        with self.assertRaises(ValueError):
+            img.loadRegion(load_image_file(), 1000, 1000, 10, 10)
+        self.assertEqual(img.width, 0)
+        self.assertIsNone(img.src)
+        self.assertIsNone(img.currentSrc)
+
+    def test_image_cache_should_share_decoded_bitmaps(self):
+        cache = canvas_pyr.ImageCache(maxBytes=64 * 1024 * 1024)
+        filepath = str(upstream_dir / "example" / "simple.png")
+        img1 = canvas_pyr.Image()
+        img1.load(filepath, {"cache": cache})
+        img2 = canvas_pyr.Image()
+        img2.load(filepath, {"cache": cache})
+        img3 = canvas_pyr.Image()
+        img3.load(load_image_file(), {"cache": cache})
+        self.assertEqual(img2.width, 300)
+        self.assertEqual(img2.height, 320)
+        self.assertEqual(img2.currentSrc, filepath)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.count, 2)
+        # the bytes source also keeps a copy of the encoded image
+        self.assertEqual(cache.totalBytes, 2 * 300 * 320 * 4 + len(load_image_file()))
+
+        self.ctx.drawImage(img2, 0, 0)
+        cache.clear()
+        self.assertEqual(cache.count, 0)
+        self.assertEqual(cache.totalBytes, 0)
+        self.ctx.drawImage(img2, 0, 0)
+
+    def test_image_cache_should_evict_least_recently_used(self):
+        image_data = load_image_file()
+        cache = canvas_pyr.ImageCache(maxBytes=300 * 320 * 4 + len(image_data))
+        canvas_pyr.Image().load(image_data, {"cache": cache})
+        canvas_pyr.Image().load(image_data, {"cache": cache, "maxWidth": 150})
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.count, 1)
+        canvas_pyr.Image().load(image_data, {"cache": cache, "maxWidth": 150})
+        self.assertEqual(cache.hits, 1)
+
+        cache.maxBytes = 0
+        self.assertEqual(cache.count, 0)
+        self.assertEqual(cache.evictions, 2)
+
     def test_draw_image_exif(self):
         image_data = self._test_path("fixtures", "with-exif.jpg").read_bytes()
         img = canvas_pyr.Image()
@@ -315,3 +451,39 @@ class ImageTestCase(BaseTestCase):
         self.assertTrue(
             has_visible_pixel, "AVIF image should have been drawn (has visible pixels)"
         )
+
+    def test_svg_draws_crisp_at_any_scale(self):
+        svg = (
+            b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10">'
+            b'<rect x="5" y="0" width="5" height="10" fill="#00f"/></svg>'
+        )
+        img = canvas_pyr.Image()
+        img.load(svg)
+        self.assertEqual(img.naturalWidth, 10)
+
+        canvas = canvas_pyr.createCanvas(200, 200)
+        ctx = canvas.getContext("2d")
+        ctx.drawImage(img, 0, 0, 200, 200)
+        # vector replay: the edge at x=100 stays sharp instead of being interpolated
+        left = ctx.getImageData(98, 100, 1, 1).data
+        right = ctx.getImageData(101, 100, 1, 1).data
+        self.assertEqual(list(left), [0, 0, 0, 0])
+        self.assertEqual(list(right), [0, 0, 255, 255])
+
+        # source rect is in image space
+        ctx.clearRect(0, 0, 200, 200)
+        ctx.drawImage(img, 5, 0, 5, 10, 0, 0, 50, 50)
+        self.assertEqual(list(ctx.getImageData(25, 25, 1, 1).data), [0, 0, 255, 255])
+
+    def test_svg_image_as_pattern(self):
+        svg = (
+            b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10">'
+            b'<rect width="10" height="10" fill="#f00"/></svg>'
+        )
+        img = canvas_pyr.Image()
+        img.load(svg)
+        canvas = canvas_pyr.createCanvas(30, 30)
+        ctx = canvas.getContext("2d")
+        ctx.fillStyle = ctx.createPattern(img, "repeat")
+        ctx.fillRect(0, 0, 30, 30)
+        self.assertEqual(list(ctx.getImageData(25, 25, 1, 1).data), [255, 0, 0, 255])
@@ -826,3 +826,331 @@ class TextTestCase(BaseTestCase):
         self.assertEqual(widths["auto"], widths["geometricPrecision"])
 
         self._snapshot("text-rendering-comparison", canvas=canvas)
+
+    def test_paragraph_cache_reuses_layout(self):
+        fonts = canvas_pyr.GlobalFonts
+        ctx = self.ctx
+        ctx.font = "16px Iosevka Slab"
+        try:
+            # Lines shaped without a paragraph are cached too
+            for fast_path in (True, False):
+                with self.subTest(fast_path=fast_path):
+                    fonts.setTextFastPath(fast_path)
+                    fonts.clearParagraphCache()
+
+                    width = ctx.measureText("Axis label").width
+                    for _ in range(10):
+                        self.assertEqual(ctx.measureText("Axis label").width, width)
+                    ctx.fillText("Axis label", 10, 50)
+
+                    stats = fonts.getParagraphCacheStats()
+                    self.assertEqual(stats.misses, 1)
+                    self.assertEqual(stats.hits, 11)
+                    self.assertEqual(stats.count, 1)
+        finally:
+            fonts.setTextFastPath(True)
+
+        # Any change to the shaping state is a different entry
+        ctx.font = "bold 16px Iosevka Slab"
+        self.assertNotEqual(ctx.measureText("Axis label").width, 0)
+        self.assertEqual(fonts.getParagraphCacheStats().count, 2)
+
+    def test_paragraph_cache_applies_current_paint(self):
+        canvas = canvas_pyr.createCanvas(100, 40)
+        ctx = canvas.getContext("2d")
+        ctx.font = "32px Iosevka Slab"
+        ctx.fillStyle = "#f00"
+        ctx.fillText("█", 0, 32)
+        ctx.clearRect(0, 0, 100, 40)
+        ctx.fillStyle = "#00f"
+        ctx.fillText("█", 0, 32)
+        data = ctx.getImageData(0, 0, 100, 40).data
+        colored = [data[i : i + 4] for i in range(0, len(data), 4) if data[i + 3] == 255]
+        self.assertTrue(colored)
+        self.assertTrue(all(p[0] == 0 and p[2] == 255 for p in colored))
+
+    def test_paragraph_cache_capacity(self):
+        fonts = canvas_pyr.GlobalFonts
+        ctx = self.ctx
+        ctx.font = "16px Iosevka Slab"
+        try:
+            fonts.setParagraphCacheCapacity(2)
+            fonts.clearParagraphCache()
+            for text in ("a", "b", "c"):
+                ctx.measureText(text)
+            stats = fonts.getParagraphCacheStats()
+            self.assertEqual(stats.capacity, 2)
+            self.assertEqual(stats.count, 2)
+            self.assertEqual(stats.evictions, 1)
+
+            fonts.setParagraphCacheCapacity(0)
+            self.assertEqual(fonts.getParagraphCacheStats().count, 0)
+            ctx.measureText("a")
+            self.assertEqual(fonts.getParagraphCacheStats().count, 0)
+        finally:
+            fonts.setParagraphCacheCapacity(1024)
+
+    def test_measure_text_batch(self):
+        ctx = self.ctx
+        ctx.font = "16px Iosevka Slab"
+        strings = ["Hello", "", "Hello Canvas", "日本語"]
+
+        widths = ctx.measureTextBatch(strings)
+        self.assertEqual(widths.typecode, "d")
+        self.assertEqual(
+            list(widths), [ctx.measureText(s).width for s in strings]
+        )
+
+        fields = ("width", "actualBoundingBoxAscent", "fontBoundingBoxDescent")
+        values = ctx.measureTextBatch(strings, fields)
+        self.assertEqual(len(values), len(strings) * len(fields))
+        metrics = ctx.measureText("Hello Canvas")
+        self.assertEqual(
+            list(values[6:9]),
+            [
+                metrics.width,
+                metrics.actualBoundingBoxAscent,
+                metrics.fontBoundingBoxDescent,
+            ],
+        )
+
+        self.assertEqual(len(ctx.measureTextBatch([])), 0)
+        with self.assertRaises(ValueError):
+            ctx.measureTextBatch(["a"], ("nope",))
+
+    def test_measure_text_block_wraps(self):
+        ctx = self.ctx
+        ctx.font = "16px Iosevka Slab"
+        text = "The quick brown fox jumps over the lazy dog"
+        single = ctx.measureTextBlock(text)
+        self.assertEqual(single.lineCount, 1)
+        self.assertAlmostEqual(single.width, ctx.measureText(text).width, delta=1)
+
+        wrapped = ctx.measureTextBlock(text, {"maxWidth": 120})
+        self.assertGreater(wrapped.lineCount, 1)
+        self.assertLessEqual(wrapped.width, 120)
+        self.assertGreater(wrapped.height, single.height)
+        self.assertFalse(wrapped.didExceedMaxLines)
+
+        spaced = ctx.measureTextBlock(text, {"maxWidth": 120, "lineHeight": 40})
+        self.assertAlmostEqual(spaced.height, 40 * spaced.lineCount, delta=1)
+
+        limited = ctx.measureTextBlock(
+            text, {"maxWidth": 120, "maxLines": 2, "ellipsis": "…"}
+        )
+        self.assertEqual(limited.lineCount, 2)
+        self.assertTrue(limited.didExceedMaxLines)
+
+        self.assertEqual(ctx.measureTextBlock("a\nb\nc").lineCount, 3)
+        self.assertEqual(ctx.measureTextBlock("").lineCount, 0)
+
+        with self.assertRaises(ValueError):
+            ctx.measureTextBlock(text, {"maxWidth": 0})
+        with self.assertRaises(ValueError):
+            ctx.measureTextBlock(text, {"align": "middle"})
+
+    def test_fill_text_block(self):
+        canvas = canvas_pyr.createCanvas(300, 200)
+        ctx = canvas.getContext("2d")
+        ctx.font = "24px Iosevka Slab"
+        ctx.textBaseline = "top"
+        text = "Skia paragraph layout wraps this sentence for us"
+        metrics = ctx.measureTextBlock(text, {"maxWidth": 150, "lineHeight": 30})
+        ctx.fillTextBlock(text, 10, 10, {"maxWidth": 150, "lineHeight": 30})
+
+        def ink_rows(x, w):
+            data = ctx.getImageData(x, 0, w, canvas.height).data
+            return [
+                y
+                for y in range(canvas.height)
+                if any(data[(y * w + i) * 4 + 3] for i in range(w))
+            ]
+
+        rows = ink_rows(0, canvas.width)
+        self.assertGreaterEqual(rows[0], 10)
+        self.assertLessEqual(rows[-1], 10 + metrics.height)
+        self.assertGreater(rows[-1] - rows[0], 30 * (metrics.lineCount - 1))
+        # nothing is drawn past the wrap width
+        self.assertEqual(ink_rows(10 + 150, canvas.width - 160), [])
+
+    def test_text_blob_draws_like_fill_text(self):
+        def render(draw):
+            canvas = canvas_pyr.createCanvas(200, 60)
+            ctx = canvas.getContext("2d")
+            ctx.font = "20px Iosevka Slab"
+            ctx.textAlign = "center"
+            ctx.textBaseline = "middle"
+            ctx.fillStyle = "#036"
+            draw(ctx)
+            return ctx.getImageData(0, 0, 200, 60).data
+
+        expected = render(lambda ctx: ctx.fillText("Tick 42", 100, 30))
+
+        def draw_blob(ctx):
+            blob = ctx.createTextBlob("Tick 42")
+            self.assertEqual(blob.text, "Tick 42")
+            self.assertEqual(blob.width, ctx.measureText("Tick 42").width)
+            ctx.drawTextBlob(blob, 100, 30)
+
+        self.assertEqual(render(draw_blob), expected)
+
+    def test_text_blob_is_reusable(self):
+        ctx = self.ctx
+        ctx.font = "16px Iosevka Slab"
+        blob = ctx.createTextBlob("label")
+        # later state changes do not affect the blob, except the paint
+        ctx.font = "40px Iosevka Slab"
+        ctx.fillStyle = "#f00"
+        for y in range(20, 200, 20):
+            ctx.drawTextBlob(blob, 10, y)
+        self.assertEqual(blob.metrics.width, blob.width)
+
+        other = canvas_pyr.createCanvas(100, 40).getContext("2d")
+        other.drawTextBlob(blob, 0, 20)
+        pixels = other.getImageData(0, 0, 100, 40).data
+        self.assertTrue(any(pixels[3::4]))
+
+        ctx.drawTextBlob(ctx.createTextBlob(""), 0, 0)
+
+    def test_font_cache_limits_and_stats(self):
+        previous = canvas_pyr.setFontCacheLimit(4 * 1024 * 1024)
+        try:
+            self.assertEqual(canvas_pyr.getFontCacheStats().limitBytes, 4 * 1024 * 1024)
+            self.ctx.font = "24px Iosevka Slab"
+            self.ctx.fillText("glyph cache", 10, 50)
+            stats = canvas_pyr.getFontCacheStats()
+            self.assertGreater(stats.usedBytes, 0)
+            self.assertGreater(stats.count, 0)
+
+            canvas_pyr.purgeFontCache()
+            after = canvas_pyr.getFontCacheStats()
+            self.assertEqual(after.purgeCount, stats.purgeCount + 1)
+            self.assertLess(after.usedBytes, stats.usedBytes)
+        finally:
+            canvas_pyr.setFontCacheLimit(previous)
+
+        previous = canvas_pyr.setFontCacheCountLimit(64)
+        self.assertEqual(canvas_pyr.getFontCacheStats().countLimit, 64)
+        canvas_pyr.setFontCacheCountLimit(previous)
+        with self.assertRaises(ValueError):
+            canvas_pyr.setFontCacheCountLimit(-1)
+        canvas_pyr.purgeResourceCache()
+
+    def test_fallback_families(self):
+        fonts = canvas_pyr.GlobalFonts
+        serif = self._test_path("fonts", "SourceSerifPro-Regular.ttf")
+        self.assertTrue(fonts.registerFromPath(str(serif)))
+        ctx = self.ctx
+        ctx.font = "32px Iosevka Slab"
+        expected = ctx.measureText("█").width
+        try:
+            fonts.setFallbackFamilies(["Missing Family", "Iosevka Slab"])
+            self.assertEqual(fonts.getFallbackFamilies(), ["Missing Family", "Iosevka Slab"])
+            # Source Serif Pro has no block elements, the chain supplies them
+            ctx.font = "32px Source Serif Pro"
+            self.assertEqual(ctx.measureText("█").width, expected)
+            self.assertEqual(ctx.measureText("█").width, expected)
+        finally:
+            fonts.setFallbackFamilies([])
+        self.assertEqual(fonts.getFallbackFamilies(), [])
+
+    def test_text_to_path(self):
+        ctx = self.ctx
+        ctx.font = "48px Iosevka Slab"
+        metrics = ctx.measureText("Hello")
+        path = ctx.textToPath("Hello", 20, 100)
+        left, top, right, bottom = path.computeTightBounds()
+        self.assertAlmostEqual(left, 20 - metrics.actualBoundingBoxLeft, delta=1)
+        self.assertAlmostEqual(right, 20 + metrics.actualBoundingBoxRight, delta=1)
+        self.assertAlmostEqual(top, 100 - metrics.actualBoundingBoxAscent, delta=1)
+        self.assertAlmostEqual(bottom, 100 + metrics.actualBoundingBoxDescent, delta=1)
+        # The second call is served from the glyph outline cache
+        self.assertEqual(ctx.textToPath("Hello", 20, 100).toSVGString(), path.toSVGString())
+        self.assertEqual(ctx.textToPath("", 0, 0).toSVGString(), "")
+
+        ctx.fillStyle = "black"
+        ctx.fill(path)
+        pixels = ctx.getImageData(0, 0, 512, 512).data
+        self.assertEqual(pixels[(80 * 512 + 10) * 4 + 3], 0)
+        self.assertGreater(sum(pixels[3::4]), 0)
+
+    def test_text_to_path_cache_overflow(self):
+        ctx = self.ctx
+        canvas_pyr.purgeFontCache()
+        # One outline first, so the cache (4096 outlines) overflows while
+        # "Hello World" finds the outlines of "Hello" cached
+        ctx.font = "10.0625px Iosevka Slab"
+        ctx.textToPath("H", 0, 0)
+        for i in range(600):
+            ctx.font = f"{10.0625 + i / 8}px Iosevka Slab"
+            hello = ctx.textToPath("Hello", 20, 100).computeTightBounds()
+            hello_world = ctx.textToPath("Hello World", 20, 100).computeTightBounds()
+            self.assertEqual(hello_world[0], hello[0], msg=ctx.font)
+            self.assertGreater(hello_world[2], hello[2], msg=ctx.font)
+
+        # Outlines served after an overflow match freshly made ones
+        ctx.font = "48px Iosevka Slab"
+        expected = ctx.textToPath("Hello World", 20, 100).toSVGString()
+        canvas_pyr.purgeFontCache()
+        self.assertEqual(ctx.textToPath("Hello World", 20, 100).toSVGString(), expected)
+
+    def test_text_fast_path_matches_paragraph(self):
+        fonts = canvas_pyr.GlobalFonts
+
+        def render(fast_path):
+            fonts.setTextFastPath(fast_path)
+            canvas = canvas_pyr.createCanvas(300, 160)
+            ctx = canvas.getContext("2d")
+            ctx.font = "24px Iosevka Slab"
+            metrics = []
+            for baseline in ("alphabetic", "top", "middle", "ideographic", "bottom"):
+                ctx.textBaseline = baseline
+                for text in ("Hello Canvas", "AV.To 123", "x "):
+                    metrics.append(ctx.measureText(text).to_dict())
+            ctx.textBaseline = "alphabetic"
+            ctx.fillText("Hello Canvas", 10, 50)
+            ctx.textBaseline = "middle"
+            ctx.fillText("AV.To 123", 10, 110)
+            return metrics, ctx.getImageData(0, 0, 300, 160).data
+
+        try:
+            fast_metrics, fast_pixels = render(True)
+            slow_metrics, slow_pixels = render(False)
+        finally:
+            fonts.setTextFastPath(True)
+        for fast, slow in zip(fast_metrics, slow_metrics):
+            for name, value in slow.items():
+                self.assertAlmostEqual(fast[name], value, places=3, msg=name)
+        self.assertEqual(fast_pixels, slow_pixels)
+
+    def test_font_collection(self):
+        collection = canvas_pyr.FontCollection()
+        self.assertTrue(collection.fallback)
+        oswald = self._test_path("fonts", "Oswald.ttf")
+        self.assertIsNotNone(collection.registerFromPath(str(oswald), "Tenant Oswald"))
+        self.assertTrue(collection.has("Tenant Oswald"))
+        self.assertFalse(canvas_pyr.GlobalFonts.has("Tenant Oswald"))
+
+        ctx = self.ctx
+        ctx.font = "32px Iosevka Slab"
+        slab = ctx.measureText("Tenant").width
+        ctx.font = "32px Tenant Oswald"
+        without = ctx.measureText("Tenant").width
+
+        self.assertIsNone(ctx.fontCollection)
+        ctx.fontCollection = collection
+        self.assertEqual(ctx.fontCollection, collection)
+        self.assertNotEqual(ctx.measureText("Tenant").width, without)
+        # Families missing from the collection come from GlobalFonts
+        ctx.font = "32px Iosevka Slab"
+        self.assertEqual(ctx.measureText("Tenant").width, slab)
+        # Including the ones added to GlobalFonts since
+        self.assertTrue(canvas_pyr.GlobalFonts.setAlias("Iosevka Slab", "Tenant Global Slab"))
+        ctx.font = "32px Tenant Global Slab"
+        self.assertEqual(ctx.measureText("Tenant").width, slab)
+
+        ctx.fontCollection = None
+        ctx.font = "32px Tenant Oswald"
+        self.assertEqual(ctx.measureText("Tenant").width, without)
+        self.assertEqual(collection.removeAll(), 1)
+        self.assertFalse(canvas_pyr.FontCollection(fallback=False).fallback)
@@ -53,3 +53,47 @@ class VariableFontsTestCase(BaseTestCase):
             self.assertEqual(weight_axis.min, 200)
             self.assertEqual(weight_axis.max, 700)
             self.assertEqual(weight_axis.def_, 400)
+
+    def test_variation_instance_cache(self):
+        fonts = canvas_pyr.GlobalFonts
+        font_path = self._test_path("fonts", "Oswald.ttf")
+        fonts.registerFromPath(str(font_path), "Oswald")
+        ctx = canvas_pyr.createCanvas(200, 50).getContext("2d")
+        ctx.font = "24px Oswald"
+        before = fonts.getVariationCacheStats()
+        try:
+            fonts.setVariationCacheCapacity(2)
+            ctx.fontVariationSettings = "'wght' 300"
+            light = ctx.measureText("Variable").width
+            # Another text with the same coordinates reuses the instance
+            ctx.measureText("Instance")
+            ctx.fontVariationSettings = "'wght' 500"
+            ctx.measureText("Variable")
+            stats = fonts.getVariationCacheStats()
+            self.assertEqual(stats.capacity, 2)
+            self.assertEqual(stats.count, 2)
+            self.assertEqual(stats.hits - before.hits, 1)
+            self.assertEqual(stats.misses - before.misses, 2)
+
+            ctx.fontVariationSettings = "'wght' 700"
+            bold = ctx.measureText("Variable").width
+            stats = fonts.getVariationCacheStats()
+            # Only the least recently used set is evicted
+            self.assertEqual(stats.evictions - before.evictions, 1)
+            self.assertEqual(stats.count, 2)
+            self.assertGreater(bold, light)
+
+            fonts.clearParagraphCache()
+            ctx.fontVariationSettings = "'wght' 500"
+            ctx.measureText("Variable")
+            stats = fonts.getVariationCacheStats()
+            self.assertEqual(stats.hits - before.hits, 2)
+
+            # Re-created after eviction with the same result
+            ctx.fontVariationSettings = "'wght' 300"
+            self.assertEqual(ctx.measureText("Variable").width, light)
+            stats = fonts.getVariationCacheStats()
+            self.assertEqual(stats.misses - before.misses, 4)
+            self.assertEqual(stats.evictions - before.evictions, 2)
+        finally:
+            fonts.setVariationCacheCapacity(before.capacity)